@@ -0,0 +1,77 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+
+from stubServer import StubServer, connect
+
+QUERY = 'SELECT Id, Name, Industry, Description FROM Account'
+MODES = ('dict', 'compact')
+
+
+def get_peak_mb():
+    # Linux keeps ru_maxrss across exec, so the parent's peak would leak into
+    # it; VmHWM belongs to this process only
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024.0
+    except IOError:
+        pass
+
+    # ru_maxrss is in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024.0 * 1024)
+
+
+def measure(url, mode):
+    client = connect(url)
+    baseline = get_peak_mb()
+
+    result = client.query_all(QUERY, compact=mode == 'compact')
+    peak = get_peak_mb()
+
+    return {'mode': mode,
+            'records': len(result['records']),
+            'baseline_mb': baseline,
+            'peak_mb': peak,
+            'query_mb': peak - baseline}
+
+
+def run(records=50000, page_size=2000):
+    server = StubServer(records=records, page_size=page_size)
+    results = []
+
+    try:
+        for mode in MODES:
+            # Each mode runs in a fresh process, without the stub's page cache
+            output = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                              '--measure', server.url, mode])
+            results.append(json.loads(output))
+    finally:
+        server.close()
+
+    return results
+
+
+def main(argv):
+    if argv[:1] == ['--measure']:
+        json.dump(measure(argv[1], argv[2]), sys.stdout)
+        return
+
+    results = run()
+
+    if '--json' in argv:
+        json.dump(results, sys.stdout, indent=2)
+        return
+
+    print '{0:<8} {1:>8} {2:>12} {3:>10} {4:>10}'.format('mode', 'records', 'baseline MB', 'peak MB', 'query MB')
+
+    for result in results:
+        print '{0:<8} {1:>8} {2:>12.1f} {3:>10.1f} {4:>10.1f}'.format(
+            result['mode'], result['records'], result['baseline_mb'], result['peak_mb'], result['query_mb'])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
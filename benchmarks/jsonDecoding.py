@@ -0,0 +1,117 @@
+import json
+import sys
+import time
+
+from stubServer import StubServer, get_client, rest_page
+from salesforce.httpClient import Requests
+from salesforce.jsonCodec import get_json_codec, get_available_codecs
+
+QUERY = 'SELECT Id, Name, Industry, Description FROM Account'
+PAGE_SIZES = (200, 2000)
+
+
+def measure_codec(name, page_size, rounds):
+    codec = get_json_codec(name)
+    page = rest_page(0, page_size, page_size)
+    content = json.dumps(page, separators=(',', ':'))
+
+    started = time.time()
+
+    for _ in xrange(rounds):
+        codec.loads(content)
+
+    decode = (time.time() - started) / rounds
+
+    started = time.time()
+
+    for _ in xrange(rounds):
+        codec.dumps(page['records'])
+
+    encode = (time.time() - started) / rounds
+
+    return {'codec': codec.name,
+            'page_size': page_size,
+            'page_bytes': len(content),
+            'decode_ms': decode * 1000,
+            'encode_ms': encode * 1000,
+            'decode_mb_per_s': len(content) / decode / 1024 / 1024}
+
+
+def measure_text_baseline(page_size, rounds):
+    content = json.dumps(rest_page(0, page_size, page_size), separators=(',', ':'))
+
+    started = time.time()
+
+    for _ in xrange(rounds):
+        json.loads(content.decode('utf-8'))
+
+    decode = (time.time() - started) / rounds
+
+    return {'codec': 'json (text)',
+            'page_size': page_size,
+            'page_bytes': len(content),
+            'decode_ms': decode * 1000,
+            'encode_ms': 0.0,
+            'decode_mb_per_s': len(content) / decode / 1024 / 1024}
+
+
+def measure_query(server, name, rounds):
+    client = get_client(server, httplib=Requests(json_codec=name))
+    client.query_all(QUERY)
+
+    started = time.time()
+
+    for _ in xrange(rounds):
+        client.query_all(QUERY)
+
+    return {'codec': client.json_codec.name,
+            'records': server.records,
+            'query_all_ms': (time.time() - started) / rounds * 1000}
+
+
+def run(rounds=50, query_rounds=5):
+    codecs = get_available_codecs()
+    results = {'codecs': [], 'queries': []}
+
+    for page_size in PAGE_SIZES:
+        results['codecs'].append(measure_text_baseline(page_size, rounds))
+
+    for name in codecs:
+        for page_size in PAGE_SIZES:
+            results['codecs'].append(measure_codec(name, page_size, rounds))
+
+    server = StubServer(records=10000)
+
+    try:
+        for name in codecs:
+            results['queries'].append(measure_query(server, name, query_rounds))
+    finally:
+        server.close()
+
+    return results
+
+
+def main(argv):
+    results = run()
+
+    if '--json' in argv:
+        json.dump(results, sys.stdout, indent=2)
+        return
+
+    print '{0:<12} {1:>6} {2:>10} {3:>12} {4:>12} {5:>10}'.format(
+        'codec', 'page', 'bytes', 'decode ms', 'encode ms', 'MB/s')
+
+    for result in results['codecs']:
+        print '{0:<12} {1:>6} {2:>10} {3:>12.2f} {4:>12.2f} {5:>10.1f}'.format(
+            result['codec'], result['page_size'], result['page_bytes'],
+            result['decode_ms'], result['encode_ms'], result['decode_mb_per_s'])
+
+    print
+
+    for result in results['queries']:
+        print '{0:<12} query_all of {1} records: {2:.1f} ms'.format(
+            result['codec'], result['records'], result['query_all_ms'])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
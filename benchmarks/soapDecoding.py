@@ -0,0 +1,108 @@
+from StringIO import StringIO
+import json
+import sys
+import time
+import xml.dom.minidom
+
+from stubServer import soap_page, soap_save_results, soap_search_result
+from salesforce.soapParser import parse_query_result, parse_search_result, parse_save_results
+import salesforce.utils as utils
+
+PAGE_SIZES = (200, 2000)
+
+
+def minidom_record(element):
+    record = {}
+
+    for child in element.childNodes:
+        name = child.localName
+
+        if name == 'type':
+            record['attributes'] = {'type': child.firstChild.nodeValue}
+        elif child.getElementsByTagName('sf:type'):
+            record[name] = minidom_record(child)
+        elif name not in record:
+            record[name] = child.firstChild.nodeValue if child.firstChild is not None else None
+
+    return record
+
+
+def minidom_query(content):
+    dom = xml.dom.minidom.parseString(content)
+
+    return {'done': utils.get_element_by_name(dom, 'done') == 'true',
+            'queryLocator': utils.get_element_by_name(dom, 'queryLocator'),
+            'totalSize': int(utils.get_element_by_name(dom, 'size')),
+            'records': [minidom_record(element) for element in dom.getElementsByTagName('records')]}
+
+
+def minidom_search(content):
+    dom = xml.dom.minidom.parseString(content)
+
+    return {'searchRecords': [minidom_record(element) for element in dom.getElementsByTagName('record')]}
+
+
+def minidom_save(content):
+    dom = xml.dom.minidom.parseString(content)
+
+    return [{'id': utils.get_element_by_name(element, 'id'),
+             'success': utils.get_element_by_name(element, 'success') == 'true',
+             'errors': []}
+            for element in dom.getElementsByTagName('result')]
+
+
+def measure(func, content, rounds):
+    func(content)
+
+    started = time.time()
+
+    for _ in xrange(rounds):
+        func(content)
+
+    return (time.time() - started) / rounds
+
+
+def measure_result(kind, size, content, minidom_func, decode_func, rounds):
+    minidom_time = measure(minidom_func, content, rounds)
+    decode_time = measure(lambda value: decode_func(StringIO(value)), content, rounds)
+
+    return {'result': kind,
+            'size': size,
+            'bytes': len(content),
+            'minidom_ms': minidom_time * 1000,
+            'elementtree_ms': decode_time * 1000,
+            'speedup': minidom_time / decode_time}
+
+
+def run(rounds=10):
+    results = []
+
+    for page_size in PAGE_SIZES:
+        results.append(measure_result('QueryResult', page_size, soap_page(0, page_size * 2, page_size),
+                                      minidom_query, parse_query_result, rounds))
+        results.append(measure_result('SearchResult', page_size, soap_search_result(page_size),
+                                      minidom_search, parse_search_result, rounds))
+        results.append(measure_result('SaveResult', page_size, soap_save_results('create', page_size),
+                                      minidom_save, parse_save_results, rounds))
+
+    return results
+
+
+def main(argv):
+    results = run()
+
+    if '--json' in argv:
+        json.dump(results, sys.stdout, indent=2)
+        return
+
+    print '{0:<14} {1:>6} {2:>10} {3:>12} {4:>15} {5:>8}'.format(
+        'result', 'size', 'bytes', 'minidom ms', 'elementtree ms', 'speedup')
+
+    for result in results:
+        print '{0:<14} {1:>6} {2:>10} {3:>12.2f} {4:>15.2f} {5:>7.1f}x'.format(
+            result['result'], result['size'], result['bytes'],
+            result['minidom_ms'], result['elementtree_ms'], result['speedup'])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,605 @@
+from StringIO import StringIO
+from contextlib import contextmanager
+import BaseHTTPServer
+import SocketServer
+import csv
+import json
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import urlparse
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from salesforce import Salesforce
+from salesforce.tokenStore import MemoryTokenStore
+from salesforce.login import Authentication, LoginWithRestAPI, LoginWithSoapAPI
+from salesforce.utils import xml_escape
+
+VERSION = 37.0
+TOKEN = '00DSTUB!token'
+USERNAME = 'bench@example.com'
+CLIENT_ID = 'bench-client'
+
+SOAP_ENVELOPE = ('<?xml version="1.0" encoding="UTF-8"?>'
+                 '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+                 'xmlns="urn:partner.soap.sforce.com" xmlns:sf="urn:sobject.partner.soap.sforce.com" '
+                 'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                 'xmlns:xsd="http://www.w3.org/2001/XMLSchema">'
+                 '<soapenv:Body>{0}</soapenv:Body></soapenv:Envelope>')
+
+LOCATOR = re.compile(r'<urn:queryLocator>([^<]*)</urn:queryLocator>')
+SOBJECT = re.compile(r'<urn:sObjects[ >]')
+ID = re.compile(r'<urn:Ids>')
+SESSION_ID = re.compile(r'<urn:sessionId>([^<]*)</urn:sessionId>')
+BULK_JOB = re.compile(r'/jobs/(ingest|query)/([^/]*)/?([^/]*)$')
+
+
+def make_record(index, description_size=64):
+    record_id = '001000000{0:06d}AAA'.format(index)
+
+    return {'attributes': {'type': 'Account',
+                           'url': '/services/data/v{0}/sobjects/Account/{1}'.format(VERSION, record_id)},
+            'Id': record_id,
+            'Name': 'Account {0}'.format(index),
+            'Industry': ('Banking', 'Retail', 'Energy', None)[index % 4],
+            'AnnualRevenue': index * 1000.5,
+            'NumberOfEmployees': index % 5000,
+            'IsDeleted': False,
+            'CreatedDate': '2016-03-{0:02d}T10:00:00.000+0000'.format(index % 28 + 1),
+            'BillingCity': 'San Francisco',
+            'Description': ('Account {0} '.format(index) * description_size)[:description_size],
+            'Owner': {'attributes': {'type': 'User'},
+                      'Name': 'Owner {0}'.format(index % 50)}}
+
+
+def rest_page(offset, total, page_size, version=VERSION, description_size=64):
+    records = [make_record(index, description_size)
+               for index in xrange(offset, min(offset + page_size, total))]
+    page = {'totalSize': total,
+            'done': offset + page_size >= total,
+            'records': records}
+
+    if not page['done']:
+        page['nextRecordsUrl'] = '/services/data/v{0}/query/01gSTUB-{1}'.format(version, offset + page_size)
+
+    return page
+
+
+def soap_value(name, value):
+    if value is None:
+        return '<sf:{0} xsi:nil="true"/>'.format(name)
+
+    if isinstance(value, dict):
+        return '<sf:{0} xsi:type="sf:sObject"><sf:type>{1}</sf:type>{2}</sf:{0}>'.format(
+            name, value['attributes']['type'], soap_fields(value))
+
+    if isinstance(value, bool):
+        return '<sf:{0} xsi:type="xsd:boolean">{1}</sf:{0}>'.format(name, 'true' if value else 'false')
+
+    if isinstance(value, float):
+        return '<sf:{0} xsi:type="xsd:double">{1!r}</sf:{0}>'.format(name, value)
+
+    if isinstance(value, (int, long)):
+        return '<sf:{0} xsi:type="xsd:int">{1}</sf:{0}>'.format(name, value)
+
+    return '<sf:{0}>{1}</sf:{0}>'.format(name, xml_escape(unicode(value)))
+
+
+def soap_fields(record):
+    return ''.join(soap_value(name, value) for name, value in sorted(record.items())
+                   if name != 'attributes')
+
+
+def soap_page(offset, total, page_size, description_size=64):
+    done = offset + page_size >= total
+    records = ''.join('<records xsi:type="sf:sObject"><sf:type>Account</sf:type>{0}</records>'.format(
+        soap_fields(make_record(index, description_size)))
+        for index in xrange(offset, min(offset + page_size, total)))
+    locator = '<queryLocator xsi:nil="true"/>' if done else \
+        '<queryLocator>01gSTUB-{0}</queryLocator>'.format(offset + page_size)
+
+    return SOAP_ENVELOPE.format(
+        '<queryResponse><result xsi:type="QueryResult"><done>{0}</done>{1}{2}<size>{3}</size>'
+        '</result></queryResponse>'.format('true' if done else 'false', locator, records, total))
+
+
+def soap_search_result(count, description_size=64):
+    records = ''.join('<searchRecords><record xsi:type="sf:sObject"><sf:type>Account</sf:type>{0}</record>'
+                      '</searchRecords>'.format(soap_fields(make_record(index, description_size)))
+                      for index in xrange(count))
+
+    return SOAP_ENVELOPE.format('<searchResponse><result>{0}</result></searchResponse>'.format(records))
+
+
+def soap_save_results(action, count):
+    results = ''.join('<result><id>001000000{0:06d}AAA</id><success>true</success></result>'.format(index)
+                      for index in xrange(count))
+
+    return SOAP_ENVELOPE.format('<{0}Response>{1}</{0}Response>'.format(action, results))
+
+
+def csv_body(rows):
+    body = StringIO()
+    writer = csv.writer(body, lineterminator='\n')
+
+    for row in rows:
+        writer.writerow(row)
+
+    return body.getvalue()
+
+
+def soap_login_result(server_url, token=TOKEN):
+    return SOAP_ENVELOPE.format(
+        '<loginResponse><result><serverUrl>{0}/services/Soap/u/{1}/00DSTUB</serverUrl>'
+        '<sessionId>{2}</sessionId><userId>005000000000001AAA</userId>'
+        '</result></loginResponse>'.format(server_url, VERSION, token))
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.track(self.connection, True)
+
+    def finish(self):
+        self.server.track(self.connection, False)
+        BaseHTTPServer.BaseHTTPRequestHandler.finish(self)
+
+    def do_HEAD(self):
+        self.read_body()
+        self.reply(200, None)
+
+    def do_GET(self):
+        url = urlparse.urlparse(self.path)
+        self.read_body()
+
+        if self.reply_fault('GET'):
+            return
+
+        if url.path == '/services/data/':
+            return self.reply(200, [{'version': str(VERSION)}])
+
+        if self.reply_expired_session():
+            return
+
+        match = BULK_JOB.search(url.path)
+
+        if match:
+            return self.reply_bulk_results(match.group(2), match.group(3), urlparse.parse_qs(url.query))
+
+        if '/query/01gSTUB-' in url.path:
+            offset = int(url.path.rsplit('-', 1)[1])
+            return self.reply(200, self.server.get_rest_page(offset))
+
+        if url.path.endswith('/query') or url.path.endswith('/queryAll') or \
+           url.path.endswith('/query/') or url.path.endswith('/queryAll/'):
+            return self.reply(200, self.server.get_rest_page(0))
+
+        if '/sobjects/' in url.path:
+            return self.reply(200, make_record(0, self.server.description_size))
+
+        if url.path.endswith('/search/') or url.path.endswith('/search'):
+            return self.reply(200, {'searchRecords': [make_record(index, self.server.description_size)
+                                                      for index in xrange(self.server.search_size)]})
+
+        self.reply(404, [{'errorCode': 'NOT_FOUND', 'message': url.path}])
+
+    def do_POST(self):
+        body = self.read_body()
+        path = urlparse.urlparse(self.path).path
+
+        if self.reply_fault('POST'):
+            return
+
+        if '/services/Soap/' in path:
+            return self.reply_soap(self.headers.get('SOAPAction', ''), body)
+
+        if path.endswith('/services/oauth2/token'):
+            self.server.count('logins', 1)
+            return self.reply(200, {'access_token': self.server.token,
+                                    'instance_url': self.server.url,
+                                    'token_type': 'Bearer'})
+
+        if self.reply_expired_session():
+            return
+
+        match = BULK_JOB.search(path)
+
+        if match:
+            return self.reply(200, self.server.create_job(match.group(1), json.loads(body)))
+
+        if path.endswith('/composite/sobjects'):
+            records = json.loads(body)['records']
+            return self.reply(200, [{'id': '001000000{0:06d}AAA'.format(index), 'success': True, 'errors': []}
+                                    for index in xrange(len(records))])
+
+        self.reply(201, {'id': '001000000000001AAA', 'success': True, 'errors': []})
+
+    def do_PATCH(self):
+        body = self.read_body()
+        path = urlparse.urlparse(self.path).path
+
+        if self.reply_fault('PATCH') or self.reply_expired_session():
+            return
+
+        match = BULK_JOB.search(path)
+
+        if match:
+            return self.reply(200, self.server.set_job_state(match.group(2), json.loads(body)['state']))
+
+        if path.endswith('/composite/sobjects'):
+            return self.reply(200, [{'id': record['Id'], 'success': True, 'errors': []}
+                                    for record in json.loads(body)['records']])
+
+        self.reply(204, None)
+
+    def do_PUT(self):
+        body = self.read_body()
+        path = urlparse.urlparse(self.path).path
+
+        if self.reply_fault('PUT') or self.reply_expired_session():
+            return
+
+        match = BULK_JOB.search(path)
+
+        if match is None or match.group(3) != 'batches':
+            return self.reply(404, [{'errorCode': 'NOT_FOUND', 'message': path}])
+
+        self.server.upload_job(match.group(2), body)
+        self.reply(201, None)
+
+    def do_DELETE(self):
+        self.read_body()
+        url = urlparse.urlparse(self.path)
+
+        if self.reply_fault('DELETE') or self.reply_expired_session():
+            return
+
+        if url.path.endswith('/composite/sobjects'):
+            ids = urlparse.parse_qs(url.query).get('ids', [''])[0].split(',')
+            return self.reply(200, [{'id': record_id, 'success': True, 'errors': []} for record_id in ids])
+
+        self.reply(204, None)
+
+    def reply_fault(self, method):
+        fault = self.server.take_fault(method, self.path)
+
+        if fault is None:
+            return False
+
+        status, body = fault
+        self.reply(status, body, 'text/xml' if isinstance(body, basestring) else 'application/json')
+
+        return True
+
+    def reply_bulk_results(self, job_id, result_name, params):
+        if not result_name:
+            return self.reply(200, self.server.poll_job(job_id))
+
+        if result_name == 'results':
+            offset = int(params.get('locator', ['0'])[0])
+            size = int(params.get('maxRecords', [self.server.page_size])[0])
+            end = min(offset + size, self.server.records)
+            rows = [['Id', 'Name']] + [[record['Id'], record['Name']]
+                                      for record in (make_record(index) for index in xrange(offset, end))]
+
+            return self.reply(200, csv_body(rows), 'text/csv',
+                              [('Sforce-Locator', str(end) if end < self.server.records else 'null')])
+
+        self.reply(200, csv_body(self.server.get_job_results(job_id, result_name)), 'text/csv')
+
+    def reply_expired_session(self):
+        if self.headers.get('Authorization') == 'Bearer ' + self.server.token:
+            return False
+
+        self.reply(401, [{'errorCode': 'INVALID_SESSION_ID', 'message': 'Session expired or invalid'}])
+
+        return True
+
+    def reply_soap(self, action, body):
+        if action == 'login':
+            self.server.count('logins', 1)
+            return self.reply(200, soap_login_result(self.server.url, self.server.token), 'text/xml')
+
+        match = SESSION_ID.search(body)
+
+        if match is None or match.group(1) != self.server.token:
+            return self.reply(500, SOAP_ENVELOPE.format(
+                '<soapenv:Fault><faultcode>sf:INVALID_SESSION_ID</faultcode>'
+                '<faultstring>INVALID_SESSION_ID: Invalid Session ID found in SessionHeader</faultstring>'
+                '</soapenv:Fault>'), 'text/xml')
+
+        if action in ('query', 'queryAll', 'queryMore'):
+            match = LOCATOR.search(body)
+            offset = int(match.group(1).rsplit('-', 1)[1]) if match else 0
+            return self.reply(200, self.server.get_soap_page(offset), 'text/xml')
+
+        if action == 'search':
+            return self.reply(200, soap_search_result(self.server.search_size, self.server.description_size),
+                              'text/xml')
+
+        if action in ('create', 'update'):
+            return self.reply(200, soap_save_results(action, len(SOBJECT.findall(body))), 'text/xml')
+
+        if action == 'delete':
+            return self.reply(200, soap_save_results(action, len(ID.findall(body))), 'text/xml')
+
+        self.reply(500, SOAP_ENVELOPE.format('<soapenv:Fault><faultstring>{0}</faultstring></soapenv:Fault>'
+                                             .format(action)), 'text/xml')
+
+    def read_body(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            chunks = []
+
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+
+                if size == 0:
+                    self.rfile.readline()
+                    break
+
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+
+            body = ''.join(chunks)
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        self.server.count('bytes_in', len(body) + len(str(self.headers)))
+
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+
+        return body
+
+    def reply(self, status, body, content_type='application/json', extra_headers=()):
+        if body is None:
+            body = ''
+        elif not isinstance(body, basestring):
+            if self.headers.get('X-PrettyPrint'):
+                body = json.dumps(body, indent=4, separators=(',', ' : '))
+            else:
+                body = json.dumps(body, separators=(',', ':'))
+
+        if isinstance(body, unicode):
+            body = body.encode('utf-8')
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        headers = [('Content-Type', content_type),
+                   ('Sforce-Limit-Info', 'api-usage=10/15000')]
+        headers.extend(extra_headers)
+
+        if body and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            headers.append(('Content-Encoding', 'gzip'))
+
+        # Counted before replying, so a client that has its response sees it in stats
+        self.server.count('requests', 1)
+        self.server.count('bytes_out', len(body) + sum(len(name) + len(value) + 4 for name, value in headers))
+
+        self.send_response(status)
+
+        for name, value in headers:
+            self.send_header(name, value)
+
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, records=2000, page_size=2000, latency=0.0, description_size=64, search_size=20):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+
+        self.records = records
+        self.page_size = page_size
+        self.latency = latency
+        self.description_size = description_size
+        self.search_size = search_size
+        self.token = TOKEN
+        self.sessions = 0
+        self.stats = {}
+        self.__lock = threading.Lock()
+        self.__pages = {}
+        self.__faults = []
+        self.__connections = set()
+        self.jobs = []
+        self.job_polls = 1
+        self.failed_jobs = set()
+        self.reset_stats()
+
+        self.__thread = threading.Thread(target=self.serve_forever)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{0}'.format(self.server_port)
+
+    def get_rest_page(self, offset):
+        key = ('rest', offset, self.records, self.page_size, self.description_size)
+
+        if key not in self.__pages:
+            self.__pages[key] = rest_page(offset, self.records, self.page_size,
+                                          description_size=self.description_size)
+
+        return self.__pages[key]
+
+    def get_soap_page(self, offset):
+        key = ('soap', offset, self.records, self.page_size, self.description_size)
+
+        if key not in self.__pages:
+            self.__pages[key] = soap_page(offset, self.records, self.page_size, self.description_size)
+
+        return self.__pages[key]
+
+    def fail(self, method, path, status, body, after=0, times=1):
+        with self.__lock:
+            self.__faults.append({'method': method,
+                                  'path': path,
+                                  'status': status,
+                                  'body': body,
+                                  'after': after,
+                                  'times': times})
+
+    def take_fault(self, method, path):
+        with self.__lock:
+            for fault in self.__faults:
+                if fault['method'] != method or fault['path'] not in path or not fault['times']:
+                    continue
+
+                if fault['after']:
+                    fault['after'] -= 1
+                    return None
+
+                fault['times'] -= 1
+                return fault['status'], fault['body']
+
+        return None
+
+    def clear_faults(self):
+        with self.__lock:
+            self.__faults = []
+
+    def create_job(self, job_type, data):
+        with self.__lock:
+            info = dict(data,
+                        id='750STUB{0:011d}'.format(len(self.jobs)),
+                        jobType=job_type,
+                        state='Open' if job_type == 'ingest' else 'UploadComplete')
+            self.jobs.append({'info': info, 'uploads': [], 'polls': 0})
+
+            return dict(info)
+
+    def get_job(self, job_id):
+        return self.jobs[int(job_id[len('750STUB'):])]
+
+    def upload_job(self, job_id, body):
+        with self.__lock:
+            self.get_job(job_id)['uploads'].append(body)
+
+    def set_job_state(self, job_id, state):
+        with self.__lock:
+            info = self.get_job(job_id)['info']
+            info['state'] = state
+
+            return dict(info)
+
+    def poll_job(self, job_id):
+        with self.__lock:
+            job = self.get_job(job_id)
+            info = job['info']
+
+            if info['state'] in ('UploadComplete', 'InProgress'):
+                job['polls'] += 1
+
+                if job['polls'] <= self.job_polls:
+                    info['state'] = 'InProgress'
+                elif self.jobs.index(job) in self.failed_jobs:
+                    info['state'] = 'Failed'
+                    info['errorMessage'] = 'InvalidBatch : Field name not found'
+                else:
+                    info['state'] = 'JobComplete'
+
+            return dict(info)
+
+    def get_job_results(self, job_id, result_name):
+        job = self.get_job(job_id)
+        rows = list(csv.reader(StringIO(''.join(job['uploads']))))
+        header = rows[0] if rows else []
+        records = rows[1:]
+        failed = job['info']['state'] == 'Failed'
+
+        if result_name == 'successfulResults':
+            return [['sf__Id', 'sf__Created'] + header] + \
+                [['001000000{0:06d}AAA'.format(index), 'true'] + record
+                 for index, record in enumerate(records if not failed else [])]
+
+        if result_name == 'failedResults':
+            return [['sf__Id', 'sf__Error'] + header] + \
+                [['', 'INVALID_FIELD:Field name not found'] + record for record in (records if failed else [])]
+
+        return [header]
+
+    def expire_session(self):
+        with self.__lock:
+            self.sessions += 1
+            self.token = '{0}{1}'.format(TOKEN, self.sessions)
+
+    def count(self, name, value):
+        with self.__lock:
+            self.stats[name] += value
+
+    def reset_stats(self):
+        with self.__lock:
+            self.stats = {'requests': 0, 'bytes_in': 0, 'bytes_out': 0, 'logins': 0}
+
+    def track(self, connection, opened):
+        with self.__lock:
+            if opened:
+                self.__connections.add(connection)
+            else:
+                self.__connections.discard(connection)
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+        # Keep-alive handlers would otherwise wait on their sockets until exit
+        with self.__lock:
+            connections, self.__connections = self.__connections, set()
+
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+
+def get_client(server, soap=False, **kwargs):
+    return connect(server.url, server.token, soap, **kwargs)
+
+
+def connect(url, token=TOKEN, soap=False, **kwargs):
+    token_store = MemoryTokenStore()
+    auth = Authentication(token, url)
+    token_store.set('login:{0}:{1}'.format(CLIENT_ID, USERNAME), auth)
+    token_store.set('login:{0}'.format(USERNAME), auth)
+
+    client = Salesforce(version=VERSION, soap=soap, token_store=token_store, **kwargs)
+    client.authenticate(client_id=CLIENT_ID,
+                        client_secret='secret',
+                        username=USERNAME,
+                        password='password')
+
+    return client
+
+
+@contextmanager
+def stub_logins(server):
+    rest_site = LoginWithRestAPI.AUTH_SITE
+    soap_site = LoginWithSoapAPI.AUTH_SITE
+
+    LoginWithRestAPI.AUTH_SITE = server.url
+    LoginWithSoapAPI.AUTH_SITE = server.url + '/services/Soap/u/{version}'
+
+    try:
+        yield
+    finally:
+        LoginWithRestAPI.AUTH_SITE = rest_site
+        LoginWithSoapAPI.AUTH_SITE = soap_site
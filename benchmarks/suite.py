@@ -0,0 +1,343 @@
+from StringIO import StringIO
+import argparse
+import json
+import platform
+import sys
+import time
+
+from stubServer import StubServer, get_client, make_record, soap_page, soap_save_results, \
+    stub_logins, CLIENT_ID, TOKEN, USERNAME
+from salesforce import Salesforce
+from salesforce.soapParser import SoapQueryResult, iter_save_results
+from salesforce.soapEnvelope import SoapEnvelope
+from salesforce.httpClient import Requests
+import salesforce.utils as utils
+
+QUERY = 'SELECT Id, Name, Industry, AnnualRevenue, Description, Owner.Name FROM Account'
+
+BENCHMARKS = []
+
+
+def benchmark(name, unit='ops', repeat=5, server=True):
+    def register(func):
+        BENCHMARKS.append({'name': name,
+                           'func': func,
+                           'unit': unit,
+                           'repeat': repeat,
+                           'server': server})
+        return func
+
+    return register
+
+
+def new_records(count):
+    return [{'Name': 'Account {0}'.format(index),
+             'Industry': 'Banking',
+             'Description': make_record(index)['Description']}
+            for index in xrange(count)]
+
+
+@benchmark('rest.query_all', unit='records')
+def rest_query_all(context):
+    return len(context['rest'].query_all(QUERY)['records'])
+
+
+@benchmark('rest.query_iter.prefetch', unit='records')
+def rest_query_iter(context):
+    return sum(1 for _ in context['rest'].query_iter(QUERY, prefetch=2))
+
+
+@benchmark('rest.query_more', unit='pages')
+def rest_query_more(context):
+    client = context['rest']
+    page = client.query(QUERY)
+    pages = 1
+
+    while not page['done']:
+        page = client.query_more(page['nextRecordsUrl'])
+        pages += 1
+
+    return pages
+
+
+@benchmark('rest.search', unit='requests')
+def rest_search(context):
+    for _ in xrange(20):
+        context['rest'].search('FIND {Account}')
+
+    return 20
+
+
+@benchmark('rest.get.single', unit='requests')
+def rest_get_single(context):
+    for _ in xrange(context['crud_size']):
+        context['rest'].Account.get('/001000000000001AAA')
+
+    return context['crud_size']
+
+
+@benchmark('rest.create.single', unit='records')
+def rest_create_single(context):
+    for record in new_records(context['crud_size']):
+        context['rest'].Account.create(record)
+
+    return context['crud_size']
+
+
+@benchmark('rest.create.batched', unit='records')
+def rest_create_batched(context):
+    return len(context['rest'].Account.create(new_records(context['crud_size'])))
+
+
+@benchmark('rest.update.single', unit='records')
+def rest_update_single(context):
+    for index, record in enumerate(new_records(context['crud_size'])):
+        context['rest'].Account.update(['001000000{0:06d}AAA'.format(index), record])
+
+    return context['crud_size']
+
+
+@benchmark('rest.update.batched', unit='records')
+def rest_update_batched(context):
+    records = [['001000000{0:06d}AAA'.format(index), record]
+               for index, record in enumerate(new_records(context['crud_size']))]
+
+    context['rest'].Account.update(records)
+
+    return context['crud_size']
+
+
+@benchmark('rest.delete.single', unit='records')
+def rest_delete_single(context):
+    for index in xrange(context['crud_size']):
+        context['rest'].Account.delete('001000000{0:06d}AAA'.format(index))
+
+    return context['crud_size']
+
+
+@benchmark('rest.delete.batched', unit='records')
+def rest_delete_batched(context):
+    context['rest'].Account.delete(['001000000{0:06d}AAA'.format(index)
+                                    for index in xrange(context['crud_size'])])
+
+    return context['crud_size']
+
+
+@benchmark('rest.login', unit='logins')
+def rest_login(context):
+    with stub_logins(context['server']):
+        for _ in xrange(10):
+            Salesforce(version=context['version']).authenticate(client_id=CLIENT_ID,
+                                                                client_secret='secret',
+                                                                username=USERNAME,
+                                                                password='password')
+
+    return 10
+
+
+@benchmark('soap.login', unit='logins')
+def soap_login(context):
+    with stub_logins(context['server']):
+        for _ in xrange(10):
+            Salesforce(version=context['version'], soap=True).authenticate(username=USERNAME,
+                                                                           password='password')
+
+    return 10
+
+
+@benchmark('soap.query_all', unit='records')
+def soap_query_all(context):
+    return len(context['soap'].query_all(QUERY)['records'])
+
+
+@benchmark('soap.search', unit='requests')
+def soap_search(context):
+    for _ in xrange(20):
+        context['soap'].search('FIND {Account}')
+
+    return 20
+
+
+@benchmark('soap.create.batched', unit='records')
+def soap_create_batched(context):
+    return len(context['soap'].Account.create(new_records(context['crud_size'])))
+
+
+@benchmark('soap.create.streamed', unit='records')
+def soap_create_streamed(context):
+    return len(context['soap_streamed'].Account.create(new_records(context['crud_size'])))
+
+
+@benchmark('soap.create.single', unit='records')
+def soap_create_single(context):
+    for record in new_records(context['crud_size'] // 10):
+        context['soap'].Account.create([record])
+
+    return context['crud_size'] // 10
+
+
+@benchmark('soap.envelope.create', unit='records', server=False)
+def soap_envelope_create(context):
+    records = context['envelope_records']
+    body = utils.get_soap_create_body('Account', records)
+    context['envelope'].build(TOKEN, 'create', body)
+
+    return len(records)
+
+
+@benchmark('soap.envelope.query', unit='envelopes', server=False)
+def soap_envelope_query(context):
+    envelope = context['envelope']
+
+    for _ in xrange(1000):
+        envelope.build(TOKEN, 'query', utils.get_soap_query_body(QUERY))
+
+    return 1000
+
+
+@benchmark('soap.parse.query', unit='records', server=False)
+def soap_parse_query(context):
+    return len(SoapQueryResult(StringIO(context['soap_page'])).to_page()['records'])
+
+
+@benchmark('soap.parse.save', unit='results', server=False)
+def soap_parse_save(context):
+    return sum(1 for _ in iter_save_results(StringIO(context['save_results'])))
+
+
+def get_context(options, server):
+    context = {'version': 37.0,
+               'crud_size': options.crud_size,
+               'server': server,
+               'envelope': SoapEnvelope(),
+               'envelope_records': new_records(200),
+               'soap_page': soap_page(0, options.page_size, options.page_size, options.description_size),
+               'save_results': soap_save_results('create', 200)}
+
+    if server is not None:
+        context['rest'] = get_client(server)
+        context['soap'] = get_client(server, soap=True)
+        context['soap_streamed'] = get_client(server, soap=True, httplib=Requests(stream_soap_requests=True))
+
+    return context
+
+
+def measure(entry, context, repeat, warmup=1):
+    for _ in xrange(warmup):
+        entry['func'](context)
+
+    samples = []
+    units = 0
+
+    for _ in xrange(repeat):
+        started = time.time()
+        units = entry['func'](context)
+        samples.append(time.time() - started)
+
+    samples.sort()
+    total = sum(samples)
+
+    return {'name': entry['name'],
+            'unit': entry['unit'],
+            'units_per_run': units,
+            'runs': repeat,
+            'mean': total / repeat,
+            'median': samples[repeat // 2],
+            'min': samples[0],
+            'max': samples[-1],
+            'p95': samples[min(repeat - 1, int(repeat * 0.95))],
+            'throughput': units * repeat / total if total else None}
+
+
+def run(options):
+    selected = [entry for entry in BENCHMARKS
+                if not options.filter or any(pattern in entry['name'] for pattern in options.filter)]
+    server = None
+
+    if any(entry['server'] for entry in selected):
+        server = StubServer(records=options.records,
+                            page_size=options.page_size,
+                            latency=options.latency,
+                            description_size=options.description_size)
+
+    try:
+        context = get_context(options, server)
+        results = []
+
+        for entry in selected:
+            if server is not None:
+                server.reset_stats()
+
+            result = measure(entry, context, options.repeat or entry['repeat'])
+
+            if entry['server']:
+                result['requests_per_run'] = server.stats['requests'] // (result['runs'] + 1)
+
+            results.append(result)
+
+            if not options.quiet:
+                print >>sys.stderr, '{0:<28} {1:>10.2f} ms {2:>12.1f} {3}/s'.format(
+                    result['name'], result['median'] * 1000, result['throughput'] or 0, result['unit'])
+    finally:
+        if server is not None:
+            server.close()
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'config': {'records': options.records,
+                       'page_size': options.page_size,
+                       'latency': options.latency,
+                       'description_size': options.description_size,
+                       'crud_size': options.crud_size},
+            'results': results}
+
+
+def compare(report, baseline):
+    previous = dict((result['name'], result) for result in baseline['results'])
+
+    for result in report['results']:
+        before = previous.get(result['name'])
+
+        if before is None or not before['median']:
+            continue
+
+        change = (result['median'] - before['median']) / before['median'] * 100
+
+        print >>sys.stderr, '{0:<28} {1:>10.2f} ms -> {2:>10.2f} ms {3:>+8.1f}%'.format(
+            result['name'], before['median'] * 1000, result['median'] * 1000, change)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description='Run the offline benchmark suite against a local stub server.')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='JSON report to compare against')
+    parser.add_argument('--filter', action='append', help='only run benchmarks whose name contains this')
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every stub response')
+    parser.add_argument('--description-size', type=int, default=64, help='characters per Description field')
+    parser.add_argument('--crud-size', type=int, default=400)
+    parser.add_argument('--repeat', type=int, help='runs per benchmark')
+    parser.add_argument('--quiet', action='store_true')
+
+    return parser
+
+
+def main(argv):
+    options = get_parser().parse_args(argv)
+    report = run(options)
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+import json
+import sys
+import time
+
+from stubServer import StubServer, get_client, make_record
+from salesforce.httpClient import Requests
+
+QUERY = 'SELECT Id, Name, Industry, Description FROM Account'
+
+
+def run_rest_query(client):
+    return len(client.query_all(QUERY)['records'])
+
+
+def run_rest_create(client):
+    records = [dict((name, value) for name, value in make_record(index).items()
+                    if name not in ('attributes', 'Id', 'Owner'))
+               for index in xrange(1000)]
+
+    return len(client.Account.create(records))
+
+
+def run_soap_query(client):
+    return len(client.query_all(QUERY, soap=True)['records'])
+
+
+def run_soap_create(client):
+    records = [{'Name': 'Account {0}'.format(index),
+                'Description': make_record(index)['Description']}
+               for index in xrange(1000)]
+
+    return len(client.Account.create(records, soap=True))
+
+
+SCENARIOS = (('rest_query', run_rest_query),
+             ('rest_create', run_rest_create),
+             ('soap_query', run_soap_query),
+             ('soap_create', run_soap_create))
+
+
+def measure(server, wire_efficient, scenario, rounds):
+    client = get_client(server, httplib=Requests(wire_efficient=wire_efficient))
+    scenario(client)
+    server.reset_stats()
+
+    started = time.time()
+
+    for _ in xrange(rounds):
+        scenario(client)
+
+    elapsed = time.time() - started
+    stats = dict(server.stats)
+
+    return {'seconds': elapsed / rounds,
+            'requests': stats['requests'] / rounds,
+            'bytes_in': stats['bytes_in'] / rounds,
+            'bytes_out': stats['bytes_out'] / rounds}
+
+
+def run(records=10000, rounds=5):
+    server = StubServer(records=records)
+    results = []
+
+    try:
+        for name, scenario in SCENARIOS:
+            for wire_efficient in (False, True):
+                result = measure(server, wire_efficient, scenario, rounds)
+                result['scenario'] = name
+                result['mode'] = 'wire_efficient' if wire_efficient else 'default'
+                results.append(result)
+    finally:
+        server.close()
+
+    return results
+
+
+def main(argv):
+    results = run()
+
+    if '--json' in argv:
+        json.dump(results, sys.stdout, indent=2)
+        return
+
+    print '{0:<12} {1:<15} {2:>10} {3:>12} {4:>12}'.format(
+        'scenario', 'mode', 'ms', 'bytes sent', 'bytes recv')
+
+    for result in results:
+        print '{0:<12} {1:<15} {2:>10.1f} {3:>12} {4:>12}'.format(
+            result['scenario'], result['mode'], result['seconds'] * 1000,
+            result['bytes_in'], result['bytes_out'])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,2 +1,3 @@
 from salesforce.api import Salesforce
-from salesforce.exception import RequestFailed
\ No newline at end of file
+from salesforce.asyncApi import AsyncSalesforce
+from salesforce.exception import RequestFailed, CollectionRequestFailed, BulkIngestFailed, ApiBudgetExhausted
\ No newline at end of file
@@ -1,9 +1,15 @@
 from salesforceSoapApi import SalesforceSoapAPI
 from salesforceRestApi import SalesforceRestAPI
-from version import Version
+from version import Version, VersionResolver
+from bulkApi import BulkAPI
+from parallelQuery import ParallelQuery
+from compactRecord import RecordCompactor
+from columnar import build_columns, get_soql_fields, get_describe_kinds
 from httpClient import HTTPConnection
 from httpClient import Requests
+from jsonCodec import get_json_codec
 from urlResources import RestUrlResources, SoapUrlResources
+import threading
 import utils
 
 
@@ -12,18 +18,31 @@ class Salesforce(object):
         super(Salesforce, self).__init__()
 
         self.__api = None
+        self.__apis = {}
+        self.__facades = {}
+        self.__lock = threading.RLock()
 
         self.__sandbox = None
         self.__soap = None
         self.__httplib = None
         self.__version = None
+        self.__version_resolver = None
         self.__domain = None
 
         self.sandbox = kwargs.get('sandbox', False)
         self.soap = kwargs.get('soap', False)
         self.httplib = kwargs.get('httplib', Requests())
+        self.throttle = kwargs.get('throttle', self.httplib.throttle)
+        self.json_codec = kwargs.get('json_codec', self.httplib.json_codec)
         self.domain = kwargs.get('domain', 'test' if self.sandbox else 'login')
-        self.version = kwargs.get('version', Version.get_latest_version(self.httplib))
+        self.version = kwargs.get('version')
+        self.token_store = kwargs.get('token_store')
+        self.describe_cache = kwargs.get('describe_cache')
+
+        self.__version_resolver = VersionResolver(
+            self.httplib,
+            kwargs.get('version_cache'),
+            kwargs.get('version_cache_ttl', Version.CACHE_TTL))
 
         self.__api = self.__get_api(self.soap)
 
@@ -31,19 +50,53 @@ class Salesforce(object):
         return self.__get_api(False).get_auth_uri(**kwargs)
 
     def authenticate(self, soap=None, **kwargs):
-        self.__api.auth = self.__get_api(soap).authenticate(**kwargs)
+        auth = self.__get_api(soap).authenticate(**kwargs)
+
+        with self.__lock:
+            self.__api.auth = auth
+            self.__clear_caches()
+
+        if self.httplib.preconnect_on_auth:
+            self.httplib.preconnect(auth.instance_url)
+
+    def query(self, query_string, soap=None, compact=False):
+        return _compact_result(self.__get_api(soap).query(query_string), compact)
+
+    def query_all(self, query_string, soap=None, compact=False):
+        api = self.__get_api(soap)
+
+        if compact:
+            return RecordCompactor().compact_all(api.query_pages(query_string, include_deleted=True))
+
+        return api.query_all(query_string)
+
+    def query_more(self, query_url, soap=None, compact=False):
+        return _compact_result(self.__get_api(soap).query_more(query_url), compact)
+
+    def query_iter(self, query_string, include_deleted=False, prefetch=0, soap=None, compact=False):
+        records = self.__get_api(soap).query_iter(query_string, include_deleted, prefetch)
+
+        return RecordCompactor().compact_records(records) if compact else records
 
-    def query(self, query_string, soap=None):
-        return self.__get_api(soap).query(query_string)
+    def query_pages(self, query_string, include_deleted=False, prefetch=0, soap=None, compact=False):
+        pages = self.__get_api(soap).query_pages(query_string, include_deleted, prefetch)
 
-    def query_all(self, query_string, soap=None):
-        return self.__get_api(soap).query_all(query_string)
+        return RecordCompactor().compact_pages(pages) if compact else pages
 
-    def query_more(self, query_url, soap=None):
-        return self.__get_api(soap).query_more(query_url)
+    def query_columns(self, query_string, sobject=None, kinds=None, include_deleted=False,
+                      prefetch=0, soap=None, writer=None):
+        if kinds is None and sobject is not None:
+            kinds = get_describe_kinds(self.__get_api(False).__getattr__(sobject).describe())
 
-    def search(self, search_string, soap=None):
-        return self.__get_api(soap).search(search_string)
+        pages = self.__get_api(soap).query_pages(query_string, include_deleted, prefetch)
+
+        return build_columns(pages, get_soql_fields(query_string), kinds, writer)
+
+    def query_parallel(self, sobject, fields=None, where=None, soap=None, **kwargs):
+        return ParallelQuery(self.__get_api(soap), sobject, fields or ['Id'], where, **kwargs)
+
+    def search(self, search_string, soap=None, compact=False):
+        return _compact_result(self.__get_api(soap).search(search_string), compact)
 
     def get(self, get_url, params=None, soap=None, **kwargs):
         return self.__get_api(soap).get(get_url, params)
@@ -51,12 +104,28 @@ class Salesforce(object):
     def post(self, post_url, data, soap=None):
         return self.__get_api(soap).post(post_url, data)
 
+    @property
+    def bulk(self):
+        api = self.__get_api(False)
+
+        return BulkAPI(api.httplib, api.auth, api.url_resources)
+
     def __getattr__(self, name):
         if not name[0].isalpha():
             return super(Salesforce, self).__getattribute__(name)
 
-        return SObjectFacade(
-            name, self.__api, self.domain, self.sandbox, self.version, self.soap)
+        facade = self.__facades.get(name)
+
+        if facade is None:
+            version = self.version
+
+            with self.__lock:
+                facade = SObjectFacade(
+                    name, self.__api, self.domain, self.sandbox, version, self.soap)
+
+                self.__facades[name] = facade
+
+        return facade
 
     @property
     def sandbox(self):
@@ -66,11 +135,14 @@ class Salesforce(object):
     def sandbox(self, sandbox):
         utils.validate_boolean_input(sandbox, 'sanbox')
 
-        self.__sandbox = sandbox
+        with self.__lock:
+            self.__sandbox = sandbox
 
-        if self.__api is not None:
-            self.__api.url_resources.sandbox = sandbox
-            self.__api.url_resources.domain = 'test' if self.sandbox else 'login'
+            if self.__api is not None:
+                self.__api.url_resources.sandbox = sandbox
+                self.__api.url_resources.domain = 'test' if self.sandbox else 'login'
+
+            self.__clear_caches()
 
     @property
     def soap(self):
@@ -80,10 +152,12 @@ class Salesforce(object):
     def soap(self, soap):
         utils.validate_boolean_input(soap, 'soap')
 
-        if self.__api is not None:
-            self.__api = self.__get_api(soap)
+        with self.__lock:
+            if self.__api is not None:
+                self.__api = self.__get_api(soap)
 
-        self.__soap = soap
+            self.__soap = soap
+            self.__clear_caches()
 
     @property
     def httplib(self):
@@ -94,58 +168,135 @@ class Salesforce(object):
         if not isinstance(httplib, HTTPConnection):
             raise TypeError("Must be a subclass of HTTPConnection!")
 
-        self.__httplib = httplib
+        with self.__lock:
+            self.__httplib = httplib
+
+            if self.__version_resolver is not None:
+                self.__version_resolver.httplib = httplib
+
+            if self.__api is not None:
+                self.__api.httplib = httplib
+
+            self.__clear_caches()
+
+    @property
+    def api_usage(self):
+        return self.httplib.api_usage
+
+    @property
+    def throttle(self):
+        return self.httplib.throttle
+
+    @throttle.setter
+    def throttle(self, throttle):
+        self.httplib.throttle = throttle
+
+    @property
+    def json_codec(self):
+        return self.httplib.json_codec
 
-        if self.__api is not None:
-            self.__api.httplib = httplib
+    @json_codec.setter
+    def json_codec(self, json_codec):
+        self.httplib.json_codec = get_json_codec(json_codec)
 
     @property
     def version(self):
-        return self.__version
+        version = self.__version
+
+        if version is None:
+            auth = None if self.__api is None else self.__api.auth
+            instance_url = auth.instance_url if auth is not None else None
+            version = self.__version_resolver(instance_url)
+
+            with self.__lock:
+                if self.__version is None:
+                    self.version = version
+
+                version = self.__version
+
+        return version
 
     @version.setter
     def version(self, version):
+        if version is None:
+            with self.__lock:
+                self.__version = None
+                self.__clear_caches()
+
+            return
+
         try:
             round_version = round(version, 1)
         except TypeError:
             raise TypeError('Version should be a number!')
 
-        self.__version = round_version
+        with self.__lock:
+            self.__version = round_version
 
-        if self.__api is not None:
-            self.__api.url_resources.version = round_version
+            if self.__api is not None:
+                self.__api.url_resources.version = round_version
+
+            self.__clear_caches()
 
     def __getstate__(self):
-        return self.__dict__
+        state = self.__dict__.copy()
+        del state['_Salesforce__lock']
+
+        return state
 
     def __setstate__(self, d):
         self.__dict__.update(d)
+        self.__lock = threading.RLock()
+
+    def __clear_caches(self):
+        self.__apis = {}
+        self.__facades = {}
 
     def __get_api(self, soap):
+        with self.__lock:
+            current_soap = self.soap
+            current_api = self.__api
+            apis = self.__apis
+
         if soap is None:
-            soap = self.soap
+            soap = current_soap
 
-        if soap == self.soap and self.__api is not None:
-            return self.__api
-        else:
-            auth = None if self.__api is None else self.__api.auth
+        if soap == current_soap and current_api is not None:
+            return current_api
+
+        api = apis.get(soap)
+
+        if api is None:
+            api = apis[soap] = self.__new_api(soap, current_api)
+
+        return api
 
-            if soap:
-                url_resources = SoapUrlResources(self.domain, self.sandbox, self.version)
-                return SalesforceSoapAPI(url_resources=url_resources,
-                                         httplib=self.httplib,
-                                         auth=auth)
-            else:
-                url_resources = RestUrlResources(self.domain, self.sandbox, self.version)
-                return SalesforceRestAPI(url_resources=url_resources,
-                                         httplib=self.httplib,
-                                         auth=auth)
+    def __new_api(self, soap, current_api):
+        auth = None if current_api is None else current_api.auth
+
+        if soap:
+            url_resources = SoapUrlResources(self.domain, self.sandbox, self.__version,
+                                             self.__version_resolver)
+            return SalesforceSoapAPI(url_resources=url_resources,
+                                     httplib=self.httplib,
+                                     auth=auth,
+                                     token_store=self.token_store,
+                                     describe_cache=self.describe_cache)
+        else:
+            url_resources = RestUrlResources(self.domain, self.sandbox, self.__version,
+                                             self.__version_resolver)
+            return SalesforceRestAPI(url_resources=url_resources,
+                                     httplib=self.httplib,
+                                     auth=auth,
+                                     token_store=self.token_store,
+                                     describe_cache=self.describe_cache)
 
 
 class SObjectFacade(object):
     def __init__(self, name, api, domain, sandbox, version, soap):
         super(SObjectFacade, self).__init__()
         self.__api = api
+        self.__apis = {}
 
         self.name = name
         self.domain = domain
@@ -156,14 +307,14 @@ class SObjectFacade(object):
     def describe(self, soap=None):
         return self.__get_api(soap).__getattr__(self.name).describe()
 
-    def create(self, data, soap=None):
-        return self.__get_api(soap).__getattr__(self.name).create(data)
+    def create(self, data, soap=None, **kwargs):
+        return self.__get_api(soap).__getattr__(self.name).create(data, **kwargs)
 
-    def update(self, data, soap=None):
-        return self.__get_api(soap).__getattr__(self.name).update(data)
+    def update(self, data, soap=None, **kwargs):
+        return self.__get_api(soap).__getattr__(self.name).update(data, **kwargs)
 
-    def delete(self, record_id, soap=None):
-        return self.__get_api(soap).__getattr__(self.name).delete(record_id)
+    def delete(self, record_id, soap=None, **kwargs):
+        return self.__get_api(soap).__getattr__(self.name).delete(record_id, **kwargs)
 
     def post(self, data, record_id=None, soap=None):
         return self.__get_api(soap).__getattr__(self.name).post(data, record_id)
@@ -171,20 +322,100 @@ class SObjectFacade(object):
     def get(self, record_id=None, params=None, soap=None):
         return self.__get_api(soap).__getattr__(self.name).get(record_id, params)
 
+    def query_iter(self, fields=None, where=None, include_deleted=False, prefetch=0, soap=None,
+                   compact=False):
+        query_string = utils.get_soql(self.name, fields or ['Id'], where)
+        records = self.__get_api(soap).query_iter(query_string, include_deleted, prefetch)
+
+        return RecordCompactor().compact_records(records) if compact else records
+
+    def query_pages(self, fields=None, where=None, include_deleted=False, prefetch=0, soap=None,
+                    compact=False):
+        query_string = utils.get_soql(self.name, fields or ['Id'], where)
+        pages = self.__get_api(soap).query_pages(query_string, include_deleted, prefetch)
+
+        return RecordCompactor().compact_pages(pages) if compact else pages
+
+    def query_columns(self, fields=None, where=None, kinds=None, include_deleted=False,
+                      prefetch=0, soap=None, writer=None):
+        fields = fields or ['Id']
+        query_string = utils.get_soql(self.name, fields, where)
+
+        if kinds is None:
+            kinds = get_describe_kinds(self.describe(soap=False))
+
+        pages = self.__get_api(soap).query_pages(query_string, include_deleted, prefetch)
+
+        return build_columns(pages, fields, kinds, writer)
+
+    def query_parallel(self, fields=None, where=None, soap=None, **kwargs):
+        return ParallelQuery(self.__get_api(soap), self.name, fields or ['Id'], where, **kwargs)
+
+    def bulk_insert(self, records, **kwargs):
+        return self.__get_bulk_api().ingest(self.name, 'insert', records, **kwargs)
+
+    def bulk_update(self, records, **kwargs):
+        return self.__get_bulk_api().ingest(self.name, 'update', records, **kwargs)
+
+    def bulk_upsert(self, records, external_id_field, **kwargs):
+        return self.__get_bulk_api().ingest(self.name, 'upsert', records,
+                                            external_id_field=external_id_field, **kwargs)
+
+    def bulk_delete(self, records, **kwargs):
+        return self.__get_bulk_api().ingest(self.name, 'delete', records, **kwargs)
+
+    def bulk_query(self, fields=None, where=None, **kwargs):
+        query_string = utils.get_soql(self.name, fields or ['Id'], where)
+
+        return self.__get_bulk_api().query(query_string, **kwargs)
+
+    def __get_bulk_api(self):
+        api = self.__get_api(False)
+
+        return BulkAPI(api.httplib, api.auth, api.url_resources)
+
     def __get_api(self, soap):
         if soap is None:
             soap = self.soap
 
         if soap == self.soap and self.__api is not None:
             return self.__api
+
+        api = self.__apis.get(soap)
+
+        if api is None or api.auth is not self.__api.auth or api.httplib is not self.__api.httplib:
+            api = self.__apis[soap] = self.__new_api(soap)
+
+        return api
+
+    def __new_api(self, soap):
+        if soap:
+            url_resources = SoapUrlResources(self.domain, self.sandbox, self.version)
+            return SalesforceSoapAPI(url_resources=url_resources,
+                                     httplib=self.__api.httplib,
+                                     auth=self.__api.auth,
+                                     token_store=self.__api.token_store,
+                                     describe_cache=self.__api.describe_cache)
         else:
-            if soap:
-                url_resources = SoapUrlResources(self.domain, self.sandbox, self.version)
-                return SalesforceSoapAPI(url_resources=url_resources,
-                                         httplib=self.__api.httplib,
-                                         auth=self.__api.auth)
-            else:
-                url_resources = RestUrlResources(self.domain, self.sandbox, self.version)
-                return SalesforceRestAPI(url_resources=url_resources,
-                                         httplib=self.__api.httplib,
-                                         auth=self.__api.auth)
+            url_resources = RestUrlResources(self.domain, self.sandbox, self.version)
+            return SalesforceRestAPI(url_resources=url_resources,
+                                     httplib=self.__api.httplib,
+                                     auth=self.__api.auth,
+                                     token_store=self.__api.token_store,
+                                     describe_cache=self.__api.describe_cache)
+
+
+def _compact_result(result, compact):
+    if not compact:
+        return result
+
+    if isinstance(result, list):
+        return list(RecordCompactor().compact_records(result))
+
+    if not isinstance(result, dict):
+        return result
+
+    if 'searchRecords' in result:
+        return RecordCompactor().compact_search(result)
+
+    return RecordCompactor().compact_page(result)
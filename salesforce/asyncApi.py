@@ -0,0 +1,134 @@
+from api import Salesforce
+from executor import Executor, Future
+import sys
+import threading
+
+
+class AsyncQueryCursor(object):
+    def __init__(self, executor, pages):
+        super(AsyncQueryCursor, self).__init__()
+
+        self.__executor = executor
+        self.__pages = pages
+        self.__last = None
+        self.__exc_info = None
+        self.__lock = threading.Lock()
+
+    def fetch_next(self):
+        future = Future()
+
+        with self.__lock:
+            previous, self.__last = self.__last, future
+
+        def fetch(_=None):
+            # A generator that raised is finished; report its error again
+            # rather than an exhausted cursor
+            if self.__exc_info is not None:
+                future.set_exc_info(self.__exc_info)
+                return
+
+            pending = self.__executor.submit(next, self.__pages, None)
+            pending.add_done_callback(lambda done: self.__copy(done, future))
+
+        if previous is None:
+            fetch()
+        else:
+            previous.add_done_callback(fetch)
+
+        return future
+
+    def __copy(self, source, target):
+        try:
+            result = source.result()
+        except Exception:
+            self.__exc_info = sys.exc_info()
+            target.set_exc_info(self.__exc_info)
+        else:
+            target.set_result(result)
+
+
+class AsyncSalesforce(object):
+    def __init__(self, **kwargs):
+        super(AsyncSalesforce, self).__init__()
+
+        self.__executor = kwargs.pop('executor', None) or \
+            Executor(kwargs.pop('max_workers', 8))
+        self.__client = kwargs.pop('client', None) or Salesforce(**kwargs)
+
+    @property
+    def client(self):
+        return self.__client
+
+    @property
+    def executor(self):
+        return self.__executor
+
+    def get_auth_uri(self, **kwargs):
+        return self.__client.get_auth_uri(**kwargs)
+
+    def authenticate(self, soap=None, **kwargs):
+        return self.__executor.submit(self.__client.authenticate, soap, **kwargs)
+
+    def query(self, query_string, soap=None, compact=False):
+        return self.__executor.submit(self.__client.query, query_string, soap, compact)
+
+    def query_all(self, query_string, soap=None, compact=False):
+        return self.__executor.submit(self.__client.query_all, query_string, soap, compact)
+
+    def query_more(self, query_url, soap=None, compact=False):
+        return self.__executor.submit(self.__client.query_more, query_url, soap, compact)
+
+    def query_pages(self, query_string, include_deleted=False, soap=None, compact=False):
+        return AsyncQueryCursor(
+            self.__executor,
+            self.__client.query_pages(query_string, include_deleted, soap=soap, compact=compact))
+
+    def search(self, search_string, soap=None, compact=False):
+        return self.__executor.submit(self.__client.search, search_string, soap, compact)
+
+    def get(self, get_url, params=None, soap=None, **kwargs):
+        return self.__executor.submit(self.__client.get, get_url, params, soap, **kwargs)
+
+    def post(self, post_url, data, soap=None):
+        return self.__executor.submit(self.__client.post, post_url, data, soap)
+
+    def __getattr__(self, name):
+        if not name[0].isalpha():
+            return super(AsyncSalesforce, self).__getattribute__(name)
+
+        return AsyncSObjectFacade(getattr(self.__client, name), self.__executor)
+
+
+class AsyncSObjectFacade(object):
+    def __init__(self, facade, executor):
+        super(AsyncSObjectFacade, self).__init__()
+
+        self.__facade = facade
+        self.__executor = executor
+
+    @property
+    def name(self):
+        return self.__facade.name
+
+    def describe(self, soap=None):
+        return self.__executor.submit(self.__facade.describe, soap)
+
+    def create(self, data, soap=None, **kwargs):
+        return self.__executor.submit(self.__facade.create, data, soap, **kwargs)
+
+    def update(self, data, soap=None, **kwargs):
+        return self.__executor.submit(self.__facade.update, data, soap, **kwargs)
+
+    def delete(self, record_id, soap=None, **kwargs):
+        return self.__executor.submit(self.__facade.delete, record_id, soap, **kwargs)
+
+    def post(self, data, record_id=None, soap=None):
+        return self.__executor.submit(self.__facade.post, data, record_id, soap)
+
+    def get(self, record_id=None, params=None, soap=None):
+        return self.__executor.submit(self.__facade.get, record_id, params, soap)
+
+    def query_pages(self, fields=None, where=None, include_deleted=False, soap=None):
+        return AsyncQueryCursor(
+            self.__executor,
+            self.__facade.query_pages(fields, where, include_deleted, soap=soap))
@@ -0,0 +1,393 @@
+from urlResources import ResourcesName
+from exception import BulkIngestFailed, BulkJobFailed, BulkJobTimeout
+from pagination import PrefetchIterator
+import csv
+import time
+import utils
+
+
+class BulkAPI(object):
+    JOB_SIZE = 100 * 1024 * 1024
+    RESULTS_CHUNK_SIZE = 64 * 1024
+    POLL_INTERVAL = 1.0
+    MAX_POLL_INTERVAL = 30.0
+    POLL_BACKOFF = 1.5
+
+    def __init__(self, httplib, auth, url_resources):
+        super(BulkAPI, self).__init__()
+
+        self.__httplib = httplib
+        self.__auth = auth
+        self.__url_resources = url_resources
+
+        self.job_size = BulkAPI.JOB_SIZE
+
+    @property
+    def httplib(self):
+        return self.__httplib
+
+    @property
+    def auth(self):
+        return self.__auth
+
+    @property
+    def url_resources(self):
+        return self.__url_resources
+
+    def ingest(self, sobject, operation, records, fields=None,
+               external_id_field=None, wait=True, timeout=None):
+        header, lines = self.__get_csv_lines(records, fields)
+        pending = [next(lines, None)]
+        jobs = []
+
+        while pending[0] is not None:
+            job = self.create_job(sobject, operation, external_id_field)
+            jobs.append(job)
+
+            job.upload(self.__iter_job_body(header, lines, pending))
+            job.close()
+
+        result = BulkIngestResult(jobs)
+
+        if wait:
+            deadline = None if timeout is None else time.time() + timeout
+            errors = []
+
+            for job in jobs:
+                try:
+                    job.wait(None if deadline is None else max(deadline - time.time(), 0))
+                except BulkJobFailed as error:
+                    errors.append(error)
+
+            if errors:
+                raise BulkIngestFailed(result, errors)
+
+        return result
+
+    @utils.authenticate
+    def create_job(self, sobject, operation, external_id_field=None):
+        data = {'object': sobject,
+                'operation': operation,
+                'contentType': 'CSV',
+                'lineEnding': 'LF'}
+
+        if external_id_field is not None:
+            data['externalIdFieldName'] = external_id_field
+
+        info = self.send_request('POST',
+                                 self.get_job_url(BulkIngestJob.JOB_TYPE),
+                                 data=utils.json_dumps(self.httplib, data))
+
+        return BulkIngestJob(self, info)
+
+    @utils.authenticate
+    def query(self, query_string, include_deleted=False, wait=True, timeout=None):
+        data = {'operation': 'queryAll' if include_deleted else 'query',
+                'query': query_string}
+
+        info = self.send_request('POST',
+                                 self.get_job_url(BulkQueryJob.JOB_TYPE),
+                                 data=utils.json_dumps(self.httplib, data))
+        job = BulkQueryJob(self, info)
+
+        if wait:
+            job.wait(timeout)
+
+        return job
+
+    @utils.authenticate
+    def get_job(self, job_id):
+        return BulkIngestJob(self, self.get_job_info(BulkIngestJob.JOB_TYPE, job_id))
+
+    @utils.authenticate
+    def get_query_job(self, job_id):
+        return BulkQueryJob(self, self.get_job_info(BulkQueryJob.JOB_TYPE, job_id))
+
+    @utils.authenticate
+    def get_job_info(self, job_type, job_id):
+        return self.send_request('GET', self.get_job_url(job_type, job_id))
+
+    @utils.authenticate
+    def get_job_results(self, job_type, job_id, result_name, params=None):
+        headers = utils.csv_content_headers(self.auth.access_token)
+
+        response = utils.send_raw_request('GET',
+                                          self.httplib,
+                                          self.get_job_url(job_type, job_id, result_name),
+                                          headers,
+                                          params=params,
+                                          stream=True)
+
+        try:
+            utils.verify_response(response)
+        except Exception:
+            response.close()
+            raise
+
+        return response
+
+    def get_job_url(self, job_type, *path):
+        jobs_url = self.url_resources.get_full_resource_url(
+            self.auth.instance_url,
+            ResourcesName.get_resource_name(job_type))
+
+        return jobs_url + '/'.join(path)
+
+    def send_request(self, method, url, **kwargs):
+        headers = utils.json_content_headers(self.auth.access_token)
+
+        return utils.send_request(method,
+                                  self.httplib,
+                                  url,
+                                  headers,
+                                  **kwargs)
+
+    def __iter_job_body(self, header, lines, pending):
+        size = len(header)
+        yield header
+
+        while pending[0] is not None and size < self.job_size:
+            line = pending[0]
+            size += len(line)
+            yield line
+
+            pending[0] = next(lines, None)
+
+    @staticmethod
+    def __get_csv_lines(records, fields):
+        if hasattr(records, 'read'):
+            lines = _iter_csv_records(records)
+            header = next(lines, '')
+
+            if not header.endswith('\n'):
+                header += '\n'
+
+            return header, lines
+
+        records = iter(records)
+        first = next(records, None)
+
+        if fields is None:
+            fields = [] if first is None else list(first.keys())
+
+        def iter_rows():
+            if first is None:
+                return
+
+            yield first
+
+            for record in records:
+                yield record
+
+        rows = ([record.get(field) for field in fields] for record in iter_rows())
+
+        return next(utils.iter_csv_lines([fields])), utils.iter_csv_lines(rows)
+
+
+class BulkJob(object):
+    JOB_TYPE = None
+    DONE_STATES = ('JobComplete', 'Failed', 'Aborted')
+
+    def __init__(self, bulk_api, info):
+        super(BulkJob, self).__init__()
+
+        self.bulk_api = bulk_api
+        self.info = info
+
+    @property
+    def id(self):
+        return self.info['id']
+
+    @property
+    def state(self):
+        return self.info['state']
+
+    def is_done(self):
+        return self.state in BulkJob.DONE_STATES
+
+    def abort(self):
+        return self.set_state('Aborted')
+
+    def refresh(self):
+        self.info = self.bulk_api.get_job_info(self.JOB_TYPE, self.id)
+
+        return self
+
+    def wait(self, timeout=None):
+        interval = BulkAPI.POLL_INTERVAL
+        deadline = None if timeout is None else time.time() + timeout
+
+        while not self.refresh().is_done():
+            if deadline is not None and time.time() + interval > deadline:
+                raise BulkJobTimeout(self.id, self.state,
+                                     'Job did not finish within {0} seconds'.format(timeout))
+
+            time.sleep(interval)
+            interval = min(interval * BulkAPI.POLL_BACKOFF, BulkAPI.MAX_POLL_INTERVAL)
+
+        if self.state != 'JobComplete':
+            raise BulkJobFailed(self.id, self.state, self.info.get('errorMessage'))
+
+        return self
+
+    def set_state(self, state):
+        api = self.bulk_api
+
+        self.info = api.send_request('PATCH',
+                                     api.get_job_url(self.JOB_TYPE, self.id),
+                                     data=utils.json_dumps(api.httplib, {'state': state}))
+
+        return self
+
+    def iter_result_lines(self, result_name, params=None):
+        response = self.bulk_api.get_job_results(self.JOB_TYPE, self.id, result_name, params)
+
+        try:
+            for line in utils.iter_lines(response.iter_content(BulkAPI.RESULTS_CHUNK_SIZE)):
+                yield line
+        finally:
+            response.close()
+
+
+class BulkIngestJob(BulkJob):
+    JOB_TYPE = 'jobs_ingest'
+
+    def __init__(self, bulk_api, info):
+        super(BulkIngestJob, self).__init__(bulk_api, info)
+
+    def upload(self, body):
+        api = self.bulk_api
+        headers = utils.csv_content_headers(api.auth.access_token)
+
+        response = utils.send_raw_request('PUT',
+                                          api.httplib,
+                                          api.get_job_url(self.JOB_TYPE, self.id, 'batches'),
+                                          headers,
+                                          data=body)
+
+        utils.verify_response(response)
+
+    def close(self):
+        return self.set_state('UploadComplete')
+
+    def successful_results(self):
+        return _iter_rows(self.iter_result_lines('successfulResults'))
+
+    def failed_results(self):
+        return _iter_rows(self.iter_result_lines('failedResults'))
+
+    def unprocessed_records(self):
+        return _iter_rows(self.iter_result_lines('unprocessedrecords'))
+
+
+class BulkQueryJob(BulkJob):
+    JOB_TYPE = 'jobs_query'
+
+    def __init__(self, bulk_api, info):
+        super(BulkQueryJob, self).__init__(bulk_api, info)
+
+    def pages(self, max_records=None, prefetch=0):
+        if prefetch:
+            return PrefetchIterator(self.__iter_pages(max_records, True), prefetch)
+
+        return self.__iter_pages(max_records, False)
+
+    def iter_csv_lines(self, max_records=None, prefetch=0):
+        header_written = False
+        pages = self.pages(max_records, prefetch)
+
+        try:
+            for page in pages:
+                lines = iter(page)
+                header = next(lines, None)
+
+                if header is not None and not header_written:
+                    header_written = True
+                    yield header
+
+                for line in lines:
+                    yield line
+        finally:
+            pages.close()
+
+    def rows(self, max_records=None, prefetch=0):
+        return _iter_rows(self.iter_csv_lines(max_records, prefetch))
+
+    def write_to(self, f, max_records=None, prefetch=0):
+        for line in self.iter_csv_lines(max_records, prefetch):
+            f.write(line)
+
+    def __iter_pages(self, max_records, materialize):
+        locator = None
+
+        while True:
+            params = {}
+
+            if max_records:
+                params['maxRecords'] = max_records
+
+            if locator:
+                params['locator'] = locator
+
+            response = self.bulk_api.get_job_results(self.JOB_TYPE, self.id, 'results', params)
+            locator = response.headers.get('Sforce-Locator')
+
+            try:
+                lines = utils.iter_lines(response.iter_content(BulkAPI.RESULTS_CHUNK_SIZE))
+                yield list(lines) if materialize else lines
+            finally:
+                response.close()
+
+            if not locator or locator == 'null':
+                break
+
+
+def _iter_csv_records(lines):
+    # Quoted fields may hold line breaks; a record ends on a line that leaves
+    # an even number of quotes, since escaped quotes come in pairs
+    record = []
+    quotes = 0
+
+    for line in lines:
+        record.append(line)
+        quotes += line.count('"')
+
+        if quotes % 2 == 0:
+            yield ''.join(record)
+            record = []
+            quotes = 0
+
+    if record:
+        yield ''.join(record)
+
+
+def _iter_rows(lines):
+    for row in csv.DictReader(lines):
+        yield dict((_decode(key), _decode(value))
+                   for key, value in row.iteritems())
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, str) else value
+
+
+class BulkIngestResult(object):
+    def __init__(self, jobs):
+        super(BulkIngestResult, self).__init__()
+
+        self.jobs = jobs
+
+    def successful_results(self):
+        for job in self.jobs:
+            for row in job.successful_results():
+                yield row
+
+    def failed_results(self):
+        for job in self.jobs:
+            for row in job.failed_results():
+                yield row
+
+    def unprocessed_records(self):
+        for job in self.jobs:
+            for row in job.unprocessed_records():
+                yield row
@@ -0,0 +1,460 @@
+from array import array
+from datetime import date, datetime, timedelta
+import calendar
+import csv
+import re
+
+EPOCH_DATE = date(1970, 1, 1)
+EPOCH_DATETIME = datetime(1970, 1, 1)
+
+DESCRIBE_KINDS = {'int': 'int',
+                  'long': 'int',
+                  'double': 'double',
+                  'currency': 'double',
+                  'percent': 'double',
+                  'boolean': 'boolean',
+                  'date': 'date',
+                  'datetime': 'datetime'}
+
+
+def _get_int64_typecode():
+    # 'l' is 32 bit on Windows and 32 bit builds, and Python 2 has no 'q';
+    # a double still holds epoch milliseconds exactly
+    if array('l').itemsize >= 8:
+        return 'l'
+
+    try:
+        array('q')
+    except ValueError:
+        return 'd'
+
+    return 'q'
+
+
+INT64 = _get_int64_typecode()
+
+TYPECODES = {'int': INT64,
+             'double': 'd',
+             'boolean': 'b',
+             'date': 'l',
+             'datetime': INT64,
+             'string': 'l'}
+
+NUMPY_DTYPES = {'date': 'datetime64[D]',
+                'datetime': 'datetime64[ms]'}
+
+MISSING = (None, None)
+
+SOQL_FIELDS = re.compile(r'^\s*SELECT\s+(.+?)\s+FROM\s', re.IGNORECASE | re.DOTALL)
+
+
+class Column(object):
+    def __init__(self, name, kind=None):
+        super(Column, self).__init__()
+
+        self.name = name
+        self.kind = None
+        self.data = None
+        self.nulls = array('b')
+        self.dictionary = []
+
+        self.__codes = {}
+        self.__pending = 0
+
+        if kind is not None:
+            self.set_kind(kind)
+
+    def set_kind(self, kind):
+        self.kind = kind
+        self.data = array(TYPECODES[kind], [0] * self.__pending)
+        self.__pending = 0
+
+    def resolve(self):
+        if self.kind is None:
+            self.set_kind('string')
+
+    def append(self, value):
+        if value is None:
+            return self.append_null()
+
+        if self.kind is None:
+            self.set_kind(_infer_kind(value))
+
+        self.data.append(self.__encode(value))
+        self.nulls.append(0)
+
+    def append_null(self):
+        if self.kind is None:
+            self.__pending += 1
+        else:
+            self.data.append(0)
+
+        self.nulls.append(1)
+
+    def clear(self):
+        self.nulls = array('b')
+        self.dictionary = []
+        self.__codes = {}
+        self.__pending = 0
+
+        if self.kind is not None:
+            self.data = array(TYPECODES[self.kind])
+
+    def null_count(self):
+        return self.nulls.count(1)
+
+    def to_list(self):
+        if self.kind is None:
+            return [None] * len(self)
+
+        decode = self.__decode
+
+        return [None if is_null else decode(value)
+                for value, is_null in zip(self.data, self.nulls)]
+
+    def to_numpy(self):
+        numpy = _import('numpy')
+
+        if self.kind is None:
+            values = numpy.empty(len(self), dtype=object)
+        else:
+            values = _frombuffer(numpy, self.data)
+
+            if self.kind == 'string':
+                values = numpy.array(self.dictionary + [None], dtype=object)[values]
+            elif self.kind in NUMPY_DTYPES:
+                values = values.astype('int64').view(NUMPY_DTYPES[self.kind])
+            elif self.kind == 'int':
+                values = values.astype('int64')
+            elif self.kind == 'boolean':
+                values = values.astype(bool)
+
+        mask = _frombuffer(numpy, self.nulls).astype(bool)
+
+        if mask.any():
+            return numpy.ma.masked_array(values, mask=mask)
+
+        return values
+
+    def __len__(self):
+        return len(self.nulls)
+
+    def __encode(self, value):
+        kind = self.kind
+
+        if kind == 'string':
+            code = self.__codes.get(value)
+
+            if code is None:
+                code = self.__codes[value] = len(self.dictionary)
+                self.dictionary.append(value)
+
+            return code
+
+        if kind == 'double':
+            return float(value)
+
+        if kind == 'int':
+            return int(float(value)) if isinstance(value, basestring) else int(value)
+
+        if kind == 'boolean':
+            return 1 if value is True or value == 'true' else 0
+
+        if kind == 'date':
+            return (datetime.strptime(value[:10], '%Y-%m-%d').date() - EPOCH_DATE).days
+
+        return _parse_datetime(value)
+
+    def __decode(self, value):
+        kind = self.kind
+
+        if kind == 'string':
+            return self.dictionary[value]
+
+        if kind == 'boolean':
+            return value == 1
+
+        if kind == 'date':
+            return EPOCH_DATE + timedelta(days=value)
+
+        if kind == 'datetime':
+            return EPOCH_DATETIME + timedelta(milliseconds=value)
+
+        if kind == 'int':
+            return int(value)
+
+        return value
+
+
+class ColumnarResult(object):
+    def __init__(self, fields=None, kinds=None):
+        super(ColumnarResult, self).__init__()
+
+        self.kinds = dict((name.lower(), kind) for name, kind in (kinds or {}).items())
+        self.columns = []
+        self.total_size = None
+
+        self.__by_name = {}
+        self.__fixed = fields is not None
+        self.__rows = 0
+
+        for name in fields or []:
+            self.__add_column(name)
+
+    @property
+    def names(self):
+        return [column.name for column in self.columns]
+
+    def get_column(self, name):
+        return self.__by_name.get(name.lower())
+
+    def __getitem__(self, name):
+        column = self.get_column(name)
+
+        if column is None:
+            raise KeyError(name)
+
+        return column
+
+    def append_records(self, records):
+        for record in records:
+            self.append_record(record)
+
+    def append_record(self, record):
+        values = {}
+        _flatten(record, '', values)
+
+        if not self.__fixed:
+            for key, (name, _) in values.iteritems():
+                if key not in self.__by_name:
+                    self.__add_column(name)
+
+        for column in self.columns:
+            column.append(values.get(column.name.lower(), MISSING)[1])
+
+        self.__rows += 1
+
+    def append_page(self, page):
+        self.total_size = page.get('totalSize', self.total_size)
+        self.append_records(page['records'])
+
+    def fix_columns(self):
+        self.__fixed = True
+
+        for column in self.columns:
+            column.resolve()
+
+    def clear(self):
+        for column in self.columns:
+            column.clear()
+
+        self.__rows = 0
+
+    def rows(self):
+        return zip(*[column.to_list() for column in self.columns]) if self.columns else []
+
+    def to_numpy(self):
+        return dict((column.name, column.to_numpy()) for column in self.columns)
+
+    def __len__(self):
+        return self.__rows
+
+    def __add_column(self, name):
+        column = Column(name, self.kinds.get(name.lower()))
+
+        for _ in xrange(self.__rows):
+            column.append_null()
+
+        self.columns.append(column)
+        self.__by_name[name.lower()] = column
+
+        return column
+
+
+class ColumnarWriter(object):
+    def __init__(self):
+        super(ColumnarWriter, self).__init__()
+
+    def write(self, result):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CsvColumnarWriter(ColumnarWriter):
+    def __init__(self, f):
+        super(CsvColumnarWriter, self).__init__()
+
+        self.__writer = csv.writer(f, lineterminator='\n')
+        self.__header = False
+
+    def write(self, result):
+        if not self.__header:
+            self.__writer.writerow([_csv_value(name) for name in result.names])
+            self.__header = True
+
+        for row in result.rows():
+            self.__writer.writerow([_csv_value(value) for value in row])
+
+
+class ParquetColumnarWriter(ColumnarWriter):
+    def __init__(self, path, compression='snappy'):
+        super(ParquetColumnarWriter, self).__init__()
+
+        self.path = path
+        self.compression = compression
+
+        self.__pyarrow = _import('pyarrow')
+        self.__parquet = _import('pyarrow.parquet')
+        self.__writer = None
+
+    def write(self, result):
+        table = self.__get_table(result)
+
+        if self.__writer is None:
+            self.__writer = self.__parquet.ParquetWriter(self.path, table.schema,
+                                                         compression=self.compression)
+
+        self.__writer.write_table(table)
+
+    def close(self):
+        if self.__writer is not None:
+            self.__writer.close()
+
+    def __get_table(self, result):
+        pyarrow = self.__pyarrow
+        arrays = []
+
+        for column in result.columns:
+            values = column.to_list()
+
+            if column.kind == 'string':
+                values = [value if value is None or isinstance(value, basestring) else unicode(value)
+                          for value in values]
+                arrays.append(pyarrow.array(values, pyarrow.string()).dictionary_encode())
+            else:
+                arrays.append(pyarrow.array(values, _arrow_type(pyarrow, column.kind)))
+
+        return pyarrow.Table.from_arrays(arrays, [column.name for column in result.columns])
+
+
+def build_columns(pages, fields=None, kinds=None, writer=None):
+    result = ColumnarResult(fields, kinds)
+
+    for page in pages:
+        result.append_page(page)
+
+        if writer is not None:
+            result.fix_columns()
+            writer.write(result)
+            result.clear()
+
+    if writer is not None:
+        writer.close()
+
+    return result
+
+
+def get_soql_fields(query_string):
+    match = SOQL_FIELDS.match(query_string)
+
+    if match is None or '(' in match.group(1):
+        return None
+
+    return [name.strip() for name in match.group(1).split(',')]
+
+
+def get_describe_kinds(describe):
+    return dict((field['name'], DESCRIBE_KINDS.get(field['type'], 'string'))
+                for field in describe.get('fields', []))
+
+
+def _flatten(record, prefix, values):
+    for name, value in record.iteritems():
+        if name == 'attributes':
+            continue
+
+        if isinstance(value, dict):
+            if 'records' not in value:
+                _flatten(value, prefix + name + '.', values)
+        else:
+            path = prefix + name
+            values[path.lower()] = (path, value)
+
+
+def _infer_kind(value):
+    if isinstance(value, bool):
+        return 'boolean'
+
+    if isinstance(value, (int, long, float)):
+        return 'double'
+
+    return 'string'
+
+
+def _parse_datetime(value):
+    parsed = datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S')
+    millis = int(value[20:23]) if len(value) > 22 and value[19] == '.' else 0
+    seconds = calendar.timegm(parsed.timetuple())
+
+    offset = value[23:] if value[19:20] == '.' else value[19:]
+
+    if offset and offset not in ('Z', '+0000', '+00:00'):
+        sign = -1 if offset[0] == '-' else 1
+        digits = offset[1:].replace(':', '')
+        seconds -= sign * (int(digits[:2]) * 3600 + int(digits[2:4] or 0) * 60)
+
+    return seconds * 1000 + millis
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%dT%H:%M:%S.') + '%03dZ' % (value.microsecond // 1000)
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+
+    return value
+
+
+def _arrow_type(pyarrow, kind):
+    if kind == 'int':
+        return pyarrow.int64()
+
+    if kind == 'double':
+        return pyarrow.float64()
+
+    if kind == 'boolean':
+        return pyarrow.bool_()
+
+    if kind == 'date':
+        return pyarrow.date32()
+
+    if kind == 'datetime':
+        return pyarrow.timestamp('ms')
+
+    return pyarrow.string()
+
+
+def _frombuffer(numpy, data):
+    if not len(data):
+        return numpy.empty(0, dtype=data.typecode)
+
+    return numpy.frombuffer(data, dtype=data.typecode)
+
+
+def _import(name):
+    try:
+        return __import__(name, fromlist=['*'])
+    except ImportError:
+        raise ValueError("'{0}' is not installed".format(name))
@@ -0,0 +1,163 @@
+class RecordSchema(object):
+    __slots__ = ('sobject_type', 'fields', 'index')
+
+    def __init__(self, sobject_type, fields):
+        self.sobject_type = sobject_type
+        self.fields = fields
+        self.index = dict((name, position) for position, name in enumerate(fields))
+
+
+class CompactRecord(object):
+    __slots__ = ('__schema', '__values')
+
+    def __init__(self, schema, values):
+        self.__schema = schema
+        self.__values = values
+
+    @property
+    def sobject_type(self):
+        return self.__schema.sobject_type
+
+    @property
+    def schema(self):
+        return self.__schema
+
+    def __getitem__(self, name):
+        return self.__values[self.__schema.index[name]]
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def get(self, name, default=None):
+        position = self.__schema.index.get(name)
+
+        return default if position is None else self.__values[position]
+
+    def keys(self):
+        return list(self.__schema.fields)
+
+    def values(self):
+        return list(self.__values)
+
+    def items(self):
+        return zip(self.__schema.fields, self.__values)
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def __iter__(self):
+        return iter(self.__schema.fields)
+
+    def __len__(self):
+        return len(self.__values)
+
+    def __contains__(self, name):
+        return name in self.__schema.index
+
+    def to_dict(self):
+        return dict((name, _to_dict(value)) for name, value in self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, CompactRecord):
+            other = other.to_dict()
+
+        return self.to_dict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__schema.sobject_type or 'CompactRecord', self.to_dict())
+
+    def __getstate__(self):
+        return self.__schema.sobject_type, self.__schema.fields, self.__values
+
+    def __setstate__(self, state):
+        self.__schema = RecordSchema(state[0], state[1])
+        self.__values = state[2]
+
+
+class RecordCompactor(object):
+    def __init__(self):
+        super(RecordCompactor, self).__init__()
+
+        self.__schemas = {}
+
+    def compact(self, record):
+        attributes = record.get('attributes')
+        sobject_type = attributes.get('type') if attributes else None
+
+        fields = []
+        values = []
+
+        for name, value in record.iteritems():
+            if name == 'attributes':
+                continue
+
+            fields.append(name)
+            values.append(self.compact_value(value))
+
+        key = (sobject_type, tuple(fields))
+        schema = self.__schemas.get(key)
+
+        if schema is None:
+            schema = self.__schemas[key] = RecordSchema(sobject_type, key[1])
+
+        return CompactRecord(schema, tuple(values))
+
+    def compact_value(self, value):
+        if not isinstance(value, dict):
+            return value
+
+        if 'records' in value:
+            return self.compact_page(value)
+
+        return self.compact(value)
+
+    def compact_page(self, page):
+        page = dict(page)
+        page['records'] = [self.compact(record) for record in page['records']]
+
+        return page
+
+    def compact_search(self, result):
+        result = dict(result)
+        result['searchRecords'] = [self.compact(record) for record in result['searchRecords']]
+
+        return result
+
+    def compact_pages(self, pages):
+        for page in pages:
+            yield self.compact_page(page)
+
+    def compact_all(self, pages):
+        result = {'done': True, 'totalSize': 0, 'records': []}
+
+        for page in pages:
+            result['totalSize'] = page.get('totalSize', 0)
+            result['records'].extend(self.compact(record) for record in page['records'])
+
+        return result
+
+    def compact_records(self, records):
+        for record in records:
+            yield self.compact(record)
+
+
+def _to_dict(value):
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+
+    if isinstance(value, dict) and 'records' in value:
+        value = dict(value)
+        value['records'] = [_to_dict(record) for record in value['records']]
+
+    return value
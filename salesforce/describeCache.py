@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from email.utils import formatdate
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class DescribeEntry(object):
+    def __init__(self, value, etag=None, last_modified=None, fetched_at=None):
+        super(DescribeEntry, self).__init__()
+
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def is_fresh(self, ttl):
+        return time.time() - self.fetched_at < ttl
+
+    def get_validators(self):
+        validators = {'If-Modified-Since': self.last_modified or
+                      formatdate(self.fetched_at, usegmt=True)}
+
+        if self.etag:
+            validators['If-None-Match'] = self.etag
+
+        return validators
+
+
+class DescribeCache(object):
+    def __init__(self, max_size=128, ttl=60 * 60):
+        super(DescribeCache, self).__init__()
+
+        if max_size < 1:
+            raise ValueError("'max_size' should be greater than 0")
+
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def get_key(protocol, instance_url, version, sobject):
+        return '{0}|{1}|{2}|{3}'.format(protocol, instance_url, version, sobject)
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+
+            if entry is not None:
+                self.__entries[key] = entry
+
+            return entry
+
+    def set(self, key, value, etag=None, last_modified=None):
+        with self.__lock:
+            self.__put(key, DescribeEntry(value, etag, last_modified))
+
+    def touch(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is not None:
+                entry.fetched_at = time.time()
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def save(self, path):
+        with self.__lock:
+            snapshot = dict((key, entry.__dict__.copy())
+                            for key, entry in self.__entries.items())
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(snapshot, f)
+
+            os.rename(temp_path, path)
+        except (IOError, OSError):
+            os.remove(temp_path)
+            raise
+
+    def load(self, path):
+        with open(path) as f:
+            snapshot = json.load(f)
+
+        entries = sorted(snapshot.items(), key=lambda item: item[1]['fetched_at'])
+
+        with self.__lock:
+            for key, entry in entries:
+                self.__put(key, DescribeEntry(**entry))
+
+    def __put(self, key, entry):
+        self.__entries.pop(key, None)
+        self.__entries[key] = entry
+
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __getstate__(self):
+        with self.__lock:
+            state = self.__dict__.copy()
+            state['_DescribeCache__entries'] = OrderedDict(self.__entries)
+
+        del state['_DescribeCache__lock']
+
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__lock = threading.Lock()
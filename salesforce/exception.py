@@ -14,3 +14,53 @@ class RequestFailed(Exception):
         # Set some exception infomation
         self.error_code = error_code
         self.message = message
+
+
+class ApiBudgetExhausted(Exception):
+    """
+    Thrown by BudgetThrottle instead of sending a call once API usage is past
+    its hard limit.
+    """
+    def __init__(self, used, limit):
+        self.used = used
+        self.limit = limit
+        self.message = 'API usage {0}/{1} is past the hard limit'.format(used, limit)
+
+
+class BulkJobFailed(Exception):
+    """
+    Thrown to indicate that a bulk job has failed or was aborted.
+    """
+    def __init__(self, job_id, state, message):
+        self.job_id = job_id
+        self.state = state
+        self.message = message
+
+
+class BulkJobTimeout(BulkJobFailed):
+    """
+    Thrown when a bulk job is still running after the wait timeout; state
+    is the last state polled.
+    """
+    pass
+
+
+class BulkIngestFailed(Exception):
+    """
+    Thrown when some of the jobs of an ingest did not complete; errors holds
+    one BulkJobFailed per such job and result covers every job.
+    """
+    def __init__(self, result, errors):
+        self.result = result
+        self.errors = errors
+        self.message = '{0} of {1} bulk jobs did not complete'.format(len(errors), len(result.jobs))
+
+
+class CollectionRequestFailed(RequestFailed):
+    """
+    Thrown when a chunk of an sObject Collections call or a SOAP save batch
+    fails; results holds what the committed chunks returned, in input order.
+    """
+    def __init__(self, error_code, message, results):
+        super(CollectionRequestFailed, self).__init__(error_code, message)
+        self.results = results
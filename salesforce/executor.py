@@ -0,0 +1,160 @@
+from Queue import Queue
+import sys
+import threading
+
+
+class CancelledError(Exception):
+    """
+    Thrown when the result of a cancelled future is requested.
+    """
+    pass
+
+
+class Future(object):
+    def __init__(self):
+        super(Future, self).__init__()
+
+        self.__condition = threading.Condition()
+        self.__done = False
+        self.__running = False
+        self.__cancelled = False
+        self.__result = None
+        self.__exc_info = None
+        self.__callbacks = []
+
+    def done(self):
+        return self.__done
+
+    def cancelled(self):
+        return self.__cancelled
+
+    def cancel(self):
+        with self.__condition:
+            if self.__running or self.__done:
+                return False
+
+            self.__cancelled = True
+
+        self.__set(None, (CancelledError, CancelledError(), None))
+
+        return True
+
+    def start(self):
+        with self.__condition:
+            if self.__cancelled:
+                return False
+
+            self.__running = True
+
+        return True
+
+    def result(self, timeout=None):
+        self.__wait(timeout)
+
+        if self.__exc_info is not None:
+            raise self.__exc_info[0], self.__exc_info[1], self.__exc_info[2]
+
+        return self.__result
+
+    def exception(self, timeout=None):
+        self.__wait(timeout)
+
+        if self.__exc_info is not None:
+            return self.__exc_info[1]
+
+        return None
+
+    def add_done_callback(self, callback):
+        with self.__condition:
+            if not self.__done:
+                self.__callbacks.append(callback)
+                return
+
+        callback(self)
+
+    def set_result(self, result):
+        self.__set(result, None)
+
+    def set_exc_info(self, exc_info):
+        self.__set(None, exc_info)
+
+    def __set(self, result, exc_info):
+        with self.__condition:
+            if self.__done:
+                raise RuntimeError('Future is already done')
+
+            self.__result = result
+            self.__exc_info = exc_info
+            self.__done = True
+            self.__condition.notify_all()
+
+            callbacks, self.__callbacks = self.__callbacks, []
+
+        for callback in callbacks:
+            callback(self)
+
+    def __wait(self, timeout):
+        with self.__condition:
+            if not self.__done:
+                self.__condition.wait(timeout)
+
+            if not self.__done:
+                raise RuntimeError('Future is not done after %s seconds' % timeout)
+
+
+class Executor(object):
+    def __init__(self, max_workers=8):
+        super(Executor, self).__init__()
+
+        if max_workers < 1:
+            raise ValueError("'max_workers' should be greater than 0")
+
+        self.__max_workers = max_workers
+        self.__tasks = Queue()
+        self.__workers = []
+        self.__lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        self.__tasks.put((future, func, args, kwargs))
+
+        with self.__lock:
+            if len(self.__workers) < self.__max_workers:
+                worker = threading.Thread(target=_work, args=(self.__tasks,))
+                worker.daemon = True
+                worker.start()
+
+                self.__workers.append(worker)
+
+        return future
+
+    def shutdown(self, wait=True):
+        with self.__lock:
+            workers, self.__workers = self.__workers, []
+
+        for _ in workers:
+            self.__tasks.put(None)
+
+        if wait:
+            for worker in workers:
+                worker.join()
+
+
+def _work(tasks):
+    while True:
+        task = tasks.get()
+
+        if task is None:
+            return
+
+        future, func, args, kwargs = task
+
+        if not future.start():
+            continue
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            future.set_exc_info(sys.exc_info())
+        else:
+            future.set_result(result)
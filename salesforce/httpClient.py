@@ -1,10 +1,31 @@
+from requests.adapters import HTTPAdapter
+from throttle import ApiUsage
+from instrumentation import Instrumentation
+from jsonCodec import get_json_codec
+from requestCoalescer import RequestCoalescer
 import requests
+import threading
+import warnings
 
 
 class HTTPConnection(object):
+    preconnect_on_auth = False
+    api_usage = None
+    throttle = None
+    instrumentation = None
+    compact_json = False
+    compress_requests = False
+    compress_min_size = 1024
+    stream_soap_requests = False
+    coalescer = None
+    json_codec = None
+
     def __init__(self):
         super(HTTPConnection, self).__init__()
 
+        self.api_usage = ApiUsage()
+        self.json_codec = get_json_codec()
+
     def __call__(self, method, url, **kwargs):
         raise NotImplementedError
 
@@ -14,35 +35,148 @@ class HTTPConnection(object):
     def post(self, url, **kwargs):
         raise NotImplementedError
 
+    def preconnect(self, url):
+        pass
 
-class Requests(HTTPConnection):
-    __MAX_REQUEST = 15
+    def add_hook(self, hook):
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation()
 
-    def __init__(self):
+        return self.instrumentation.add_hook(hook)
+
+    def remove_hook(self, hook):
+        if self.instrumentation is None:
+            return
+
+        self.instrumentation.remove_hook(hook)
+
+        if not self.instrumentation.hooks:
+            self.instrumentation = None
+
+
+class Requests(HTTPConnection):
+    def __init__(self,
+                 pool_connections=10,
+                 pool_maxsize=10,
+                 pool_block=False,
+                 max_retries=0,
+                 keep_alive=True,
+                 host_pool_sizes=None,
+                 preconnect_on_auth=False,
+                 throttle=None,
+                 wire_efficient=False,
+                 compress_min_size=1024,
+                 json_codec=None,
+                 stream_soap_requests=False,
+                 coalesce_requests=False):
         super(Requests, self).__init__()
 
-        self.__request = requests.Session()
-        self.__request_count = 0
+        if json_codec is not None:
+            self.json_codec = get_json_codec(json_codec)
+
+        self.preconnect_on_auth = preconnect_on_auth
+        self.throttle = throttle
+        self.compact_json = wire_efficient
+        self.compress_requests = wire_efficient
+        self.compress_min_size = compress_min_size
+        self.stream_soap_requests = stream_soap_requests
+        self.coalescer = RequestCoalescer() if coalesce_requests else None
+
+        self.keep_alive = keep_alive
+
+        self.__adapters = []
+        self.__mounts = []
+        self.__local = threading.local()
+
+        self.__mount_adapter(('http://', 'https://'),
+                             pool_connections,
+                             pool_maxsize,
+                             pool_block,
+                             max_retries)
+
+        for prefix, maxsize in (host_pool_sizes or {}).items():
+            self.__mount_adapter((prefix,), 1, maxsize, pool_block, max_retries)
 
     def __call__(self, method, url, **kwargs):
-        return self.__request.request(method, url, **kwargs)
+        return self.session.request(method, url, **kwargs)
 
     def get(self, url, **kwargs):
-        self.__request_count += 1
-        if self.__is_exceeded():
-            self.__request.close()
-
-        return self.__request.get(url, **kwargs)
+        return self.session.get(url, **kwargs)
 
     def post(self, url, **kwargs):
-        self.__request_count += 1
-        if self.__is_exceeded():
-            self.__request.close()
+        return self.session.post(url, **kwargs)
+
+    def preconnect(self, url):
+        self.session.head(url, allow_redirects=False)
+
+    @property
+    def session(self):
+        session = getattr(self.__local, 'session', None)
 
-        return self.__request.post(url, **kwargs)
+        if session is None:
+            session = self.__local.session = self.__get_session()
+
+        return session
 
     def set_max_request(self, max_request):
-        self.__MAX_REQUEST = max_request
+        warnings.warn("'set_max_request' is deprecated and has no effect, "
+                      "connections are now kept in a pool",
+                      DeprecationWarning, stacklevel=2)
+
+    def pool_stats(self):
+        stats = {'pools': 0, 'requests': 0, 'connections': 0}
+
+        for adapter in self.__adapters:
+            pools = adapter.poolmanager.pools
+
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+
+                stats['pools'] += 1
+                stats['requests'] += pool.num_requests
+                stats['connections'] += pool.num_connections
+
+        stats['misses'] = stats['connections']
+        stats['hits'] = max(stats['requests'] - stats['connections'], 0)
+
+        return stats
+
+    def close(self):
+        for adapter in self.__adapters:
+            adapter.close()
+
+    def __get_session(self):
+        session = requests.Session()
+
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+
+        for prefix, adapter in self.__mounts:
+            session.mount(prefix, adapter)
+
+        return session
+
+    def __mount_adapter(self, prefixes, pool_connections, pool_maxsize, pool_block, max_retries):
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block,
+                              max_retries=max_retries)
+
+        for prefix in prefixes:
+            self.__mounts.append((prefix, adapter))
+
+        self.__adapters.append(adapter)
+
+        return adapter
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_Requests__local']
+
+        return state
 
-    def __is_exceeded(self):
-        return self.__request_count > self.__MAX_REQUEST
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__local = threading.local()
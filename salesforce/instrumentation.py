@@ -0,0 +1,248 @@
+from urlparse import urlparse
+import bisect
+import sys
+import threading
+import time
+
+
+class RequestEvent(object):
+    __slots__ = ('method', 'url', 'resource', 'status', 'started_at', 'latency',
+                 'request_bytes', 'response_bytes', 'retries', 'error')
+
+    def __init__(self, method, url, resource, request_bytes=None, retries=0):
+        self.method = method
+        self.url = url
+        self.resource = resource
+        self.status = None
+        self.started_at = time.time()
+        self.latency = None
+        self.request_bytes = request_bytes
+        self.response_bytes = None
+        self.retries = retries
+        self.error = None
+
+    def to_dict(self):
+        return dict((name, getattr(self, name)) for name in RequestEvent.__slots__)
+
+
+class RequestHook(object):
+    def __init__(self):
+        super(RequestHook, self).__init__()
+
+    def on_start(self, event):
+        pass
+
+    def on_end(self, event):
+        pass
+
+
+class Instrumentation(object):
+    def __init__(self, hooks=None):
+        super(Instrumentation, self).__init__()
+
+        self.__hooks = tuple(hooks or ())
+        self.__lock = threading.Lock()
+
+    @property
+    def hooks(self):
+        return self.__hooks
+
+    def add_hook(self, hook):
+        with self.__lock:
+            self.__hooks = self.__hooks + (hook,)
+
+        return hook
+
+    def remove_hook(self, hook):
+        with self.__lock:
+            self.__hooks = tuple(registered for registered in self.__hooks
+                                 if registered is not hook)
+
+    def call(self, send, method, url, headers, retries=0, **kwargs):
+        hooks = self.__hooks
+        event = RequestEvent(method,
+                             url,
+                             get_resource_type(url, headers),
+                             get_body_size(kwargs.get('data')),
+                             retries)
+
+        for hook in hooks:
+            hook.on_start(event)
+
+        started = time.time()
+
+        try:
+            response = send(method, url, headers=headers, **kwargs)
+        except Exception:
+            event.error = sys.exc_info()[1]
+            raise
+        else:
+            event.status = response.status_code
+            event.response_bytes = get_response_size(response, kwargs.get('stream', False))
+        finally:
+            event.latency = time.time() - started
+
+            for hook in hooks:
+                hook.on_end(event)
+
+        return response
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_Instrumentation__lock']
+
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__lock = threading.Lock()
+
+
+class LatencyHistogram(object):
+    BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, bounds=None):
+        super(LatencyHistogram, self).__init__()
+
+        self.bounds = tuple(sorted(bounds or LatencyHistogram.BOUNDS))
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.errors = 0
+
+    def add(self, latency, error=False):
+        self.buckets[bisect.bisect_left(self.bounds, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+
+        if error:
+            self.errors += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+
+        rank = percent / 100.0 * self.count
+        seen = 0
+
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+
+            if seen >= rank and bucket:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count,
+                'errors': self.errors,
+                'mean': self.mean,
+                'min': self.min,
+                'max': self.max,
+                'p50': self.percentile(50),
+                'p90': self.percentile(90),
+                'p99': self.percentile(99),
+                'buckets': zip(self.bounds + (None,), self.buckets)}
+
+
+class LatencyMetrics(RequestHook):
+    def __init__(self, bounds=None):
+        super(LatencyMetrics, self).__init__()
+
+        self.bounds = bounds
+
+        self.__histograms = {}
+        self.__lock = threading.Lock()
+
+    def on_end(self, event):
+        error = event.error is not None or (event.status or 0) >= 400
+
+        with self.__lock:
+            histogram = self.__histograms.get(event.resource)
+
+            if histogram is None:
+                histogram = self.__histograms[event.resource] = LatencyHistogram(self.bounds)
+
+            histogram.add(event.latency, error)
+
+    def get_histogram(self, resource):
+        with self.__lock:
+            return self.__histograms.get(resource)
+
+    def snapshot(self):
+        with self.__lock:
+            return dict((resource, histogram.to_dict())
+                        for resource, histogram in self.__histograms.items())
+
+    def reset(self):
+        with self.__lock:
+            self.__histograms.clear()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_LatencyMetrics__lock']
+
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__lock = threading.Lock()
+
+
+def get_resource_type(url, headers=None):
+    if headers and 'SOAPAction' in headers:
+        return 'soap:' + headers['SOAPAction']
+
+    parts = [part for part in urlparse(url).path.split('/') if part]
+
+    if len(parts) < 2 or parts[0] != 'services':
+        return '/'.join(parts)
+
+    if parts[1] != 'data':
+        return parts[1]
+
+    if len(parts) < 4:
+        return 'versions'
+
+    name = parts[3]
+
+    if name in ('composite', 'jobs') and len(parts) > 4:
+        return name + '/' + parts[4]
+
+    if name == 'sobjects' and parts[-1] == 'describe':
+        return 'describe'
+
+    return name
+
+
+def get_body_size(data):
+    if isinstance(data, unicode):
+        return len(data.encode('utf-8'))
+
+    if isinstance(data, (str, bytearray)):
+        return len(data)
+
+    return None
+
+
+def get_response_size(response, stream):
+    length = response.headers.get('Content-Length')
+
+    if length is not None:
+        try:
+            return int(length)
+        except ValueError:
+            pass
+
+    if stream:
+        return None
+
+    return len(response.content)
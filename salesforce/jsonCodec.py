@@ -0,0 +1,100 @@
+import json
+
+
+class JSONCodec(object):
+    name = None
+
+    def __init__(self):
+        super(JSONCodec, self).__init__()
+
+    def dumps(self, value):
+        raise NotImplementedError
+
+    def loads(self, data):
+        raise NotImplementedError
+
+    def __reduce__(self):
+        return get_json_codec, (self.name,)
+
+
+class StdlibCodec(JSONCodec):
+    name = 'json'
+
+    def __init__(self):
+        super(StdlibCodec, self).__init__()
+
+        self.__encoder = json.JSONEncoder(separators=(',', ':'))
+        self.__decoder = json.JSONDecoder()
+
+    def dumps(self, value):
+        return self.__encoder.encode(value)
+
+    def loads(self, data):
+        return self.__decoder.decode(data)
+
+
+class ModuleCodec(JSONCodec):
+    def __init__(self, module):
+        super(ModuleCodec, self).__init__()
+
+        self.__module = module
+        self.name = module.__name__
+
+    def dumps(self, value):
+        return self.__module.dumps(value)
+
+    def loads(self, data):
+        return self.__module.loads(data)
+
+
+class SimplejsonCodec(ModuleCodec):
+    def __init__(self, module):
+        super(SimplejsonCodec, self).__init__(module)
+
+        self.__encoder = module.JSONEncoder(separators=(',', ':'))
+        self.__decoder = module.JSONDecoder()
+
+    def dumps(self, value):
+        return self.__encoder.encode(value)
+
+    def loads(self, data):
+        return self.__decoder.decode(data)
+
+
+CODECS = (('ujson', ModuleCodec),
+          ('simplejson', SimplejsonCodec))
+
+
+def get_json_codec(name=None):
+    if isinstance(name, JSONCodec):
+        return name
+
+    if name is None or name == 'json':
+        return StdlibCodec()
+
+    for module_name, codec_class in CODECS:
+        if module_name != name:
+            continue
+
+        try:
+            module = __import__(module_name)
+        except ImportError:
+            raise ValueError("JSON codec '{0}' is not installed".format(name))
+
+        return codec_class(module)
+
+    raise ValueError("Unknown JSON codec '{0}'".format(name))
+
+
+def get_available_codecs():
+    names = []
+
+    for module_name, _ in CODECS:
+        try:
+            __import__(module_name)
+        except ImportError:
+            continue
+
+        names.append(module_name)
+
+    return names + ['json']
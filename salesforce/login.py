@@ -1,35 +1,111 @@
 from urlparse import urlparse
 from exception import AuthenticationFailed
+import threading
 import urllib
 import utils
 import xml.dom.minidom
 
 
 class Authentication(object):
-    def __init__(self, access_token='', instance_url=''):
+    def __init__(self, access_token='', instance_url='', refresh_token=None, login=None):
         super(Authentication, self).__init__()
 
-        self.__access_token = access_token
-        self.__instance_url = instance_url
+        self.__credentials = (access_token, instance_url, refresh_token)
+        self.__lock = threading.Lock()
+
+        self.login = login
 
     @property
     def access_token(self):
-        return self.__access_token
+        return self.__credentials[0]
 
     @property
     def instance_url(self):
-        return self.__instance_url
+        return self.__credentials[1]
+
+    @property
+    def refresh_token(self):
+        return self.__credentials[2]
 
     def is_authenticated(self):
-        return self.access_token != '' and self.instance_url != ''
+        access_token, instance_url, _ = self.__credentials
+
+        return access_token != '' and instance_url != ''
+
+    def refresh(self, stale_access_token):
+        if self.login is None:
+            return False
+
+        with self.__lock:
+            if self.access_token == stale_access_token:
+                fresh = self.login.renew(self)
+
+                self.__credentials = (fresh.access_token,
+                                      fresh.instance_url,
+                                      fresh.refresh_token or self.refresh_token)
+
+        return True
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_Authentication__lock']
+
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__lock = threading.Lock()
 
 
 class Login(object):
-    def __init__(self, httplib, url_resources):
+    def __init__(self, httplib, url_resources, token_store=None):
         super(Login, self).__init__()
 
         self.httplib = httplib
         self.url_resources = url_resources
+        self.token_store = token_store
+
+    def authenticate(self, **kwargs):
+        raise NotImplementedError
+
+    def get_token_key(self):
+        return None
+
+    def login(self, **kwargs):
+        key = self.get_token_key()
+        auth = None
+
+        if key is not None and self.token_store is not None:
+            auth = self.token_store.get(key)
+
+        if auth is None:
+            auth = self.authenticate(**kwargs)
+
+            if key is not None and self.token_store is not None:
+                self.token_store.set(key, auth)
+
+        auth.login = self
+
+        return auth
+
+    def renew(self, auth):
+        key = self.get_token_key()
+
+        if key is not None and self.token_store is not None:
+            stored = self.token_store.get(key)
+
+            if stored is not None and stored.access_token != auth.access_token:
+                return stored
+
+        fresh = self.reauthenticate(auth)
+
+        if key is not None and self.token_store is not None:
+            self.token_store.set(key, fresh)
+
+        return fresh
+
+    def reauthenticate(self, auth):
+        return self.authenticate()
 
 
 class LoginWithRestAPI(Login):
@@ -37,8 +113,8 @@ class LoginWithRestAPI(Login):
     TOKEN_PATH = '/services/oauth2/token'
     AUTH_PATH = '/services/oauth2/authorize'
 
-    def __init__(self, httplib, url_resources, **kwargs):
-        super(LoginWithRestAPI, self).__init__(httplib, url_resources)
+    def __init__(self, httplib, url_resources, token_store=None, **kwargs):
+        super(LoginWithRestAPI, self).__init__(httplib, url_resources, token_store)
 
         self.__validate_kwargs(**kwargs)
 
@@ -85,8 +161,31 @@ class LoginWithRestAPI(Login):
 
         access_token = response['access_token']
         instance_url = response['instance_url']
+        refresh_token = response.get('refresh_token')
 
-        return Authentication(access_token, instance_url)
+        return Authentication(access_token, instance_url, refresh_token)
+
+    def get_token_key(self):
+        if self.redirect:
+            return None
+
+        return '{0}:{1}:{2}'.format(self.url_resources.domain, self.client_id, self.username)
+
+    def reauthenticate(self, auth):
+        if not self.redirect:
+            return self.authenticate()
+
+        if auth.refresh_token is None:
+            raise AuthenticationFailed("Session expired and no 'refresh_token' is available")
+
+        headers = {'content-type': 'application/x-www-form-urlencoded'}
+        response = utils.send_request('POST',
+                                      self.httplib,
+                                      self.__get_token_endpoint(),
+                                      headers,
+                                      data=self.__get_token_using_refresh_token_params(auth.refresh_token))
+
+        return Authentication(response['access_token'], response['instance_url'], auth.refresh_token)
 
     def __get_token_endpoint(self):
         domain_name = self.url_resources.domain
@@ -137,6 +236,12 @@ class LoginWithRestAPI(Login):
                 'redirect_uri': self.redirect_uri,
                 'code': code}
 
+    def __get_token_using_refresh_token_params(self, refresh_token):
+        return {'grant_type': 'refresh_token',
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'refresh_token': refresh_token}
+
     def __get_server_or_user_params(self):
         return {'response_type': self.response_type,
                 'client_id': self.client_id,
@@ -146,8 +251,8 @@ class LoginWithRestAPI(Login):
 class LoginWithSoapAPI(Login):
     AUTH_SITE = "https://{domain}.salesforce.com/services/Soap/u/{version}"
 
-    def __init__(self, httplib, url_resources, **kwargs):
-        super(LoginWithSoapAPI, self).__init__(httplib, url_resources)
+    def __init__(self, httplib, url_resources, token_store=None, **kwargs):
+        super(LoginWithSoapAPI, self).__init__(httplib, url_resources, token_store)
 
         self.__validate_kwargs(**kwargs)
 
@@ -172,6 +277,9 @@ class LoginWithSoapAPI(Login):
 
         return Authentication(access_token, instance_url)
 
+    def get_token_key(self):
+        return '{0}:{1}'.format(self.url_resources.domain, self.username)
+
     def __get_token_endpoint(self):
         domain_name = self.url_resources.domain
 
@@ -0,0 +1,82 @@
+from Queue import Queue, Full, Empty
+import sys
+import threading
+
+
+class PrefetchIterator(object):
+    POLL_INTERVAL = 0.1
+
+    __DONE = object()
+
+    def __init__(self, iterable, depth=1):
+        super(PrefetchIterator, self).__init__()
+
+        self.__stopped = threading.Event()
+        self.__finished = True
+
+        if depth < 1:
+            raise ValueError("'depth' should be greater than 0")
+
+        self.__queue = Queue(depth)
+        self.__finished = False
+
+        self.__worker = threading.Thread(target=_fill,
+                                         args=(iter(iterable),
+                                               self.__queue,
+                                               self.__stopped,
+                                               self.__DONE))
+        self.__worker.daemon = True
+        self.__worker.start()
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        if self.__finished:
+            raise StopIteration
+
+        item, exc_info = self.__queue.get()
+
+        if exc_info is not None:
+            self.__finished = True
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+        if item is self.__DONE:
+            self.__finished = True
+            raise StopIteration
+
+        return item
+
+    def close(self):
+        self.__finished = True
+        self.__stopped.set()
+
+        while self.__worker.is_alive():
+            try:
+                self.__queue.get(timeout=PrefetchIterator.POLL_INTERVAL)
+            except Empty:
+                pass
+
+    def __del__(self):
+        if not self.__finished:
+            self.__stopped.set()
+
+
+def _fill(iterator, queue, stopped, done):
+    while not stopped.is_set():
+        try:
+            entry = (next(iterator), None)
+        except StopIteration:
+            entry = (done, None)
+        except Exception:
+            entry = (None, sys.exc_info())
+
+        while not stopped.is_set():
+            try:
+                queue.put(entry, timeout=PrefetchIterator.POLL_INTERVAL)
+                break
+            except Full:
+                continue
+
+        if entry[0] is done or entry[1] is not None:
+            return
@@ -0,0 +1,210 @@
+from Queue import Queue, Full, Empty
+from datetime import datetime
+import sys
+import threading
+import utils
+
+BASE62 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+ID_LENGTH = 15
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+class ParallelQuery(object):
+    POLL_INTERVAL = 0.1
+
+    __DONE = object()
+
+    def __init__(self, api, sobject, fields, where=None, chunks=8, workers=4,
+                 ordered=False, chunk_field='Id', include_deleted=False, queue_size=2):
+        super(ParallelQuery, self).__init__()
+
+        if chunk_field not in ('Id', 'CreatedDate'):
+            raise ValueError("'chunk_field' should be 'Id' or 'CreatedDate'")
+
+        if chunks < 1 or workers < 1 or queue_size < 1:
+            raise ValueError("'chunks', 'workers' and 'queue_size' should be greater than 0")
+
+        self.api = api
+        self.sobject = sobject
+        self.fields = fields
+        self.where = where
+        self.chunks = chunks
+        self.workers = workers
+        self.ordered = ordered
+        self.chunk_field = chunk_field
+        self.include_deleted = include_deleted
+        self.queue_size = queue_size
+
+    def get_queries(self):
+        return [utils.get_soql(self.sobject, self.fields, self.__combine(condition))
+                for condition in self.get_conditions()]
+
+    def get_conditions(self):
+        lowest = self.__get_boundary('ASC')
+        highest = self.__get_boundary('DESC')
+
+        if lowest is None or highest is None:
+            return [None]
+
+        if self.chunk_field == 'Id':
+            bounds = _split_ids(lowest, highest, self.chunks)
+        else:
+            bounds = _split_datetimes(lowest, highest, self.chunks)
+
+        conditions = []
+
+        for index in xrange(len(bounds) + 1):
+            condition = []
+
+            if index > 0:
+                condition.append('{0} >= {1}'.format(self.chunk_field, bounds[index - 1]))
+
+            if index < len(bounds):
+                condition.append('{0} < {1}'.format(self.chunk_field, bounds[index]))
+
+            conditions.append(' AND '.join(condition) or None)
+
+        return conditions
+
+    def __iter__(self):
+        queries = self.get_queries()
+        stopped = threading.Event()
+        tasks = Queue()
+
+        if self.ordered:
+            queues = [Queue(self.queue_size) for _ in queries]
+        else:
+            queues = [Queue(self.queue_size * self.workers)] * len(queries)
+
+        for task in enumerate(queries):
+            tasks.put(task)
+
+        for _ in xrange(min(self.workers, len(queries))):
+            worker = threading.Thread(target=_run,
+                                      args=(self.api, tasks, queues, stopped,
+                                            self.include_deleted, self.__DONE))
+            worker.daemon = True
+            worker.start()
+
+        try:
+            if self.ordered:
+                for queue in queues:
+                    for record in _drain(queue, 1, self.__DONE):
+                        yield record
+            else:
+                for record in _drain(queues[0], len(queries), self.__DONE):
+                    yield record
+        finally:
+            stopped.set()
+
+    def __get_boundary(self, direction):
+        query_string = '{0} ORDER BY {1} {2} LIMIT 1'.format(
+            utils.get_soql(self.sobject, [self.chunk_field], self.where),
+            self.chunk_field,
+            direction)
+
+        records = self.api.query_iter(query_string, self.include_deleted)
+
+        try:
+            for record in records:
+                return record[self.chunk_field]
+        finally:
+            records.close()
+
+        return None
+
+    def __combine(self, condition):
+        if condition is None:
+            return self.where
+
+        if self.where:
+            return '({0}) AND ({1})'.format(self.where, condition)
+
+        return condition
+
+
+def _run(api, tasks, queues, stopped, include_deleted, done):
+    while not stopped.is_set():
+        try:
+            index, query_string = tasks.get_nowait()
+        except Empty:
+            return
+
+        queue = queues[index]
+
+        try:
+            for page in api.query_pages(query_string, include_deleted):
+                if not _put(queue, (page['records'], None), stopped):
+                    return
+
+            _put(queue, (done, None), stopped)
+        except Exception:
+            _put(queue, (None, sys.exc_info()), stopped)
+            return
+
+
+def _put(queue, entry, stopped):
+    while not stopped.is_set():
+        try:
+            queue.put(entry, timeout=ParallelQuery.POLL_INTERVAL)
+            return True
+        except Full:
+            continue
+
+    return False
+
+
+def _drain(queue, producers, done):
+    while producers:
+        records, exc_info = queue.get()
+
+        if exc_info is not None:
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+        if records is done:
+            producers -= 1
+            continue
+
+        for record in records:
+            yield record
+
+
+def _split_ids(lowest, highest, chunks):
+    low = _decode_id(lowest)
+    high = _decode_id(highest)
+    step = (high - low) // chunks
+
+    if step == 0:
+        return []
+
+    return ["'{0}'".format(_encode_id(low + step * index)) for index in xrange(1, chunks)]
+
+
+def _split_datetimes(lowest, highest, chunks):
+    low = datetime.strptime(lowest[:19], DATETIME_FORMAT)
+    high = datetime.strptime(highest[:19], DATETIME_FORMAT)
+    step = (high - low) // chunks
+
+    if not step:
+        return []
+
+    return [(low + step * index).strftime(DATETIME_FORMAT) + 'Z' for index in xrange(1, chunks)]
+
+
+def _decode_id(record_id):
+    value = 0
+
+    for char in record_id[:ID_LENGTH]:
+        value = value * 62 + BASE62.index(char)
+
+    return value
+
+
+def _encode_id(value):
+    chars = []
+
+    for _ in xrange(ID_LENGTH):
+        value, digit = divmod(value, 62)
+        chars.append(BASE62[digit])
+
+    return ''.join(reversed(chars))
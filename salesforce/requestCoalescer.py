@@ -0,0 +1,68 @@
+from executor import Future
+import sys
+import threading
+
+
+class RequestCoalescer(object):
+    def __init__(self):
+        super(RequestCoalescer, self).__init__()
+
+        self.__lock = threading.Lock()
+        self.__in_flight = {}
+        self.__calls = 0
+        self.__coalesced = 0
+
+    def call(self, key, func, *args, **kwargs):
+        with self.__lock:
+            future = self.__in_flight.get(key)
+
+            if future is None:
+                future = self.__in_flight[key] = Future()
+                self.__calls += 1
+                leader = True
+            else:
+                self.__coalesced += 1
+                leader = False
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except:
+            exc_info = sys.exc_info()
+            self.__finish(key)
+            future.set_exc_info(exc_info)
+
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+        self.__finish(key)
+        future.set_result(result)
+
+        return result
+
+    def stats(self):
+        with self.__lock:
+            return {'calls': self.__calls,
+                    'coalesced': self.__coalesced,
+                    'in_flight': len(self.__in_flight)}
+
+    def reset_stats(self):
+        with self.__lock:
+            self.__calls = 0
+            self.__coalesced = 0
+
+    def __finish(self, key):
+        with self.__lock:
+            del self.__in_flight[key]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_RequestCoalescer__lock']
+        state['_RequestCoalescer__in_flight'] = {}
+
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__lock = threading.Lock()
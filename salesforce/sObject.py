@@ -1,10 +1,11 @@
 class SObject(object):
-    def __init__(self, httplib, auth, url_resources):
+    def __init__(self, httplib, auth, url_resources, describe_cache=None):
         super(SObject, self).__init__()
 
         self.__httplib = httplib
         self.__auth = auth
         self.__url_resources = url_resources
+        self.__describe_cache = describe_cache
 
     @property
     def httplib(self):
@@ -18,6 +19,10 @@ class SObject(object):
     def url_resources(self):
         return self.__url_resources 
 
+    @property
+    def describe_cache(self):
+        return self.__describe_cache
+
     def describe(self):
         raise NotImplementedError
 
@@ -4,13 +4,17 @@ from httpClient import HTTPConnection
 
 
 class SalesforceAPI(object):
-    def __init__(self, url_resources, httplib=Requests(),  auth=None):
+    def __init__(self, url_resources, httplib=Requests(),  auth=None, token_store=None, describe_cache=None):
         super(SalesforceAPI, self).__init__()
 
         self.__httplib = httplib
         self.__url_resources = url_resources
         self.__auth = auth
         self.__login = None
+        self.__sobjects = {}
+        self.__describe_cache = describe_cache
+
+        self.token_store = token_store
 
     @property
     def url_resources(self):
@@ -26,6 +30,7 @@ class SalesforceAPI(object):
             raise TypeError("Must be a subclass of Authentication!")
 
         self.__auth = auth
+        self.__sobjects = {}
 
     @property
     def httplib(self):
@@ -37,6 +42,31 @@ class SalesforceAPI(object):
             raise TypeError("Must be a subclass of HTTPConnection!")
 
         self.__httplib = httplib
+        self.__sobjects = {}
+
+    @property
+    def describe_cache(self):
+        return self.__describe_cache
+
+    @describe_cache.setter
+    def describe_cache(self, describe_cache):
+        self.__describe_cache = describe_cache
+        self.__sobjects = {}
+
+    def get_sobject(self, name, sobject_class, **kwargs):
+        sobject = self.__sobjects.get(name)
+
+        if sobject is None:
+            sobject = sobject_class(name,
+                                    self.httplib,
+                                    self.auth,
+                                    self.url_resources,
+                                    self.describe_cache,
+                                    **kwargs)
+
+            self.__sobjects[name] = sobject
+
+        return sobject
 
     def __getattr__(self, name):
         raise NotImplementedError
@@ -53,6 +83,12 @@ class SalesforceAPI(object):
     def query_more(self, query_url):
         raise NotImplementedError
 
+    def query_iter(self, query_string, include_deleted=False, prefetch=0):
+        raise NotImplementedError
+
+    def query_pages(self, query_string, include_deleted=False, prefetch=0):
+        raise NotImplementedError
+
     def search(self, search_string):
         raise NotImplementedError
 
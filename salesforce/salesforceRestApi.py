@@ -1,87 +1,105 @@
 from login import LoginWithRestAPI
 from urlResources import ResourcesName
 from salesforceApi import SalesforceAPI
-from exception import AuthenticationFailed
+from exception import AuthenticationFailed, CollectionRequestFailed, RequestFailed
 from sObject import SObject
+from pagination import PrefetchIterator
+from describeCache import DescribeCache
+import copy
+import sys
 import utils
-import json
+import requests
+import threading
 
 
 class SalesforceRestAPI(SalesforceAPI):
     def __init__(self,
                  httplib,
                  url_resources,
-                 auth=None):
-        super(SalesforceRestAPI, self).__init__(url_resources, httplib, auth)
+                 auth=None,
+                 token_store=None,
+                 describe_cache=None):
+        super(SalesforceRestAPI, self).__init__(url_resources, httplib, auth, token_store, describe_cache)
 
         self.__login_api = None
+        self.__login_lock = threading.Lock()
 
     def authenticate(self, **kwargs):
-        if 'code' in kwargs:
-            if not self.__login_api:
-                raise AuthenticationFailed("You first need to use the get_auth_uri() to get the 'code'")
+        with self.__login_lock:
+            if 'code' in kwargs:
+                login_api = self.__login_api
 
-        else:
-            self.__login_api = login_api = LoginWithRestAPI(
-                self.httplib,
-                self.url_resources,
-                **kwargs)
+                if not login_api:
+                    raise AuthenticationFailed("You first need to use the get_auth_uri() to get the 'code'")
 
-        return self.__login_api.authenticate(**kwargs)
+            else:
+                self.__login_api = login_api = LoginWithRestAPI(
+                    self.httplib,
+                    self.url_resources,
+                    self.token_store,
+                    **kwargs)
+
+        return login_api.login(**kwargs)
 
     def get_auth_uri(self, **kwargs):
-        self.__login_api = login_api = LoginWithRestAPI(
+        login_api = LoginWithRestAPI(
             self.httplib,
             self.url_resources,
+            self.token_store,
             **kwargs)
 
+        with self.__login_lock:
+            self.__login_api = login_api
+
         return login_api.get_auth_uri()
 
     @utils.authenticate
     def query(self, query_string):
-        query_url = self.url_resources.get_full_resource_url(
-            self.auth.instance_url,
-            ResourcesName.get_resource_name("query"))
-
-        params = {'q': query_string}
-        return self.get(query_url, params)
+        return self.__query('query', query_string)
 
     @utils.authenticate
     def query_all(self, query_string):
-        query_url = self.url_resources.get_full_resource_url(
-            self.auth.instance_url,
-            ResourcesName.get_resource_name("queryAll"))
+        pages = self.query_pages(query_string, include_deleted=True)
+        response = next(pages)
 
-        params = {'q': query_string}
-        resp = self.get(query_url, params)
+        for page in pages:
+            response['records'].extend(page['records'])
 
-        def do_query_all(response):
-            if response['done']:
-                return response
-            else:
-                result = self.query_more(response['nextRecordsUrl'])
+        response['done'] = True
+        response.pop('nextRecordsUrl', None)
 
-                response['done'] = result['done']
-                response['totalSize'] += result['totalSize']
-                response['records'].extend(result['records'])
+        return response
 
-                return do_query_all(response)
+    # Not wrapped in utils.authenticate, each page request renews an expired session
+    def query_iter(self, query_string, include_deleted=False, prefetch=0):
+        pages = self.query_pages(query_string, include_deleted, prefetch)
 
-        return do_query_all(resp)
+        try:
+            for page in pages:
+                for record in page['records']:
+                    yield record
+        finally:
+            pages.close()
+
+    def query_pages(self, query_string, include_deleted=False, prefetch=0):
+        pages = self.__iter_pages(query_string, include_deleted)
+
+        if prefetch:
+            return PrefetchIterator(pages, prefetch)
+
+        return pages
 
     @utils.authenticate
     def query_more(self, url):
+        if url.startswith(self.auth.instance_url) or \
+           url.startswith(self.url_resources.get_resource_url()):
+            return self.get(url)
+
         query_url = self.url_resources.get_full_resource_url(
             self.auth.instance_url,
             ResourcesName.get_resource_name("query"))
 
-        if url.startswith(query_url,
-                          len(self.auth.instance_url)):
-            get_url = '{0}/{1}'.format(self.auth.instance_url, url)
-        else:
-            get_url = '{0}/{1}'.format(query_url, url)
-
-        return self.get(get_url)
+        return self.get('{0}{1}'.format(query_url, url.lstrip('/')))
 
     @utils.authenticate
     def search(self, search_string):
@@ -107,23 +125,44 @@ class SalesforceRestAPI(SalesforceAPI):
     def post(self, post_url, data):
         return self.__send_request('POST',
                                    post_url,
-                                   data=json.dumps(data))
+                                   data=utils.json_dumps(self.httplib, data))
 
     @utils.authenticate
     def __getattr__(self, name):
         if not name[0].isalpha():
             return object.__getattribute__(self, name)
 
-        return RestSObject(name,
-                           self.httplib,
-                           self.auth,
-                           self.url_resources)
+        return self.get_sobject(name, RestSObject)
 
     def __getstate__(self):
-        return self.__dict__
+        state = self.__dict__.copy()
+        del state['_SalesforceRestAPI__login_lock']
+
+        return state
 
     def __setstate__(self, d):
         self.__dict__.update(d)
+        self.__login_lock = threading.Lock()
+
+    @utils.authenticate
+    def __query(self, resource_name, query_string):
+        query_url = self.url_resources.get_full_resource_url(
+            self.auth.instance_url,
+            ResourcesName.get_resource_name(resource_name))
+
+        params = {'q': query_string}
+        return self.get(query_url, params)
+
+    def __iter_pages(self, query_string, include_deleted):
+        page = self.__query('queryAll' if include_deleted else 'query', query_string)
+
+        while True:
+            yield page
+
+            if page['done']:
+                break
+
+            page = self.query_more(page['nextRecordsUrl'])
 
     def __send_request(self, method, url, **kwargs):
         headers = utils.json_content_headers(self.auth.access_token)
@@ -138,24 +177,85 @@ class SalesforceRestAPI(SalesforceAPI):
 
 
 class RestSObject(SObject):
-    def __init__(self, name, httplib, auth, url_resources):
-        super(RestSObject, self).__init__(httplib, auth, url_resources)
+    COLLECTION_SIZE = 200
+
+    def __init__(self, name, httplib, auth, url_resources, describe_cache=None):
+        super(RestSObject, self).__init__(httplib, auth, url_resources, describe_cache)
 
         self.__name = name
 
     @utils.authenticate
     def describe(self):
-        return self.get('/describe')
+        if self.describe_cache is None:
+            return self.get('/describe')
+
+        key = DescribeCache.get_key('rest',
+                                    self.auth.instance_url,
+                                    self.url_resources.version,
+                                    self.__name)
+        entry = self.describe_cache.get(key)
+
+        if entry is not None and entry.is_fresh(self.describe_cache.ttl):
+            return copy.deepcopy(entry.value)
+
+        describe_url = '{0}/describe'.format(
+            self.url_resources.get_resource_sobject_url(
+                self.auth.instance_url,
+                ResourcesName.get_resource_name("sobject"),
+                self.__name))
+
+        headers = utils.json_content_headers(self.auth.access_token)
+
+        if entry is not None:
+            headers.update(entry.get_validators())
+
+        response = utils.send_raw_request('GET',
+                                          self.httplib,
+                                          describe_url,
+                                          headers)
+
+        if entry is not None and response.status_code == requests.codes.not_modified:
+            self.describe_cache.touch(key)
+            return copy.deepcopy(entry.value)
+
+        utils.verify_response(response)
+
+        value = utils.json_loads(self.httplib, response.content)
+        self.describe_cache.set(key,
+                                copy.deepcopy(value),
+                                response.headers.get('ETag'),
+                                response.headers.get('Last-Modified'))
+
+        return value
 
     @utils.authenticate
-    def create(self, data):
-        return self.post(data)
+    def create(self, data, all_or_none=False):
+        """
+        Lists of records go through sObject Collections 200 at a time, so
+        all_or_none only rolls back the failing chunk; a failed chunk raises
+        CollectionRequestFailed with the results of the chunks sent before it.
+        """
+        if isinstance(data, dict):
+            return self.post(data)
+
+        records = (self.__get_collection_record(record) for record in data)
+
+        return self.__save_collection('POST', records, all_or_none)
 
     @utils.authenticate
-    def update(self, data):
+    def update(self, data, all_or_none=False):
+        """
+        Lists of [id, record] pairs are sent like create, with the same
+        per-chunk all_or_none and CollectionRequestFailed semantics.
+        """
         if not isinstance(data, list):
             raise TypeError("'update' require a parameter type 'list'")
 
+        if data and isinstance(data[0], (list, tuple)):
+            records = (self.__get_collection_record(item[1], item[0]) for item in data)
+
+            return self.__save_collection('PATCH', records, all_or_none)
+
         record_id = data[0]
         records = data[1]
 
@@ -168,10 +268,17 @@ class RestSObject(SObject):
 
         return self.__send_request('PATCH',
                                    update_url,
-                                   data=json.dumps(records))
+                                   data=utils.json_dumps(self.httplib, records))
 
     @utils.authenticate
-    def delete(self, record_id):
+    def delete(self, record_id, all_or_none=False):
+        """
+        Lists of ids are deleted like create, with the same per-chunk
+        all_or_none and CollectionRequestFailed semantics.
+        """
+        if isinstance(record_id, (list, tuple)):
+            return self.__delete_collection(record_id, all_or_none)
+
         delete_url = '{0}/{1}'.format(
             self.url_resources.get_resource_sobject_url(
                 self.auth.instance_url,
@@ -194,7 +301,7 @@ class RestSObject(SObject):
 
         return self.__send_request('POST',
                                    post_url,
-                                   data=json.dumps(data))
+                                   data=utils.json_dumps(self.httplib, data))
 
     @utils.authenticate
     def get(self, url=None, params=None):
@@ -210,6 +317,62 @@ class RestSObject(SObject):
                                    get_url,
                                    params=params)
 
+    def __get_collection_record(self, record, record_id=None):
+        collection_record = dict(record)
+        collection_record['attributes'] = {'type': self.__name}
+
+        if record_id is not None:
+            collection_record['Id'] = record_id
+
+        return collection_record
+
+    def __get_collection_url(self):
+        return self.url_resources.get_full_resource_url(
+            self.auth.instance_url,
+            ResourcesName.get_resource_name("composite_sobjects"))
+
+    def __save_collection(self, method, records, all_or_none):
+        results = []
+
+        try:
+            for chunk in utils.chunks(records, RestSObject.COLLECTION_SIZE):
+                results.extend(self.__send_collection_chunk(
+                    method,
+                    self.__get_collection_url(),
+                    data=utils.json_dumps(self.httplib, {'allOrNone': all_or_none, 'records': chunk})))
+        except RequestFailed as error:
+            self.__raise_collection_failed(error, results)
+
+        return results
+
+    def __delete_collection(self, record_ids, all_or_none):
+        results = []
+
+        for chunk in utils.chunks(record_ids, RestSObject.COLLECTION_SIZE):
+            params = {'ids': ','.join(chunk),
+                      'allOrNone': 'true' if all_or_none else 'false'}
+
+            try:
+                results.extend(self.__send_collection_chunk(
+                    'DELETE',
+                    self.__get_collection_url(),
+                    params=params))
+            except RequestFailed as error:
+                self.__raise_collection_failed(error, results)
+
+        return results
+
+    def __raise_collection_failed(self, error, results):
+        collection_error = CollectionRequestFailed(error.error_code, error.message, results)
+        # Chunks before this one are committed; retrying the whole call would repeat them
+        collection_error.session_renewed = True
+
+        raise collection_error, None, sys.exc_info()[2]
+
+    @utils.authenticate
+    def __send_collection_chunk(self, method, url, **kwargs):
+        return self.__send_request(method, url, **kwargs)
+
     def __send_request(self, method, url, **kwargs):
         headers = utils.json_content_headers(self.auth.access_token)
 
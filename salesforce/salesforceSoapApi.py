@@ -1,73 +1,105 @@
 from salesforceApi import SalesforceAPI
 from login import LoginWithSoapAPI
 from sObject import SObject
+from soapParser import SoapQueryResult, iter_save_results, parse_query_result, parse_search_result
+from soapEnvelope import SoapEnvelope
+from exception import CollectionRequestFailed, RequestFailed
+from executor import Executor
+from pagination import PrefetchIterator
+from describeCache import DescribeCache
+import sys
 import utils
-import xml.dom.minidom
 
 
 class SalesforceSoapAPI(SalesforceAPI):
     def __init__(self,
                  httplib,
                  url_resources,
-                 auth=None):
-        super(SalesforceSoapAPI, self).__init__(url_resources, httplib, auth)
+                 auth=None,
+                 token_store=None,
+                 describe_cache=None):
+        super(SalesforceSoapAPI, self).__init__(url_resources, httplib, auth, token_store, describe_cache)
 
         self.__login_api = None
+        self.__envelope = SoapEnvelope()
+
+    @property
+    def envelope(self):
+        return self.__envelope
 
     def authenticate(self, **kwargs):
-        self.__login_api = LoginWithSoapAPI(
+        self.__login_api = login_api = LoginWithSoapAPI(
             self.httplib,
             self.url_resources,
+            self.token_store,
             **kwargs)
 
-        return self.__login_api.authenticate()
+        return login_api.login()
 
     @utils.authenticate
     def query(self, query_string):
-        return self.post(query_string, SalesforceSoapAPI.Action.QUERY)
+        return self.__decode(self.post(query_string, SalesforceSoapAPI.Action.QUERY, stream=True),
+                             parse_query_result)
 
     @utils.authenticate
     def query_all(self, query_string):
-        response = self.post(query_string, SalesforceSoapAPI.Action.QUERYALL)
-        xml_resp_value = xml.dom.minidom.parseString(response.text)
-
-        def do_query_all(xml_response_value):
-            done = utils.get_element_by_name(xml_response_value, 'done')
-
-            if done:
-                return response
-            else:
-                query_locator = utils.get_element_by_name(xml_response_value, 'queryLocator')
-
-                result = self.query_more(query_locator)
-                xml_result_value = xml.dom.minidom.parseString(result.text)
+        records = []
+        total_size = 0
+
+        for page in self.query_pages(query_string, include_deleted=True):
+            records.extend(page['records'])
+            total_size = page['totalSize']
+
+        return {'done': True,
+                'totalSize': total_size,
+                'records': records}
+
+    # Not wrapped in utils.authenticate, each page request renews an expired session
+    def query_iter(self, query_string, include_deleted=False, prefetch=0):
+        if prefetch:
+            pages = self.query_pages(query_string, include_deleted, prefetch)
+
+            try:
+                for page in pages:
+                    for record in page['records']:
+                        yield record
+            finally:
+                pages.close()
+        else:
+            results = self.__iter_results(query_string, include_deleted)
 
-                done = utils.get_element_by_name(xml_result_value, 'done')
-                total_size = utils.get_element_by_name(xml_result_value, 'totalSize')
-                records = utils.get_element_by_name(xml_result_value, 'records')
+            try:
+                for result in results:
+                    for record in result:
+                        yield record
+            finally:
+                results.close()
 
-                xml_response_value.getElementsByTagName('done').item(0).firstChild.nodeValue = done
-                xml_response_value.getElementsByTagName('totalSize').item(0).firstChild.nodeValue += total_size
-                xml_response_value.getElementsByTagName('records').appendChild(records)
+    def query_pages(self, query_string, include_deleted=False, prefetch=0):
+        pages = (result.to_page()
+                 for result in self.__iter_results(query_string, include_deleted))
 
-                return do_query_all(xml_response_value)
+        if prefetch:
+            return PrefetchIterator(pages, prefetch)
 
-        return do_query_all(xml_resp_value)
+        return pages
 
     @utils.authenticate
     def query_more(self, query_string):
-        return self.post(query_string, SalesforceSoapAPI.Action.QUERYMORE)
+        return self.__decode(self.post(query_string, SalesforceSoapAPI.Action.QUERYMORE, stream=True),
+                             parse_query_result)
 
     @utils.authenticate
     def search(self, search_string):
-        return self.post(search_string, SalesforceSoapAPI.Action.SEARCH)
+        return self.__decode(self.post(search_string, SalesforceSoapAPI.Action.SEARCH, stream=True),
+                             parse_search_result)
 
     @utils.authenticate
     def quick_search(self, search_string):
         return self.search('FIND {%s}' % search_string)
 
     @utils.authenticate
-    def post(self, data, action):
+    def post(self, data, action, **kwargs):
         body = ''
 
         if action == SalesforceSoapAPI.Action.QUERY:
@@ -85,10 +117,7 @@ class SalesforceSoapAPI(SalesforceAPI):
         else:
             raise ValueError("'action' " + action + " is not supported!")
 
-        request_body = utils.soap_request_header().format(
-            access_token=self.auth.access_token,
-            method=action,
-            request=body)
+        request_body = self.__envelope.build(self.auth.access_token, action, body)
 
         post_url = self.url_resources.get_full_resource_url(
             self.auth.instance_url)
@@ -96,7 +125,8 @@ class SalesforceSoapAPI(SalesforceAPI):
         return self.__send_request('POST',
                                    post_url,
                                    action,
-                                   data=request_body)
+                                   data=request_body,
+                                   **kwargs)
 
     @utils.authenticate
     def get(self, get_url, params=None):
@@ -107,10 +137,7 @@ class SalesforceSoapAPI(SalesforceAPI):
         if not name[0].isalpha():
             return object.__getattribute__(self, name)
 
-        return SoapSObject(name,
-                           self.httplib,
-                           self.auth,
-                           self.url_resources)
+        return self.get_sobject(name, SoapSObject, envelope=self.__envelope)
 
     def __getstate__(self):
         return self.__dict__
@@ -118,8 +145,34 @@ class SalesforceSoapAPI(SalesforceAPI):
     def __setstate__(self, d):
         self.__dict__.update(d)
 
+    def __iter_results(self, query_string, include_deleted):
+        action = SalesforceSoapAPI.Action.QUERYALL if include_deleted else SalesforceSoapAPI.Action.QUERY
+        data = query_string
+
+        while True:
+            response = self.post(data, action, stream=True)
+
+            try:
+                result = SoapQueryResult(utils.get_response_stream(response))
+                yield result
+            finally:
+                response.close()
+
+            if result.done or not result.query_locator:
+                break
+
+            data = result.query_locator
+            action = SalesforceSoapAPI.Action.QUERYMORE
+
+    def __decode(self, response, parse):
+        try:
+            return parse(utils.get_response_stream(response))
+        finally:
+            response.close()
+
     def __send_request(self, method, url, action, **kwargs):
-        headers = utils.xml_content_headers(len(kwargs['data']), action)
+        data = kwargs['data']
+        headers = utils.xml_content_headers(len(data) if isinstance(data, str) else None, action)
 
         request_url = utils.get_request_url(url, self.auth.instance_url, self.url_resources.get_resource_url())
 
@@ -137,35 +190,53 @@ class SalesforceSoapAPI(SalesforceAPI):
 
 
 class SoapSObject(SObject):
-    def __init__(self, name, httplib, auth, url_resources):
-        super(SoapSObject, self).__init__(httplib, auth, url_resources)
+    BATCH_SIZE = 200
+
+    def __init__(self, name, httplib, auth, url_resources, describe_cache=None, envelope=None):
+        super(SoapSObject, self).__init__(httplib, auth, url_resources, describe_cache)
 
         self.__name = name
+        self.__envelope = envelope or SoapEnvelope()
 
     @utils.authenticate
     def describe(self):
-        return self.post(None, SoapSObject.Action.DESCRIBE)
+        if self.describe_cache is None:
+            return self.post(None, SoapSObject.Action.DESCRIBE)
+
+        key = DescribeCache.get_key('soap',
+                                    self.auth.instance_url,
+                                    self.url_resources.version,
+                                    self.__name)
+        entry = self.describe_cache.get(key)
+
+        if entry is not None and entry.is_fresh(self.describe_cache.ttl):
+            return utils.build_response(entry.value)
+
+        response = self.post(None, SoapSObject.Action.DESCRIBE)
+        self.describe_cache.set(key, response.text)
+
+        return response
 
     @utils.authenticate
-    def create(self, data):
+    def create(self, data, workers=1):
         if not isinstance(data, list):
             raise TypeError("'create' require a parameter type 'list'")
 
-        return self.post(data, SoapSObject.Action.CREATE)
+        return self.__save(data, SoapSObject.Action.CREATE, workers)
 
     @utils.authenticate
-    def update(self, data):
-        if not isinstance(data, list):
+    def update(self, data, workers=1):
+        if not isinstance(data, list) or not all(isinstance(item, list) for item in data):
             raise TypeError("'update' require a parameter type 'list of lists'")
 
-        return self.post(data, SoapSObject.Action.UPDATE)
+        return self.__save(data, SoapSObject.Action.UPDATE, workers)
 
     @utils.authenticate
-    def delete(self, record_ids):
+    def delete(self, record_ids, workers=1):
         if not isinstance(record_ids, list):
-            raise TypeError("'update' require a parameter type 'list of lists'")
+            raise TypeError("'delete' require a parameter type 'list' of ids")
 
-        return self.post(record_ids, SoapSObject.Action.DELETE)
+        return self.__save(record_ids, SoapSObject.Action.DELETE, workers)
 
     @utils.authenticate
     def post(self, data, action=None):
@@ -175,26 +246,25 @@ class SoapSObject(SObject):
         if action != SoapSObject.Action.DESCRIBE and not isinstance(data, list):
             raise TypeError("'create' require a parameter type 'list'")
 
-        body = ''
         if action == SoapSObject.Action.DESCRIBE:
-            body = utils.get_soap_describe_body(self.__name)
+            body = [utils.get_soap_describe_body(self.__name)]
 
         elif action == SoapSObject.Action.CREATE:
-            body = utils.get_soap_create_body(self.__name, data)
+            body = utils.iter_soap_create_body(self.__name, data)
 
         elif action == SoapSObject.Action.UPDATE:
-            body = utils.get_soap_update_body(self.__name, data)
+            body = utils.iter_soap_update_body(self.__name, data)
 
         elif action == SoapSObject.Action.DELETE:
-            body = utils.get_soap_delete_body(data)
+            body = utils.iter_soap_delete_body(data)
 
         else:
             raise ValueError("'action' " + action + " is not supported!")
 
-        request_body = utils.soap_request_header().format(
-            access_token=self.auth.access_token,
-            method=action,
-            request=body)
+        if self.httplib.stream_soap_requests and action != SoapSObject.Action.DESCRIBE:
+            request_body = self.__envelope.iter_build(self.auth.access_token, action, body)
+        else:
+            request_body = self.__envelope.build(self.auth.access_token, action, ''.join(body))
 
         post_url = self.url_resources.get_full_resource_url(
             self.auth.instance_url)
@@ -208,8 +278,74 @@ class SoapSObject(SObject):
     def get(self, record_id=None, params=None):
         pass
 
+    def __save(self, data, action, workers):
+        batches = list(utils.chunks(data, SoapSObject.BATCH_SIZE))
+
+        if workers > 1 and len(batches) > 1:
+            return self.__save_concurrently(batches, action, min(workers, len(batches)))
+
+        results = []
+
+        try:
+            for batch in batches:
+                results.extend(self.__save_batch(batch, action))
+        except RequestFailed as error:
+            self.__raise_save_failed(error, sys.exc_info()[2], results)
+
+        return results
+
+    def __save_concurrently(self, batches, action, workers):
+        executor = Executor(workers)
+        futures = []
+
+        def cancel_on_failure(future):
+            if future.exception() is not None:
+                for pending in futures:
+                    pending.cancel()
+
+        try:
+            for batch in batches:
+                futures.append(executor.submit(self.__save_batch, batch, action))
+
+            for future in futures:
+                future.add_done_callback(cancel_on_failure)
+        finally:
+            executor.shutdown()
+
+        results = []
+        failure = None
+
+        for future in futures:
+            if future.cancelled():
+                continue
+
+            try:
+                results.extend(future.result())
+            except RequestFailed as error:
+                if failure is None:
+                    failure = error, sys.exc_info()[2]
+
+        if failure is not None:
+            self.__raise_save_failed(failure[0], failure[1], results)
+
+        return results
+
+    def __raise_save_failed(self, error, traceback, results):
+        save_error = CollectionRequestFailed(error.error_code, error.message, results)
+        # Batches before the failure are committed; retrying the whole call would repeat them
+        save_error.session_renewed = True
+
+        raise save_error, None, traceback
+
+    @utils.authenticate
+    def __save_batch(self, batch, action):
+        response = self.post(batch, action)
+
+        return list(iter_save_results(utils.get_response_stream(response)))
+
     def __send_request(self, method, url, action, **kwargs):
-        headers = utils.xml_content_headers(len(kwargs['data']), action)
+        data = kwargs['data']
+        headers = utils.xml_content_headers(len(data) if isinstance(data, str) else None, action)
 
         request_url = utils.get_request_url(url, self.auth.instance_url, self.url_resources.get_resource_url())
 
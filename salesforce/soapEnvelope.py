@@ -0,0 +1,89 @@
+from string import Formatter
+import re
+import utils
+
+CHUNK_SIZE = 64 * 1024
+MAX_HEADS = 64
+
+WHITESPACE = re.compile(r'>\s+|\s+<')
+
+
+def compile_template(template):
+    template = WHITESPACE.sub(lambda match: match.group(0).strip(), template)
+
+    return [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+
+
+def render_template(parts, **kwargs):
+    return ''.join(literal + (kwargs[field] if field is not None else '')
+                   for literal, field in parts)
+
+
+def iter_chunks(parts, size=CHUNK_SIZE):
+    buffered = []
+    length = 0
+
+    for part in parts:
+        if isinstance(part, unicode):
+            part = part.encode('utf-8')
+
+        buffered.append(part)
+        length += len(part)
+
+        if length >= size:
+            yield ''.join(buffered)
+            buffered = []
+            length = 0
+
+    if buffered:
+        yield ''.join(buffered)
+
+
+class SoapEnvelope(object):
+    def __init__(self, template=None):
+        super(SoapEnvelope, self).__init__()
+
+        parts = compile_template(template or utils.soap_request_header())
+        position = [field for _, field in parts].index('request')
+
+        self.__head = parts[:position] + [(parts[position][0], None)]
+        self.__tail = parts[position + 1:]
+        self.__heads = {}
+        self.__tails = {}
+
+    def get_head(self, access_token, method):
+        key = (access_token, method)
+        head = self.__heads.get(key)
+
+        if head is None:
+            if len(self.__heads) >= MAX_HEADS:
+                self.__heads = {}
+
+            head = render_template(self.__head, access_token=access_token, method=method)
+            self.__heads[key] = head
+
+        return head
+
+    def get_tail(self, method):
+        tail = self.__tails.get(method)
+
+        if tail is None:
+            tail = self.__tails[method] = render_template(self.__tail, method=method)
+
+        return tail
+
+    def build(self, access_token, method, request):
+        envelope = ''.join((self.get_head(access_token, method), request, self.get_tail(method)))
+
+        return envelope.encode('utf-8') if isinstance(envelope, unicode) else envelope
+
+    def iter_build(self, access_token, method, requests, size=CHUNK_SIZE):
+        def parts():
+            yield self.get_head(access_token, method)
+
+            for request in requests:
+                yield request
+
+            yield self.get_tail(method)
+
+        return iter_chunks(parts(), size)
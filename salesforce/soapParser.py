@@ -0,0 +1,222 @@
+try:
+    import xml.etree.cElementTree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+
+import base64
+import decimal
+
+XSI_NS = 'http://www.w3.org/2001/XMLSchema-instance'
+XSI_TYPE = '{%s}type' % XSI_NS
+XSI_NIL = '{%s}nil' % XSI_NS
+
+
+def to_boolean(text):
+    return text == 'true' or text == '1'
+
+
+XSD_TYPES = {'int': int,
+             'long': long,
+             'short': int,
+             'byte': int,
+             'integer': long,
+             'double': float,
+             'float': float,
+             'decimal': decimal.Decimal,
+             'boolean': to_boolean,
+             'base64Binary': base64.b64decode}
+
+
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def is_nil(element):
+    return element.get(XSI_NIL) == 'true'
+
+
+class SoapQueryResult(object):
+    def __init__(self, source):
+        super(SoapQueryResult, self).__init__()
+
+        self.__source = source
+        self.__consumed = False
+
+        self.done = None
+        self.query_locator = None
+        self.total_size = None
+
+    def __iter__(self):
+        if self.__consumed:
+            raise ValueError('SOAP query result can only be iterated once')
+
+        self.__consumed = True
+
+        depth = 0
+        result_depth = None
+        result = None
+
+        for event, element in ElementTree.iterparse(self.__source, ('start', 'end')):
+            if event == 'start':
+                depth += 1
+
+                if result_depth is None and local_name(element.tag) == 'result':
+                    result_depth = depth
+                    result = element
+
+                continue
+
+            depth -= 1
+
+            if result_depth is None or depth != result_depth:
+                continue
+
+            name = local_name(element.tag)
+
+            if name == 'records':
+                yield record_to_dict(element)
+                result.clear()
+
+            elif name == 'done':
+                self.done = element.text == 'true'
+
+            elif name == 'queryLocator':
+                self.query_locator = None if is_nil(element) else element.text
+
+            elif name == 'size':
+                self.total_size = int(element.text)
+
+    def to_page(self):
+        records = list(self)
+
+        return {'done': self.done,
+                'queryLocator': self.query_locator,
+                'totalSize': self.total_size,
+                'records': records}
+
+
+def record_to_dict(element):
+    record = {}
+
+    for child in element:
+        name = local_name(child.tag)
+
+        if name == 'type':
+            record['attributes'] = {'type': child.text}
+            continue
+
+        if name in record and record[name] is not None:
+            continue
+
+        record[name] = element_value(child)
+
+    return record
+
+
+def element_value(element):
+    if is_nil(element):
+        return None
+
+    xsi_type = element.get(XSI_TYPE)
+
+    if xsi_type is None:
+        return record_to_dict(element) if len(element) else element.text
+
+    if xsi_type.endswith('QueryResult'):
+        return query_result_to_dict(element)
+
+    if xsi_type.endswith('sObject') or len(element):
+        return record_to_dict(element)
+
+    convert = XSD_TYPES.get(xsi_type.rsplit(':', 1)[-1])
+    text = element.text
+
+    if convert is None or text is None:
+        return text
+
+    return convert(text)
+
+
+def query_result_to_dict(element):
+    result = {'records': []}
+
+    for child in element:
+        name = local_name(child.tag)
+
+        if name == 'records':
+            result['records'].append(record_to_dict(child))
+
+        elif name == 'done':
+            result['done'] = child.text == 'true'
+
+        elif name == 'size':
+            result['totalSize'] = int(child.text)
+
+    return result
+
+
+def parse_query_result(source):
+    return SoapQueryResult(source).to_page()
+
+
+def parse_search_result(source):
+    records = []
+
+    for event, element in ElementTree.iterparse(source):
+        if local_name(element.tag) != 'searchRecords':
+            continue
+
+        for child in element:
+            if local_name(child.tag) == 'record':
+                records.append(record_to_dict(child))
+
+        element.clear()
+
+    return {'searchRecords': records}
+
+
+def parse_save_results(source):
+    return list(iter_save_results(source))
+
+
+def iter_save_results(source):
+    depth = 0
+
+    for event, element in ElementTree.iterparse(source, ('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+
+        depth -= 1
+
+        if depth == 3 and local_name(element.tag) == 'result':
+            yield save_result_to_dict(element)
+            element.clear()
+
+
+def save_result_to_dict(element):
+    result = {'errors': []}
+
+    for child in element:
+        name = local_name(child.tag)
+
+        if name == 'errors':
+            error = {'fields': []}
+
+            for detail in child:
+                detail_name = local_name(detail.tag)
+
+                if detail_name == 'fields':
+                    error['fields'].append(detail.text)
+                else:
+                    error[detail_name] = detail.text
+
+            result['errors'].append(error)
+
+        elif name == 'success':
+            result['success'] = child.text == 'true'
+
+        else:
+            result[name] = None if is_nil(child) else child.text
+
+    return result
@@ -0,0 +1,205 @@
+from contextlib import contextmanager
+from exception import ApiBudgetExhausted
+import threading
+import time
+
+LIMIT_INFO_HEADER = 'Sforce-Limit-Info'
+API_USAGE = 'api-usage'
+
+
+class ApiUsage(object):
+    def __init__(self):
+        super(ApiUsage, self).__init__()
+
+        self.__usage = (None, None, None)
+
+    @property
+    def used(self):
+        return self.__usage[0]
+
+    @property
+    def limit(self):
+        return self.__usage[1]
+
+    @property
+    def updated_at(self):
+        return self.__usage[2]
+
+    @property
+    def remaining(self):
+        used, limit, _ = self.__usage
+
+        if limit is None:
+            return None
+
+        return max(limit - used, 0)
+
+    @property
+    def ratio(self):
+        used, limit, _ = self.__usage
+
+        if not limit:
+            return None
+
+        return float(used) / limit
+
+    def update(self, limit_info):
+        for entry in limit_info.split(','):
+            name, _, value = entry.strip().partition('=')
+
+            if name != API_USAGE:
+                continue
+
+            used, _, limit = value.partition('/')
+
+            try:
+                self.__usage = (int(used), int(limit), time.time())
+            except ValueError:
+                pass
+
+    def exhaust(self):
+        limit = self.limit
+
+        if limit is not None:
+            self.__usage = (limit, limit, time.time())
+
+    def to_dict(self):
+        used, limit, updated_at = self.__usage
+
+        return {'used': used,
+                'limit': limit,
+                'remaining': self.remaining,
+                'updated_at': updated_at}
+
+
+class ThrottlePolicy(object):
+    def __init__(self):
+        super(ThrottlePolicy, self).__init__()
+
+        self.__local = threading.local()
+
+    @contextmanager
+    def critical(self):
+        depth = getattr(self.__local, 'depth', 0)
+        self.__local.depth = depth + 1
+
+        try:
+            yield
+        finally:
+            self.__local.depth = depth
+
+    def is_critical(self):
+        return getattr(self.__local, 'depth', 0) > 0
+
+    def acquire(self, usage):
+        if self.is_critical():
+            return
+
+        delay = self.get_delay(usage)
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def get_delay(self, usage):
+        raise NotImplementedError
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_ThrottlePolicy__local']
+
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__local = threading.local()
+
+
+class TokenBucket(ThrottlePolicy):
+    def __init__(self, rate, capacity=None, soft_limit=0.0):
+        super(TokenBucket, self).__init__()
+
+        if rate <= 0:
+            raise ValueError("'rate' should be greater than 0")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.soft_limit = soft_limit
+
+        self.__tokens = self.capacity
+        self.__updated_at = time.time()
+        self.__lock = threading.Lock()
+
+    def get_delay(self, usage):
+        ratio = usage.ratio if usage is not None else None
+
+        if self.soft_limit and (ratio is None or ratio < self.soft_limit):
+            return 0
+
+        with self.__lock:
+            now = time.time()
+            self.__tokens = min(self.capacity,
+                                self.__tokens + (now - self.__updated_at) * self.rate)
+            self.__updated_at = now
+            self.__tokens -= 1
+
+            if self.__tokens >= 0:
+                return 0
+
+            return -self.__tokens / self.rate
+
+    def __getstate__(self):
+        state = super(TokenBucket, self).__getstate__()
+        del state['_TokenBucket__lock']
+
+        return state
+
+    def __setstate__(self, d):
+        super(TokenBucket, self).__setstate__(d)
+        self.__lock = threading.Lock()
+
+
+class BudgetThrottle(ThrottlePolicy):
+    def __init__(self, soft_limit=0.8, hard_limit=0.95, max_delay=5.0, pause=60.0):
+        super(BudgetThrottle, self).__init__()
+
+        if not 0 <= soft_limit < hard_limit <= 1:
+            raise ValueError("'soft_limit' and 'hard_limit' should satisfy 0 <= soft < hard <= 1")
+
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.max_delay = max_delay
+        self.pause = pause
+
+        self.__probed_at = 0
+        self.__lock = threading.Lock()
+
+    def get_delay(self, usage):
+        ratio = usage.ratio if usage is not None else None
+
+        if ratio is None or ratio < self.soft_limit:
+            return 0
+
+        if ratio >= self.hard_limit:
+            # Usage is only refreshed by responses, so once the reading is
+            # pause seconds old a single call is let through to re-check it
+            with self.__lock:
+                now = time.time()
+
+                if now - max(usage.updated_at, self.__probed_at) < self.pause:
+                    raise ApiBudgetExhausted(usage.used, usage.limit)
+
+                self.__probed_at = now
+
+            return 0
+
+        return self.max_delay * (ratio - self.soft_limit) / (self.hard_limit - self.soft_limit)
+
+    def __getstate__(self):
+        state = super(BudgetThrottle, self).__getstate__()
+        del state['_BudgetThrottle__lock']
+
+        return state
+
+    def __setstate__(self, d):
+        super(BudgetThrottle, self).__setstate__(d)
+        self.__lock = threading.Lock()
@@ -0,0 +1,123 @@
+from login import Authentication
+import json
+import os
+import tempfile
+import threading
+
+
+class TokenStore(object):
+    def __init__(self):
+        super(TokenStore, self).__init__()
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, auth):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    def __init__(self):
+        super(MemoryTokenStore, self).__init__()
+
+        self.__tokens = {}
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__tokens.get(key)
+
+        return None if entry is None else _to_auth(entry)
+
+    def set(self, key, auth):
+        with self.__lock:
+            self.__tokens[key] = _to_entry(auth)
+
+    def delete(self, key):
+        with self.__lock:
+            self.__tokens.pop(key, None)
+
+    def __getstate__(self):
+        with self.__lock:
+            state = self.__dict__.copy()
+            state['_MemoryTokenStore__tokens'] = dict(self.__tokens)
+
+        del state['_MemoryTokenStore__lock']
+
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__lock = threading.Lock()
+
+
+class FileTokenStore(TokenStore):
+    def __init__(self, path):
+        super(FileTokenStore, self).__init__()
+
+        self.path = path
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__read().get(key)
+
+        return None if entry is None else _to_auth(entry)
+
+    def set(self, key, auth):
+        with self.__lock:
+            tokens = self.__read()
+            tokens[key] = _to_entry(auth)
+            self.__write(tokens)
+
+    def delete(self, key):
+        with self.__lock:
+            tokens = self.__read()
+
+            if tokens.pop(key, None) is not None:
+                self.__write(tokens)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_FileTokenStore__lock']
+
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.__lock = threading.Lock()
+
+    def __read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def __write(self, tokens):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, path = tempfile.mkstemp(dir=directory)
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(tokens, f)
+
+            os.rename(path, self.path)
+        except (IOError, OSError):
+            os.remove(path)
+            raise
+
+
+def _to_entry(auth):
+    return {'access_token': auth.access_token,
+            'instance_url': auth.instance_url,
+            'refresh_token': auth.refresh_token}
+
+
+def _to_auth(entry):
+    return Authentication(entry['access_token'],
+                          entry['instance_url'],
+                          entry.get('refresh_token'))
@@ -1,13 +1,36 @@
 class UrlResources(object):
-    def __init__(self, domain, sandbox, version):
+    def __init__(self, domain, sandbox, version, version_resolver=None):
         super(UrlResources, self).__init__()
 
         self.domain = domain
         self.sandbox = sandbox
-        self.version = version
+        self.version_resolver = version_resolver
+        self.urls = {}
+        self.__version = version
+
+    @property
+    def version(self):
+        return self.resolve_version()
+
+    @version.setter
+    def version(self, version):
+        self.__version = version
+        self.urls = {}
+
+    def resolve_version(self, instance_url=None):
+        if self.__version is None and self.version_resolver is not None:
+            self.__version = self.version_resolver(instance_url)
+            self.urls = {}
+
+        return self.__version
 
     def get_resource_url(self):
-        return self.get_resource_path().format(version=self.version)
+        url = self.urls.get(())
+
+        if url is None:
+            url = self.urls[()] = self.get_resource_path().format(version=self.version)
+
+        return url
 
     def get_full_resource_url(self, **kwargs):
         raise NotImplementedError
@@ -19,40 +42,64 @@ class UrlResources(object):
 class RestUrlResources(UrlResources):
     RESOURCE_PATH = "/services/data/v{version}"
 
-    def __init__(self, domain, sandbox, version):
-        super(RestUrlResources, self).__init__(domain, sandbox, version)
+    def __init__(self, domain, sandbox, version, version_resolver=None):
+        super(RestUrlResources, self).__init__(domain, sandbox, version, version_resolver)
 
     def get_resource_path(self):
         return RestUrlResources.RESOURCE_PATH
 
     def get_full_resource_url(self, instance_url, resource_name):
-        return '{0}{1}{2}'.format(
-            instance_url,
-            RestUrlResources.RESOURCE_PATH.format(version=self.version),
-            resource_name)
+        key = (instance_url, resource_name)
+        url = self.urls.get(key)
+
+        if url is None:
+            url = '{0}{1}{2}'.format(
+                instance_url,
+                RestUrlResources.RESOURCE_PATH.format(version=self.resolve_version(instance_url)),
+                resource_name)
+
+            self.urls[key] = url
+
+        return url
 
     def get_resource_sobject_url(self,
                                  instance_url,
                                  resource_name,
                                  sobject_name):
-        return '{0}{1}'.format(
-            self.get_full_resource_url(instance_url, resource_name),
-            sobject_name)
+        key = (instance_url, resource_name, sobject_name)
+        url = self.urls.get(key)
+
+        if url is None:
+            url = '{0}{1}'.format(
+                self.get_full_resource_url(instance_url, resource_name),
+                sobject_name)
+
+            self.urls[key] = url
+
+        return url
 
 
 class SoapUrlResources(UrlResources):
     RESOURCE_PATH = "/services/Soap/u/{version}"
 
-    def __init__(self, domain, sandbox, version):
-        super(SoapUrlResources, self).__init__(domain, sandbox, version)
+    def __init__(self, domain, sandbox, version, version_resolver=None):
+        super(SoapUrlResources, self).__init__(domain, sandbox, version, version_resolver)
 
     def get_resource_path(self):
         return SoapUrlResources.RESOURCE_PATH
 
     def get_full_resource_url(self, instance_url):
-        return '{0}{1}'.format(
-            instance_url,
-            SoapUrlResources.RESOURCE_PATH.format(version=self.version))
+        key = (instance_url,)
+        url = self.urls.get(key)
+
+        if url is None:
+            url = '{0}{1}'.format(
+                instance_url,
+                SoapUrlResources.RESOURCE_PATH.format(version=self.resolve_version(instance_url)))
+
+            self.urls[key] = url
+
+        return url
 
 
 class ResourcesName(object):
@@ -61,6 +108,9 @@ class ResourcesName(object):
         'queryAll': '/queryAll/',
         'sobject': '/sobjects/',
         'search': '/search/',
+        'composite_sobjects': '/composite/sobjects',
+        'jobs_ingest': '/jobs/ingest/',
+        'jobs_query': '/jobs/query/',
     }
 
     @staticmethod
@@ -1,5 +1,20 @@
+from io import BytesIO
+from types import GeneratorType
+from xml.sax.saxutils import escape
+import copy
+import csv
+import datetime
+import json
 import requests
+import threading
+import zlib
 from exception import RequestFailed, AuthenticationFailed
+from throttle import LIMIT_INFO_HEADER
+
+GZIP_LEVEL = 6
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+_retries = threading.local()
 
 
 def json_content_headers(access_token):
@@ -11,14 +26,26 @@ def json_content_headers(access_token):
     }
 
 
-def xml_content_headers(length, action):
+def csv_content_headers(access_token):
     return {
+        'Content-Type': 'text/csv',
+        'Authorization': 'Bearer ' + access_token,
+        'Accept': 'text/csv'
+    }
+
+
+def xml_content_headers(length, action):
+    headers = {
         'Content-Type': 'text/xml',
         'charset': 'utf-8',
-        'Content-length': '%d' % length,
         'SOAPAction': action,
     }
 
+    if length is not None:
+        headers['Content-length'] = '%d' % length
+
+    return headers
+
 
 def get_soap_env():
     return """<?xml version="1.0" encoding="utf-8" ?>
@@ -74,61 +101,91 @@ def soap_request_header():
         body=get_soap_body())
 
 
+def get_soql(sobject, fields, where=None):
+    query_string = 'SELECT {0} FROM {1}'.format(', '.join(fields), sobject)
+
+    if where:
+        query_string += ' WHERE {0}'.format(where)
+
+    return query_string
+
+
+def xml_escape(value):
+    if isinstance(value, bool):
+        value = u'true' if value else u'false'
+    elif isinstance(value, datetime.date):
+        value = value.isoformat()
+    elif isinstance(value, str):
+        value = value.decode('utf-8')
+    elif not isinstance(value, unicode):
+        value = unicode(value)
+
+    return escape(value)
+
+
 def get_soap_query_body(query_string):
-    return '<urn:queryString>{0}</urn:queryString>'.format(query_string)
+    return u'<urn:queryString>{0}</urn:queryString>'.format(xml_escape(query_string))
 
 
 def get_soap_query_more_body(query_string):
-    return '<urn:queryLocator>{0}</urn:queryLocator>'.format(query_string)
+    return u'<urn:queryLocator>{0}</urn:queryLocator>'.format(xml_escape(query_string))
 
 
 def get_soap_search_body(search_string):
-    return '<urn:searchString>{0}</urn:searchString>'.format(search_string)
+    return u'<urn:searchString>{0}</urn:searchString>'.format(xml_escape(search_string))
 
 
 def get_soap_describe_body(sobject):
-    return '<urn:sObjectType>{0}</urn:sObjectType>'.format(sobject)
+    return u'<urn:sObjectType>{0}</urn:sObjectType>'.format(xml_escape(sobject))
 
 
 def get_soap_create_body(sobject, data):
-    create_body = ''
+    return ''.join(iter_soap_create_body(sobject, data))
+
 
+def iter_soap_create_body(sobject, data):
     for item in data:
-        create_body += '<urn:sObjects xsi:type="urn1:{0}"> \n'.format(sobject)
+        yield u'<urn:sObjects xsi:type="urn1:{0}"> \n'.format(sobject)
 
         for key, value in item.iteritems():
-            create_body += '<{0}>{1}</{0}> \n'.format(key, value)
+            if value is not None:
+                yield u'<{0}>{1}</{0}> \n'.format(key, xml_escape(value))
 
-        create_body += '</urn:sObjects> \n'
-
-    return create_body
+        yield u'</urn:sObjects> \n'
 
 
 def get_soap_delete_body(ids):
-    delete_body = ''
+    return ''.join(iter_soap_delete_body(ids))
 
-    for sf_id in ids:
-        delete_body += '<urn:Ids>{0}</urn:Ids>'.format(sf_id)
 
-    return delete_body
+def iter_soap_delete_body(ids):
+    for sf_id in ids:
+        yield u'<urn:Ids>{0}</urn:Ids>'.format(xml_escape(sf_id))
 
 
 def get_soap_update_body(sobject, data):
-    update_body = ''
+    return ''.join(iter_soap_update_body(sobject, data))
 
+
+def iter_soap_update_body(sobject, data):
     for item in data:
         if not isinstance(item, list):
             raise TypeError("'update' require a parameter type 'list of lists'")
 
-        update_body += '<urn:sObjects xsi:type="urn1:{0}"> \n'.format(sobject)
-        update_body += '<urn:Id>{0}</urn:Id>'.format(item[0])
+        yield u'<urn:sObjects xsi:type="urn1:{0}"> \n'.format(sobject)
 
+        # None clears a field; fieldsToNull has to come before Id
         for key, value in item[1].iteritems():
-            update_body += '<urn:{0}>{1}</urn:{0}> \n'.format(key, value)
+            if value is None:
+                yield u'<urn:fieldsToNull>{0}</urn:fieldsToNull> \n'.format(key)
+
+        yield u'<urn:Id>{0}</urn:Id>'.format(xml_escape(item[0]))
 
-        update_body += '</urn:sObjects> \n'
+        for key, value in item[1].iteritems():
+            if value is not None:
+                yield u'<urn:{0}>{1}</urn:{0}> \n'.format(key, xml_escape(value))
 
-    return update_body
+        yield u'</urn:sObjects> \n'
 
 
 def verify_response(response):
@@ -139,13 +196,150 @@ def verify_response(response):
         raise RequestFailed(error_code, message)
 
 
+def send_raw_request(method, httplib, url, headers, **kwargs):
+    if httplib.coalescer is not None and method == 'GET' and not kwargs.get('stream'):
+        key = get_request_key(url, headers, kwargs.get('params'))
+
+        if key is not None:
+            # Every caller gets its own copy of the shared response
+            return copy_response(httplib.coalescer.call(key,
+                                                        read_raw_request,
+                                                        method,
+                                                        httplib,
+                                                        url,
+                                                        headers,
+                                                        **kwargs))
+
+    return send_single_request(method, httplib, url, headers, **kwargs)
+
+
+def read_raw_request(method, httplib, url, headers, **kwargs):
+    response = send_single_request(method, httplib, url, headers, **kwargs)
+    response.content
+
+    return response
+
+
+def copy_response(response):
+    response = copy.copy(response)
+    response.headers = requests.structures.CaseInsensitiveDict(response.headers)
+
+    return response
+
+
+def get_request_key(url, headers, params):
+    if isinstance(params, dict):
+        params = sorted(params.items())
+
+    if isinstance(params, (list, tuple)):
+        params = tuple((key, tuple(value) if isinstance(value, list) else value)
+                       for key, value in params)
+
+    key = url, tuple(sorted((headers or {}).items())), params
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def send_single_request(method, httplib, url, headers, **kwargs):
+    if httplib.throttle is not None:
+        httplib.throttle.acquire(httplib.api_usage)
+
+    if httplib.compact_json:
+        headers = get_compact_headers(headers)
+
+    if httplib.compress_requests:
+        headers = compress_request_body(headers, kwargs, httplib.compress_min_size)
+
+    if httplib.instrumentation is None:
+        response = httplib(method,
+                           url,
+                           headers=headers,
+                           **kwargs)
+    else:
+        response = httplib.instrumentation.call(httplib,
+                                                method,
+                                                url,
+                                                headers,
+                                                getattr(_retries, 'count', 0),
+                                                **kwargs)
+
+    if httplib.api_usage is not None:
+        update_api_usage(httplib.api_usage, response)
+
+    return response
+
+
+def get_compact_headers(headers):
+    if headers is None or ('X-PrettyPrint' not in headers and 'Accept-Encoding' in headers):
+        return headers
+
+    headers = dict(headers)
+    headers.pop('X-PrettyPrint', None)
+    headers.setdefault('Accept-Encoding', 'gzip')
+
+    return headers
+
+
+def compress_request_body(headers, kwargs, min_size):
+    data = kwargs.get('data')
+
+    if isinstance(data, GeneratorType):
+        kwargs['data'] = iter_gzip(data)
+
+        headers = dict((name, value) for name, value in (headers or {}).items()
+                       if name.lower() != 'content-length')
+        headers['Content-Encoding'] = 'gzip'
+
+        return headers
+
+    if isinstance(data, unicode):
+        data = data.encode('utf-8')
+
+    if not isinstance(data, str) or len(data) < min_size:
+        return headers
+
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+    kwargs['data'] = compressor.compress(data) + compressor.flush()
+
+    headers = dict((name, value) for name, value in (headers or {}).items()
+                   if name.lower() != 'content-length')
+    headers['Content-Encoding'] = 'gzip'
+    headers['Content-Length'] = '%d' % len(kwargs['data'])
+
+    return headers
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def update_api_usage(api_usage, response):
+    limit_info = response.headers.get(LIMIT_INFO_HEADER)
+
+    if limit_info:
+        api_usage.update(limit_info)
+
+    if response.status_code == requests.codes.forbidden and \
+       'REQUEST_LIMIT_EXCEEDED' in response.text:
+        api_usage.exhaust()
+
+
 def send_request(method, httplib, url, headers, **kwargs):
-    print method + ": Sending request to " + url + "\n"
+    response = send_raw_request(method, httplib, url, headers, **kwargs)
 
-    response = httplib(method,
-                       url,
-                       headers=headers,
-                       **kwargs)
     try:
         verify_response(response)
     except RequestFailed:
@@ -153,8 +347,43 @@ def send_request(method, httplib, url, headers, **kwargs):
 
     if headers and 'SOAPAction' in headers:
         return response
+    elif response.status_code == requests.codes.no_content:
+        return None
     else:
-        return response.json()
+        return json_loads(httplib, response.content)
+
+
+def json_dumps(httplib, value):
+    if httplib.json_codec is None:
+        return json.dumps(value)
+
+    return httplib.json_codec.dumps(value)
+
+
+def json_loads(httplib, content):
+    if httplib.json_codec is None:
+        return json.loads(content)
+
+    return httplib.json_codec.loads(content)
+
+
+def build_response(text, status_code=requests.codes.ok):
+    response = requests.Response()
+    response.status_code = status_code
+    response.encoding = 'utf-8'
+    response._content = text.encode('utf-8')
+
+    return response
+
+
+def get_response_stream(response):
+    raw = getattr(response, 'raw', None)
+
+    if raw is not None and not getattr(response, '_content_consumed', True):
+        raw.decode_content = True
+        return raw
+
+    return BytesIO(response.content)
 
 
 def get_request_url(url, instance_url, resource_url):
@@ -176,12 +405,102 @@ def get_element_by_name(xml_string, element_name):
     return None
 
 
+def chunks(iterable, size):
+    chunk = []
+
+    for item in iterable:
+        chunk.append(item)
+
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def iter_csv_lines(rows):
+    buffer = LineBuffer()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    for row in rows:
+        writer.writerow([csv_value(value) for value in row])
+        yield buffer.pop()
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    elif isinstance(value, bool):
+        return 'true' if value else 'false'
+    elif isinstance(value, unicode):
+        return value.encode('utf-8')
+
+    return value
+
+
+def iter_lines(chunks):
+    pending = ''
+
+    for chunk in chunks:
+        lines = (pending + chunk).splitlines(True)
+        pending = lines.pop() if lines and not lines[-1].endswith('\n') else ''
+
+        for line in lines:
+            yield line
+
+    if pending:
+        yield pending
+
+
+class LineBuffer(object):
+    def __init__(self):
+        super(LineBuffer, self).__init__()
+
+        self.__parts = []
+
+    def write(self, data):
+        self.__parts.append(data)
+
+    def pop(self):
+        data = ''.join(self.__parts)
+        self.__parts = []
+
+        return data
+
+
+def is_session_expired(error):
+    if error.error_code == requests.codes.unauthorized:
+        return True
+
+    return error.error_code == requests.codes.server_error and \
+        'INVALID_SESSION_ID' in (error.message or '')
+
+
 def authenticate(func):
     def authenticate_and_call(self, *args, **kwargs):
         if self.auth is None or not self.auth.is_authenticated():
             raise AuthenticationFailed("You need to first authentificate!")
 
-        return func(self, *args, **kwargs)
+        access_token = self.auth.access_token
+
+        try:
+            return func(self, *args, **kwargs)
+        except RequestFailed as error:
+            if getattr(error, 'session_renewed', False) or \
+               not is_session_expired(error) or \
+               not self.auth.refresh(access_token):
+                raise
+
+        _retries.count = getattr(_retries, 'count', 0) + 1
+
+        try:
+            return func(self, *args, **kwargs)
+        except RequestFailed as error:
+            error.session_renewed = True
+            raise
+        finally:
+            _retries.count -= 1
 
     return authenticate_and_call
 
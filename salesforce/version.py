@@ -1,15 +1,53 @@
+import json
+import os
+import tempfile
+import threading
+import time
 import utils
 
 
 class Version(object):
     VERSION_PATH = "http://na1.salesforce.com/services/data/"
+    DATA_PATH = "/services/data/"
+    CACHE_TTL = 24 * 60 * 60
+
+    __versions = {}
+    __lock = threading.Lock()
 
     def __init__(self):
         super(Version, self).__init__()
 
     @staticmethod
-    def get_latest_version(httplib):
-        version_api_url = Version.VERSION_PATH
+    def get_latest_version(httplib, instance_url=None, cache_file=None, ttl=CACHE_TTL):
+        if instance_url:
+            version_api_url = '{0}{1}'.format(instance_url.rstrip('/'), Version.DATA_PATH)
+        else:
+            version_api_url = Version.VERSION_PATH
+
+        with Version.__lock:
+            if version_api_url not in Version.__versions:
+                latest_version = None
+
+                if cache_file is not None:
+                    latest_version = Version.__read_cache(cache_file, version_api_url, ttl)
+
+                if latest_version is None:
+                    latest_version = Version.__fetch_latest_version(httplib, version_api_url)
+
+                    if cache_file is not None:
+                        Version.__write_cache(cache_file, version_api_url, latest_version)
+
+                Version.__versions[version_api_url] = latest_version
+
+            return Version.__versions[version_api_url]
+
+    @staticmethod
+    def clear_cache():
+        with Version.__lock:
+            Version.__versions.clear()
+
+    @staticmethod
+    def __fetch_latest_version(httplib, version_api_url):
         latest_version = 0
 
         response = utils.send_request('GET',
@@ -22,3 +60,57 @@ class Version(object):
                 latest_version = float(value['version'])
 
         return latest_version
+
+    @staticmethod
+    def __read_cache(cache_file, version_api_url, ttl):
+        try:
+            with open(cache_file) as f:
+                entry = json.load(f).get(version_api_url)
+        except (IOError, ValueError):
+            return None
+
+        if entry is None or time.time() - entry['fetched_at'] > ttl:
+            return None
+
+        return entry['version']
+
+    @staticmethod
+    def __write_cache(cache_file, version_api_url, latest_version):
+        try:
+            with open(cache_file) as f:
+                entries = json.load(f)
+        except (IOError, ValueError):
+            entries = {}
+
+        entries[version_api_url] = {'version': latest_version,
+                                    'fetched_at': time.time()}
+
+        directory = os.path.dirname(os.path.abspath(cache_file))
+
+        try:
+            fd, path = tempfile.mkstemp(dir=directory)
+        except (IOError, OSError):
+            return
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+
+            os.rename(path, cache_file)
+        except (IOError, OSError):
+            os.remove(path)
+
+
+class VersionResolver(object):
+    def __init__(self, httplib, cache_file=None, ttl=Version.CACHE_TTL):
+        super(VersionResolver, self).__init__()
+
+        self.httplib = httplib
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    def __call__(self, instance_url=None):
+        return Version.get_latest_version(self.httplib,
+                                          instance_url,
+                                          self.cache_file,
+                                          self.ttl)
@@ -0,0 +1,39 @@
+import unittest
+
+from stubServer import StubServer, get_client
+from salesforce import AsyncSalesforce, RequestFailed
+
+ERROR = [{'errorCode': 'QUERY_TIMEOUT', 'message': 'Your query request was running for too long.'}]
+
+
+class AsyncQueryCursorTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=300, page_size=100)
+        self.client = AsyncSalesforce(client=get_client(self.server), max_workers=4)
+
+    def tearDown(self):
+        self.client.executor.shutdown()
+        self.server.close()
+
+    def test_pages_are_fetched_in_order(self):
+        cursor = self.client.query_pages('SELECT Id FROM Account')
+        futures = [cursor.fetch_next() for _ in xrange(4)]
+
+        pages = [future.result(10) for future in futures]
+
+        self.assertEqual([len(page['records']) for page in pages[:3]], [100, 100, 100])
+        self.assertEqual(pages[0]['records'][0]['Id'], '001000000000000AAA')
+        self.assertEqual(pages[2]['records'][0]['Id'], '001000000000200AAA')
+        self.assertIsNone(pages[3])
+
+    def test_failed_fetch_is_raised_again(self):
+        self.server.fail('GET', '/query/01gSTUB-', 400, ERROR)
+        cursor = self.client.query_pages('SELECT Id FROM Account')
+
+        self.assertEqual(len(cursor.fetch_next().result(10)['records']), 100)
+        self.assertRaises(RequestFailed, cursor.fetch_next().result, 10)
+        self.assertRaises(RequestFailed, cursor.fetch_next().result, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
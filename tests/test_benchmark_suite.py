@@ -0,0 +1,81 @@
+from StringIO import StringIO
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import suite
+
+OPTIONS = ['--records', '50', '--page-size', '20', '--crud-size', '20', '--repeat', '1', '--quiet']
+
+
+def parse(*args):
+    return suite.get_parser().parse_args(OPTIONS + list(args))
+
+
+class SuiteTest(unittest.TestCase):
+    def test_every_benchmark_runs_against_the_stub_server(self):
+        results = dict((result['name'], result) for result in suite.run(parse())['results'])
+
+        self.assertEqual(sorted(results), sorted(entry['name'] for entry in suite.BENCHMARKS))
+        self.assertEqual(results['rest.query_all']['units_per_run'], 50)
+        self.assertEqual(results['rest.query_iter.prefetch']['units_per_run'], 50)
+        self.assertEqual(results['rest.query_more']['units_per_run'], 3)
+        self.assertEqual(results['soap.query_all']['units_per_run'], 50)
+        self.assertEqual(results['rest.create.batched']['units_per_run'], 20)
+        self.assertEqual(results['soap.create.streamed']['units_per_run'], 20)
+        self.assertEqual(results['soap.parse.query']['units_per_run'], 20)
+        self.assertEqual(results['rest.query_more']['requests_per_run'], 3)
+        self.assertEqual(results['rest.get.single']['requests_per_run'], 20)
+        self.assertNotIn('requests_per_run', results['soap.envelope.query'])
+
+    def test_filter_skips_the_server(self):
+        report = suite.run(parse('--filter', 'soap.parse'))
+
+        self.assertEqual([result['name'] for result in report['results']],
+                         ['soap.parse.query', 'soap.parse.save'])
+        self.assertEqual(report['config']['records'], 50)
+
+    def test_measure(self):
+        entry = {'name': 'counter', 'unit': 'calls', 'func': lambda context: 10}
+        result = suite.measure(entry, {}, 4, warmup=0)
+
+        self.assertEqual((result['runs'], result['units_per_run']), (4, 10))
+        self.assertLessEqual(result['min'], result['median'])
+        self.assertLessEqual(result['median'], result['p95'])
+        self.assertLessEqual(result['p95'], result['max'])
+
+
+class MainTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stderr = sys.stderr
+        sys.stderr = StringIO()
+
+    def tearDown(self):
+        sys.stderr = self.stderr
+        shutil.rmtree(self.directory)
+
+    def test_report_is_written_and_compared(self):
+        output = os.path.join(self.directory, 'report.json')
+        baseline = os.path.join(self.directory, 'baseline.json')
+
+        with open(baseline, 'w') as f:
+            json.dump({'results': [{'name': 'soap.parse.query', 'median': 0.001},
+                                   {'name': 'soap.parse.save', 'median': 0},
+                                   {'name': 'removed', 'median': 0.001}]}, f)
+
+        suite.main(OPTIONS + ['--filter', 'soap.parse', '--output', output, '--compare', baseline])
+
+        with open(output) as f:
+            report = json.load(f)
+
+        self.assertEqual(len(report['results']), 2)
+        self.assertIn('soap.parse.query', sys.stderr.getvalue())
+        self.assertNotIn('soap.parse.save', sys.stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+from StringIO import StringIO
+import csv
+import threading
+import unittest
+
+from stubServer import StubServer, get_client
+from salesforce import pagination
+from salesforce.bulkApi import BulkAPI
+from salesforce.exception import BulkIngestFailed, BulkJobTimeout
+
+
+class BulkTest(unittest.TestCase):
+    def setUp(self):
+        self.poll_interval = BulkAPI.POLL_INTERVAL
+        BulkAPI.POLL_INTERVAL = 0.01
+
+        self.server = StubServer(records=250, page_size=100)
+        self.bulk = get_client(self.server).bulk
+        self.bulk.job_size = 300
+        self.records = [{'LastName': 'Contact {0}'.format(i)} for i in xrange(40)]
+
+    def tearDown(self):
+        BulkAPI.POLL_INTERVAL = self.poll_interval
+        self.server.close()
+
+    def uploaded_rows(self):
+        rows = []
+
+        for job in self.server.jobs:
+            header, records = self.parse(''.join(job['uploads']))
+
+            if not rows:
+                rows.append(header)
+
+            self.assertEqual(header, rows[0])
+            rows.extend(records)
+
+        return rows
+
+    @staticmethod
+    def parse(body):
+        rows = list(csv.reader(StringIO(body)))
+
+        return rows[0], rows[1:]
+
+    def test_records_are_split_over_jobs(self):
+        result = self.bulk.ingest('Contact', 'insert', self.records)
+
+        self.assertTrue(len(result.jobs) > 1)
+        self.assertEqual(self.uploaded_rows(), [['LastName']] + [[record['LastName']] for record in self.records])
+        self.assertEqual(len(list(result.successful_results())), 40)
+
+    def test_file_input_is_split_on_records(self):
+        rows = [['Id', 'Description']] + [['001{0:015d}'.format(i), 'Line one\nLine "two"\n{0}'.format(i)]
+                                          for i in xrange(30)]
+        content = StringIO()
+        csv.writer(content, lineterminator='\n').writerows(rows)
+        content.seek(0)
+
+        result = self.bulk.ingest('Account', 'update', content)
+
+        self.assertTrue(len(result.jobs) > 1)
+        self.assertEqual(self.uploaded_rows(), rows)
+
+    def test_wait_polls_until_the_job_completes(self):
+        self.server.job_polls = 3
+
+        job = self.bulk.query('SELECT Id, Name FROM Account')
+
+        self.assertEqual(job.state, 'JobComplete')
+        self.assertEqual(self.server.jobs[0]['polls'], 4)
+
+    def test_wait_raises_on_timeout(self):
+        self.server.job_polls = 1000
+
+        with self.assertRaises(BulkJobTimeout) as context:
+            self.bulk.query('SELECT Id, Name FROM Account', timeout=0.05)
+
+        self.assertEqual(context.exception.job_id, self.server.jobs[0]['info']['id'])
+        self.assertEqual(context.exception.state, 'InProgress')
+
+    def test_ingest_reports_every_failed_job(self):
+        self.server.failed_jobs = set([0, 2])
+
+        with self.assertRaises(BulkIngestFailed) as context:
+            self.bulk.ingest('Contact', 'insert', self.records)
+
+        error = context.exception
+        failed = [job['info']['id'] for index, job in enumerate(self.server.jobs) if index in (0, 2)]
+
+        self.assertEqual(len(error.result.jobs), len(self.server.jobs))
+        self.assertEqual([job_error.job_id for job_error in error.errors], failed)
+        self.assertEqual(len(list(error.result.failed_results())) +
+                         len(list(error.result.successful_results())), 40)
+
+
+
+class BulkQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.poll_interval = BulkAPI.POLL_INTERVAL
+        BulkAPI.POLL_INTERVAL = 0.01
+
+        self.server = StubServer(records=250, page_size=100)
+        self.job = get_client(self.server).bulk.query('SELECT Id, Name FROM Account')
+        self.server.reset_stats()
+        self.ids = ['001000000{0:06d}AAA'.format(i) for i in xrange(250)]
+
+    def tearDown(self):
+        BulkAPI.POLL_INTERVAL = self.poll_interval
+        self.server.close()
+
+    @staticmethod
+    def prefetch_threads():
+        return [thread for thread in threading.enumerate()
+                if getattr(thread, '_Thread__target', None) is pagination._fill]
+
+    def test_query_job_is_created_and_polled(self):
+        info = self.server.jobs[0]['info']
+
+        self.assertEqual((info['operation'], info['query']), ('query', 'SELECT Id, Name FROM Account'))
+        self.assertEqual(self.job.id, info['id'])
+
+    def test_query_follows_locators(self):
+        rows = list(self.job.rows(max_records=100))
+
+        self.assertEqual([row['Id'] for row in rows], self.ids)
+        self.assertEqual(self.server.stats['requests'], 3)
+
+    def test_each_page_is_a_csv_with_its_header(self):
+        pages = [list(page) for page in self.job.pages(max_records=100)]
+
+        self.assertEqual([len(page) for page in pages], [101, 101, 51])
+        self.assertEqual(set(page[0] for page in pages), set(['Id,Name\n']))
+
+    def test_query_follows_locators_with_prefetch(self):
+        rows = list(self.job.rows(max_records=60, prefetch=2))
+
+        self.assertEqual([row['Id'] for row in rows], self.ids)
+        self.assertEqual(self.server.stats['requests'], 5)
+
+    def test_write_to_keeps_a_single_header(self):
+        f = StringIO()
+        self.job.write_to(f, max_records=100, prefetch=2)
+
+        rows = list(csv.reader(StringIO(f.getvalue())))
+
+        self.assertEqual(rows[0], ['Id', 'Name'])
+        self.assertEqual([row[0] for row in rows[1:]], self.ids)
+
+    def test_closing_rows_stops_the_prefetch_thread(self):
+        rows = self.job.rows(max_records=10, prefetch=2)
+        next(rows)
+
+        self.assertEqual(len(self.prefetch_threads()), 1)
+
+        rows.close()
+
+        self.assertEqual(self.prefetch_threads(), [])
+        self.assertLess(self.server.stats['requests'], 25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import threading
+import unittest
+
+from stubServer import StubServer, TOKEN
+from salesforce import utils
+from salesforce.httpClient import Requests
+
+
+class CoalescingTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10, latency=0.2)
+        self.httplib = Requests(coalesce_requests=True)
+        self.url = self.server.url + '/services/data/v37.0/sobjects/Account/001000000000000AAA'
+
+    def tearDown(self):
+        self.server.close()
+
+    def get_concurrently(self, params, count=4):
+        headers = utils.json_content_headers(TOKEN)
+        responses = [None] * count
+
+        def get(index):
+            responses[index] = utils.send_raw_request('GET', self.httplib, self.url, headers, params=params)
+
+        threads = [threading.Thread(target=get, args=(index,)) for index in xrange(count)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join(10)
+
+        return responses
+
+    def test_request_key_accepts_list_params(self):
+        key = utils.get_request_key(self.url, {}, {'fields': ['Id', 'Name']})
+
+        self.assertEqual(key, utils.get_request_key(self.url, {}, [('fields', ['Id', 'Name'])]))
+        self.assertNotEqual(key, utils.get_request_key(self.url, {}, {'fields': ['Id']}))
+
+    def test_request_key_is_none_for_unhashable_params(self):
+        self.assertIsNone(utils.get_request_key(self.url, {}, {'fields': {'Id': 1}}))
+
+    def test_concurrent_gets_with_list_params_are_coalesced(self):
+        responses = self.get_concurrently({'fields': ['Id', 'Name']})
+
+        self.assertEqual(self.server.stats['requests'], 1)
+        self.assertEqual(self.httplib.coalescer.stats()['coalesced'], 3)
+        self.assertEqual(len(set(id(response) for response in responses)), 4)
+        self.assertEqual(len(set(id(response.headers) for response in responses)), 4)
+        self.assertEqual(set(response.json()['Id'] for response in responses), set(['001000000000000AAA']))
+
+    def test_unhashable_params_are_sent_separately(self):
+        self.get_concurrently({'fields': set(['Id'])})
+
+        self.assertEqual(self.server.stats['requests'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from stubServer import SOAP_ENVELOPE, StubServer, get_client
+from salesforce.exception import CollectionRequestFailed
+
+ERROR = [{'errorCode': 'UNABLE_TO_LOCK_ROW', 'message': 'unable to obtain exclusive access'}]
+SOAP_FAULT = SOAP_ENVELOPE.format('<soapenv:Fault><faultcode>sf:UNABLE_TO_LOCK_ROW</faultcode>'
+                                  '<faultstring>unable to obtain exclusive access</faultstring></soapenv:Fault>')
+
+
+class CollectionsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10)
+        self.client = get_client(self.server)
+        self.records = [{'LastName': 'Contact {0}'.format(i)} for i in xrange(450)]
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_records_are_sent_in_chunks(self):
+        results = self.client.Contact.create(self.records, all_or_none=True)
+
+        self.assertEqual(len(results), 450)
+        self.assertEqual(self.server.stats['requests'], 3)
+
+    def test_failed_chunk_carries_committed_results(self):
+        self.server.fail('POST', '/composite/sobjects', 400, ERROR, after=2)
+
+        with self.assertRaises(CollectionRequestFailed) as context:
+            self.client.Contact.create(self.records, all_or_none=True)
+
+        self.assertEqual(len(context.exception.results), 400)
+        self.assertEqual(context.exception.error_code, 400)
+        self.assertEqual(self.server.stats['requests'], 3)
+
+    def test_failed_first_chunk_carries_no_results(self):
+        self.server.fail('DELETE', '/composite/sobjects', 400, ERROR)
+
+        with self.assertRaises(CollectionRequestFailed) as context:
+            self.client.Contact.delete(['003{0:015d}'.format(i) for i in xrange(250)])
+
+        self.assertEqual(context.exception.results, [])
+
+    def test_failed_update_chunk_carries_committed_results(self):
+        self.server.fail('PATCH', '/composite/sobjects', 400, ERROR, after=1)
+        data = [['003{0:015d}'.format(i), record] for i, record in enumerate(self.records)]
+
+        with self.assertRaises(CollectionRequestFailed) as context:
+            self.client.Contact.update(data)
+
+        self.assertEqual([result['id'] for result in context.exception.results],
+                         [item[0] for item in data[:200]])
+
+
+class SoapBatchesTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10, latency=0.05)
+        self.client = get_client(self.server, soap=True)
+        self.records = [{'LastName': 'Contact {0}'.format(i)} for i in xrange(1000)]
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_failed_batch_carries_committed_results(self):
+        self.server.fail('POST', '/services/Soap/', 500, SOAP_FAULT, after=1)
+
+        with self.assertRaises(CollectionRequestFailed) as context:
+            self.client.Contact.create(self.records, soap=True)
+
+        self.assertEqual(len(context.exception.results), 200)
+        self.assertEqual(self.server.stats['requests'], 2)
+
+    def test_failed_batch_stops_concurrent_batches(self):
+        self.server.fail('POST', '/services/Soap/', 500, SOAP_FAULT)
+
+        with self.assertRaises(CollectionRequestFailed) as context:
+            self.client.Contact.create(self.records, soap=True, workers=2)
+
+        requests = self.server.stats['requests']
+
+        self.assertTrue(requests < 5)
+        self.assertEqual(len(context.exception.results), (requests - 1) * 200)
+
+    def test_failed_delete_batch_is_not_sent_again(self):
+        self.server.fail('POST', '/services/Soap/', 500, SOAP_FAULT, after=2)
+
+        with self.assertRaises(CollectionRequestFailed) as context:
+            self.client.Contact.delete(['003{0:015d}'.format(i) for i in xrange(1000)], soap=True)
+
+        self.assertEqual(len(context.exception.results), 400)
+        self.assertEqual(self.server.stats['requests'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+from datetime import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from stubServer import rest_page
+from salesforce import columnar
+from salesforce.columnar import ParquetColumnarWriter, build_columns
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FIELDS = ['Id', 'NumberOfEmployees', 'AnnualRevenue', 'IsDeleted', 'CreatedDate', 'Industry']
+KINDS = {'NumberOfEmployees': 'int',
+         'AnnualRevenue': 'double',
+         'IsDeleted': 'boolean',
+         'CreatedDate': 'datetime'}
+
+
+def get_pages():
+    return [rest_page(0, 250, 100), rest_page(100, 250, 100), rest_page(200, 250, 100)]
+
+
+class ColumnarTest(unittest.TestCase):
+    def check_columns(self, result):
+        self.assertEqual(len(result), 250)
+        self.assertEqual(result['CreatedDate'].to_list()[1], datetime(2016, 3, 2, 10, 0))
+        self.assertEqual(result['NumberOfEmployees'].to_list()[:3], [0, 1, 2])
+        self.assertTrue(isinstance(result['NumberOfEmployees'].to_list()[3], (int, long)))
+        self.assertEqual(result['Industry'].to_list()[:4], ['Banking', 'Retail', 'Energy', None])
+
+    def test_columns_are_typed(self):
+        self.check_columns(build_columns(get_pages(), FIELDS, KINDS))
+
+    def test_double_typecode_keeps_64_bit_values(self):
+        typecodes = columnar.TYPECODES
+        columnar.TYPECODES = dict(typecodes, int='d', datetime='d')
+
+        try:
+            result = build_columns(get_pages(), FIELDS, KINDS)
+        finally:
+            columnar.TYPECODES = typecodes
+
+        self.assertEqual(result['CreatedDate'].data.typecode, 'd')
+        self.check_columns(result)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_to_numpy(self):
+        arrays = build_columns(get_pages(), FIELDS, KINDS).to_numpy()
+
+        self.assertEqual(arrays['NumberOfEmployees'].dtype, numpy.dtype('int64'))
+        self.assertEqual(arrays['CreatedDate'][1], numpy.datetime64('2016-03-02T10:00:00.000'))
+        self.assertEqual(arrays['IsDeleted'].dtype, numpy.dtype(bool))
+        self.assertTrue(arrays['Industry'].mask[3])
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_parquet_writer(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'accounts.parquet')
+
+        try:
+            build_columns(get_pages(), FIELDS, KINDS, ParquetColumnarWriter(path))
+            table = pyarrow.parquet.read_table(path)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(table.num_rows, 250)
+        self.assertEqual(table.column_names, FIELDS)
+        self.assertEqual(table.column('CreatedDate').type, pyarrow.timestamp('ms'))
+        self.assertEqual(table.column('NumberOfEmployees').to_pylist()[:3], [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import pickle
+import unittest
+
+from stubServer import make_record
+from salesforce.compactRecord import RecordCompactor
+
+
+class CompactRecordTest(unittest.TestCase):
+    def setUp(self):
+        self.compactor = RecordCompactor()
+        self.record = make_record(1)
+        self.compact = self.compactor.compact(self.record)
+
+    def test_compares_with_records_and_dicts(self):
+        expected = dict((name, value) for name, value in self.record.items() if name != 'attributes')
+        expected['Owner'] = {'Name': 'Owner 1'}
+
+        self.assertEqual(self.compact, expected)
+        self.assertEqual(self.compact, self.compactor.compact(make_record(1)))
+        self.assertFalse(self.compact != self.compactor.compact(make_record(1)))
+        self.assertNotEqual(self.compact, self.compactor.compact(make_record(2)))
+        self.assertTrue(self.compact != make_record(2))
+
+    def test_is_not_hashable(self):
+        self.assertRaises(TypeError, hash, self.compact)
+        self.assertRaises(TypeError, set, [self.compact])
+
+    def test_survives_pickling(self):
+        copy = pickle.loads(pickle.dumps(self.compact, pickle.HIGHEST_PROTOCOL))
+
+        self.assertEqual(copy, self.compact)
+        self.assertEqual(copy.sobject_type, 'Account')
+        self.assertEqual(copy.Owner.Name, 'Owner 1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import pickle
+import unittest
+
+from stubServer import StubServer, get_client
+from salesforce.describeCache import DescribeCache
+
+
+class DescribeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10)
+        self.client = get_client(self.server, describe_cache=DescribeCache(ttl=3600))
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_describe_is_served_from_cache(self):
+        self.client.Account.describe()
+        self.server.reset_stats()
+
+        self.client.Account.describe()
+
+        self.assertEqual(self.server.stats['requests'], 0)
+
+    def test_mutating_a_describe_result_does_not_change_the_cache(self):
+        first = self.client.Account.describe()
+        expected = dict(first)
+        first['Name'] = 'changed'
+        first['Owner']['Name'] = 'changed'
+
+        second = self.client.Account.describe()
+        second.clear()
+
+        self.assertEqual(self.client.Account.describe()['Name'], expected['Name'])
+        self.assertEqual(self.client.Account.describe()['Owner']['Name'], 'Owner 0')
+
+    def test_client_with_describe_cache_can_be_pickled(self):
+        self.client.Account.describe()
+
+        client = pickle.loads(pickle.dumps(self.client))
+        self.server.reset_stats()
+        client.Account.describe()
+
+        self.assertEqual(self.server.stats['requests'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+
+from stubServer import CLIENT_ID, USERNAME, StubServer, get_client
+from salesforce.httpClient import Requests
+from salesforce.instrumentation import RequestHook
+from salesforce.login import Authentication
+
+
+class UrlHook(RequestHook):
+    def __init__(self):
+        super(UrlHook, self).__init__()
+
+        self.urls = []
+
+    def on_end(self, event):
+        self.urls.append(event.url)
+
+
+class FacadeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10)
+        self.client = get_client(self.server)
+
+    def tearDown(self):
+        self.server.close()
+
+    def add_hook(self, httplib=None):
+        return (httplib or self.client.httplib).add_hook(UrlHook())
+
+    def authenticate(self, token=None):
+        if token is not None:
+            self.client.token_store.set('login:{0}:{1}'.format(CLIENT_ID, USERNAME),
+                                        Authentication(token, self.server.url))
+
+        self.client.authenticate(client_id=CLIENT_ID,
+                                 client_secret='secret',
+                                 username=USERNAME,
+                                 password='password')
+
+    def test_facades_are_reused(self):
+        self.assertIs(self.client.Account, self.client.Account)
+        self.assertIsNot(self.client.Account, self.client.Contact)
+
+    def test_facades_are_dropped_when_the_version_changes(self):
+        facade = self.client.Account
+        hook = self.add_hook()
+
+        self.client.version = 36.0
+        self.client.Account.get('001000000000001AAA')
+        self.client.query('SELECT Id FROM Account')
+
+        self.assertIsNot(self.client.Account, facade)
+        self.assertEqual(self.client.Account.version, 36.0)
+        self.assertEqual(len(hook.urls), 2)
+
+        for url in hook.urls:
+            self.assertIn('/v36.0/', url)
+
+    def test_facades_are_dropped_when_the_httplib_changes(self):
+        facade = self.client.Account
+        httplib = Requests()
+        hook = self.add_hook(httplib)
+
+        self.client.httplib = httplib
+        self.client.Account.get('001000000000001AAA')
+
+        self.assertIsNot(self.client.Account, facade)
+        self.assertEqual(len(hook.urls), 1)
+
+    def test_facades_are_dropped_when_the_protocol_changes(self):
+        facade = self.client.Account
+
+        self.client.soap = True
+
+        self.assertIsNot(self.client.Account, facade)
+        self.assertTrue(self.client.Account.soap)
+
+    def test_facades_are_dropped_on_authenticate(self):
+        facade = self.client.Account
+
+        self.authenticate()
+
+        self.assertIsNot(self.client.Account, facade)
+
+    def test_held_facade_follows_a_new_httplib(self):
+        facade = self.client.Account
+        list(facade.query_iter(soap=True))
+
+        httplib = Requests()
+        hook = self.add_hook(httplib)
+        self.client.httplib = httplib
+
+        facade.get('001000000000001AAA')
+        list(facade.query_iter(soap=True))
+
+        self.assertEqual(len(hook.urls), 2)
+        self.assertIn('/services/Soap/u/', hook.urls[1])
+
+    def test_held_facade_follows_a_new_session(self):
+        facade = self.client.Account
+        list(facade.query_iter(soap=True))
+
+        self.server.expire_session()
+        self.authenticate(self.server.token)
+        hook = self.add_hook()
+
+        self.assertEqual(len(list(facade.query_iter(soap=True))), 10)
+        self.assertEqual(len(hook.urls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
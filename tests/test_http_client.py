@@ -0,0 +1,52 @@
+import unittest
+import warnings
+
+from stubServer import StubServer, get_client
+from salesforce.httpClient import Requests
+
+
+class RequestsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_pool_stats_count_reused_connections(self):
+        httplib = Requests()
+        client = get_client(self.server, httplib=httplib)
+
+        for _ in xrange(3):
+            client.query('SELECT Id FROM Account')
+
+        stats = httplib.pool_stats()
+
+        self.assertEqual(stats['pools'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], stats['requests'] - 1)
+        self.assertGreaterEqual(stats['hits'], 2)
+
+    def test_preconnect_on_auth_opens_a_connection(self):
+        httplib = Requests(preconnect_on_auth=True)
+        get_client(self.server, httplib=httplib)
+
+        self.assertEqual(self.server.stats['requests'], 1)
+        self.assertEqual(httplib.pool_stats()['misses'], 1)
+
+    def test_no_preconnect_by_default(self):
+        httplib = Requests()
+        get_client(self.server, httplib=httplib)
+
+        self.assertEqual(self.server.stats['requests'], 0)
+        self.assertEqual(httplib.pool_stats()['requests'], 0)
+
+    def test_set_max_request_is_deprecated(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            Requests().set_max_request(15)
+
+        self.assertEqual([warning.category for warning in caught], [DeprecationWarning])
+
+
+if __name__ == '__main__':
+    unittest.main()
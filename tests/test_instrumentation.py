@@ -0,0 +1,127 @@
+import unittest
+
+from stubServer import StubServer, get_client, stub_logins
+from salesforce.exception import RequestFailed
+from salesforce.instrumentation import (LatencyHistogram, LatencyMetrics, RequestHook,
+                                        get_resource_type)
+
+QUERY = 'SELECT Id FROM Account'
+
+
+class RecordingHook(RequestHook):
+    def __init__(self):
+        super(RecordingHook, self).__init__()
+
+        self.started = []
+        self.ended = []
+
+    def on_start(self, event):
+        self.started.append(event)
+
+    def on_end(self, event):
+        self.ended.append(event.to_dict())
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10)
+        self.client = get_client(self.server)
+        self.hook = self.client.httplib.add_hook(RecordingHook())
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_request_events(self):
+        self.client.query(QUERY)
+
+        self.assertEqual(len(self.hook.started), 1)
+        event = self.hook.ended[0]
+
+        self.assertEqual((event['method'], event['resource'], event['status']), ('GET', 'query', 200))
+        self.assertEqual(event['retries'], 0)
+        self.assertIsNone(event['error'])
+        self.assertGreater(event['response_bytes'], 0)
+        self.assertGreaterEqual(event['latency'], 0)
+
+    def test_request_bytes(self):
+        self.client.Account.create({'Name': 'Account'})
+
+        event = self.hook.ended[0]
+
+        self.assertEqual((event['method'], event['resource']), ('POST', 'sobjects'))
+        self.assertEqual(event['request_bytes'], len('{"Name":"Account"}'))
+
+    def test_retry_after_an_expired_session_is_counted(self):
+        with stub_logins(self.server):
+            self.server.expire_session()
+            self.client.query(QUERY)
+
+        queries = [event for event in self.hook.ended if event['resource'] == 'query']
+
+        self.assertEqual([(event['status'], event['retries']) for event in queries], [(401, 0), (200, 1)])
+
+    def test_failed_requests_are_reported(self):
+        self.server.fail('GET', '/query', 500, [{'errorCode': 'UNKNOWN_EXCEPTION', 'message': 'failed'}])
+
+        with self.assertRaises(RequestFailed):
+            self.client.query(QUERY)
+
+        self.assertEqual(self.hook.ended[0]['status'], 500)
+
+    def test_removed_hooks_are_not_called(self):
+        self.client.httplib.remove_hook(self.hook)
+        self.client.query(QUERY)
+
+        self.assertEqual(self.hook.ended, [])
+        self.assertIsNone(self.client.httplib.instrumentation)
+
+    def test_latency_metrics(self):
+        metrics = self.client.httplib.add_hook(LatencyMetrics())
+        self.server.fail('GET', '/query', 500, [{'errorCode': 'UNKNOWN_EXCEPTION', 'message': 'failed'}])
+
+        for _ in xrange(3):
+            try:
+                self.client.query(QUERY)
+            except RequestFailed:
+                pass
+
+        snapshot = metrics.snapshot()
+
+        self.assertEqual(snapshot.keys(), ['query'])
+        self.assertEqual((snapshot['query']['count'], snapshot['query']['errors']), (3, 1))
+
+
+class ResourceTypeTest(unittest.TestCase):
+    def test_resource_types(self):
+        base = 'https://na1.salesforce.com/services/data/v37.0/'
+
+        self.assertEqual(get_resource_type(base + 'query?q=SELECT'), 'query')
+        self.assertEqual(get_resource_type(base + 'sobjects/Account/001'), 'sobjects')
+        self.assertEqual(get_resource_type(base + 'sobjects/Account/describe'), 'describe')
+        self.assertEqual(get_resource_type(base + 'composite/sobjects'), 'composite/sobjects')
+        self.assertEqual(get_resource_type(base + 'jobs/query/750/results'), 'jobs/query')
+        self.assertEqual(get_resource_type('https://na1.salesforce.com/services/data/'), 'versions')
+        self.assertEqual(get_resource_type('https://login.salesforce.com/services/oauth2/token'), 'oauth2')
+        self.assertEqual(get_resource_type(base, {'SOAPAction': 'query'}), 'soap:query')
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram(bounds=(0.1, 1.0))
+
+        for latency in (0.05, 0.05, 0.5, 2.0):
+            histogram.add(latency)
+
+        self.assertEqual(histogram.buckets, [2, 1, 1])
+        self.assertEqual((histogram.min, histogram.max, histogram.mean), (0.05, 2.0, 0.65))
+        self.assertEqual(histogram.percentile(50), 0.1)
+        self.assertEqual(histogram.percentile(75), 1.0)
+        self.assertEqual(histogram.percentile(99), 2.0)
+
+    def test_empty_histogram(self):
+        self.assertIsNone(LatencyHistogram().percentile(50))
+        self.assertIsNone(LatencyHistogram().mean)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from salesforce import Salesforce
+from salesforce.httpClient import Requests
+from salesforce.jsonCodec import get_available_codecs, get_json_codec
+
+
+class JSONCodecTest(unittest.TestCase):
+    def test_stdlib_codec_is_the_default(self):
+        self.assertEqual(get_json_codec().name, 'json')
+        self.assertEqual(Requests().json_codec.name, 'json')
+        self.assertEqual(Salesforce(version=37.0).json_codec.name, 'json')
+
+    def test_unknown_codec_is_rejected(self):
+        self.assertRaises(ValueError, get_json_codec, 'orjson')
+
+    @unittest.skipIf('ujson' in get_available_codecs(), 'ujson is installed')
+    def test_missing_codec_is_rejected(self):
+        self.assertRaises(ValueError, Requests, json_codec='ujson')
+
+    @unittest.skipIf('simplejson' not in get_available_codecs(), 'simplejson is not installed')
+    def test_codec_can_be_picked(self):
+        codec = Salesforce(version=37.0, json_codec='simplejson').json_codec
+
+        self.assertEqual(codec.name, 'simplejson')
+        self.assertEqual(codec.loads(codec.dumps({'Name': u'S\xe3o'})), {'Name': u'S\xe3o'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import threading
+import unittest
+
+from stubServer import StubServer, get_client, stub_logins
+from salesforce import pagination
+
+QUERY = 'SELECT Id, Name FROM Account'
+
+
+def prefetch_threads():
+    return [thread for thread in threading.enumerate()
+            if getattr(thread, '_Thread__target', None) is pagination._fill]
+
+
+class QueryIterTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=5000, page_size=500)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_query_iter_returns_every_record(self):
+        client = get_client(self.server)
+
+        ids = [record['Id'] for record in client.query_iter(QUERY, prefetch=2)]
+
+        self.assertEqual(len(ids), 5000)
+        self.assertEqual(len(set(ids)), 5000)
+
+    def test_closing_query_iter_stops_prefetch_thread(self):
+        client = get_client(self.server)
+
+        records = client.query_iter(QUERY, prefetch=2)
+        next(records)
+
+        self.assertEqual(len(prefetch_threads()), 1)
+
+        records.close()
+
+        self.assertEqual(prefetch_threads(), [])
+
+    def test_closing_soap_query_iter_stops_prefetch_thread(self):
+        client = get_client(self.server, soap=True)
+
+        records = client.query_iter(QUERY, prefetch=2)
+        next(records)
+
+        self.assertEqual(len(prefetch_threads()), 1)
+
+        records.close()
+
+        self.assertEqual(prefetch_threads(), [])
+
+    def check_session_expiring_between_pages(self, soap):
+        client = get_client(self.server, soap=soap)
+        records = client.query_iter(QUERY)
+
+        with stub_logins(self.server):
+            ids = [next(records)['Id']]
+            self.server.expire_session()
+            ids.extend(record['Id'] for record in records)
+
+        self.assertEqual(len(set(ids)), 5000)
+        self.assertEqual(self.server.stats['logins'], 1)
+
+    def test_session_expiring_between_pages_is_renewed(self):
+        self.check_session_expiring_between_pages(False)
+
+    def test_soap_session_expiring_between_pages_is_renewed(self):
+        self.check_session_expiring_between_pages(True)
+
+
+if __name__ == '__main__':
+    unittest.main()
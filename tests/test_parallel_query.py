@@ -0,0 +1,187 @@
+import threading
+import time
+import unittest
+
+from salesforce.exception import RequestFailed
+from salesforce.parallelQuery import (ParallelQuery, _decode_id, _encode_id,
+                                      _split_datetimes, _split_ids)
+
+
+class FakeApi(object):
+    def __init__(self, lowest, highest, chunk_field='Id'):
+        super(FakeApi, self).__init__()
+
+        self.lowest = lowest
+        self.highest = highest
+        self.chunk_field = chunk_field
+        self.pages = {}
+        self.delays = {}
+        self.endless = False
+        self.failures = {}
+        self.boundaries = []
+        self.closed_boundaries = 0
+        self.running = 0
+        self.lock = threading.Lock()
+
+    def query_iter(self, query_string, include_deleted=False):
+        value = self.lowest if query_string.endswith('ASC LIMIT 1') else self.highest
+        records = self.__boundary(value)
+
+        # Keep a reference, so only an explicit close() finishes the generator
+        self.boundaries.append(records)
+
+        return records
+
+    def __boundary(self, value):
+        try:
+            if value is not None:
+                yield {self.chunk_field: value}
+        finally:
+            self.closed_boundaries += 1
+
+    def query_pages(self, query_string, include_deleted=False):
+        with self.lock:
+            self.running += 1
+
+        try:
+            time.sleep(self.delays.get(query_string, 0))
+
+            if query_string in self.failures:
+                raise self.failures[query_string]
+
+            while self.endless:
+                yield {'records': [{'Id': query_string}]}
+
+            for page in self.pages.get(query_string, []):
+                yield {'records': page}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class SplitTest(unittest.TestCase):
+    def test_base62_boundaries(self):
+        self.assertEqual(_decode_id('000000000000000'), 0)
+        self.assertEqual(_decode_id('00000000000000z'), 61)
+        self.assertEqual(_encode_id(61), '00000000000000z')
+        self.assertEqual(_encode_id(62), '000000000000010')
+        self.assertEqual(_encode_id(62 ** 15 - 1), 'z' * 15)
+        self.assertEqual(_decode_id(_encode_id(123456789)), 123456789)
+
+    def test_split_ids(self):
+        bounds = _split_ids('001000000000000', '001000000000010', 4)
+
+        self.assertEqual(bounds, ["'00100000000000F'", "'00100000000000U'", "'00100000000000j'"])
+
+    def test_split_ids_ignores_the_checksum_suffix(self):
+        self.assertEqual(_split_ids('001000000000000AAA', '001000000000010AAA', 4),
+                         _split_ids('001000000000000', '001000000000010', 4))
+
+    def test_split_ids_with_a_narrow_range(self):
+        self.assertEqual(_split_ids('001000000000000', '001000000000002', 4), [])
+
+    def test_split_datetimes(self):
+        bounds = _split_datetimes('2020-01-01T00:00:00.000+0000', '2020-01-05T00:00:00.000+0000', 4)
+
+        self.assertEqual(bounds, ['2020-01-02T00:00:00Z', '2020-01-03T00:00:00Z', '2020-01-04T00:00:00Z'])
+
+    def test_split_datetimes_with_a_narrow_range(self):
+        self.assertEqual(_split_datetimes('2020-01-01T00:00:00.000+0000',
+                                          '2020-01-01T00:00:00.500+0000', 4), [])
+
+
+class ConditionsTest(unittest.TestCase):
+    def test_first_and_last_ranges_are_open(self):
+        api = FakeApi('001000000000000', '001000000000010')
+        conditions = ParallelQuery(api, 'Account', ['Id'], chunks=3).get_conditions()
+
+        self.assertEqual(conditions, ["Id < '00100000000000K'",
+                                      "Id >= '00100000000000K' AND Id < '00100000000000e'",
+                                      "Id >= '00100000000000e'"])
+
+    def test_where_is_combined_with_each_range(self):
+        api = FakeApi('001000000000000', '001000000000010')
+        queries = ParallelQuery(api, 'Account', ['Id'], where="Name = 'a'", chunks=2).get_queries()
+
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[0].endswith("WHERE (Name = 'a') AND (Id < '00100000000000V')"))
+        self.assertTrue(queries[1].endswith("WHERE (Name = 'a') AND (Id >= '00100000000000V')"))
+
+    def test_created_date_ranges(self):
+        api = FakeApi('2020-01-01T00:00:00.000+0000', '2020-01-03T00:00:00.000+0000', 'CreatedDate')
+        conditions = ParallelQuery(api, 'Account', ['Id'], chunks=2,
+                                   chunk_field='CreatedDate').get_conditions()
+
+        self.assertEqual(conditions, ['CreatedDate < 2020-01-02T00:00:00Z',
+                                      'CreatedDate >= 2020-01-02T00:00:00Z'])
+
+    def test_empty_table_has_a_single_query(self):
+        api = FakeApi(None, None)
+
+        self.assertEqual(ParallelQuery(api, 'Account', ['Id']).get_conditions(), [None])
+
+    def test_boundary_queries_are_closed(self):
+        api = FakeApi('001000000000000', '001000000000010')
+        ParallelQuery(api, 'Account', ['Id']).get_conditions()
+
+        self.assertEqual(api.closed_boundaries, 2)
+
+
+class IterationTest(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi('001000000000000', '001000000000010')
+        self.query = ParallelQuery(self.api, 'Account', ['Id'], chunks=3, workers=3, ordered=True)
+        self.queries = self.query.get_queries()
+
+        for index, query_string in enumerate(self.queries):
+            self.api.pages[query_string] = [[{'Id': (index, page, row)} for row in xrange(2)]
+                                            for page in xrange(3)]
+
+    def test_ordered_merge_follows_the_ranges(self):
+        self.api.delays[self.queries[0]] = 0.2
+
+        records = [record['Id'] for record in self.query]
+
+        self.assertEqual(records, [(index, page, row) for index in xrange(3)
+                                   for page in xrange(3) for row in xrange(2)])
+
+    def test_unordered_merge_returns_every_record(self):
+        self.query.ordered = False
+        self.api.delays[self.queries[0]] = 0.2
+
+        records = [record['Id'] for record in self.query]
+
+        self.assertEqual(len(records), 18)
+        self.assertEqual(sorted(records), [(index, page, row) for index in xrange(3)
+                                           for page in xrange(3) for row in xrange(2)])
+        self.assertEqual(records[-1][0], 0)
+
+    def test_worker_errors_are_raised(self):
+        self.api.failures[self.queries[1]] = RequestFailed('INVALID_FIELD', 'failed')
+
+        with self.assertRaises(RequestFailed) as context:
+            list(self.query)
+
+        self.assertEqual(context.exception.error_code, 'INVALID_FIELD')
+
+    def test_workers_stop_when_the_iterator_is_abandoned(self):
+        self.api.endless = True
+
+        records = iter(self.query)
+        next(records)
+        deadline = time.time() + 5
+
+        while self.api.running < 3 and time.time() < deadline:
+            time.sleep(ParallelQuery.POLL_INTERVAL)
+
+        self.assertEqual(self.api.running, 3)
+        records.close()
+
+        while self.api.running and time.time() < deadline:
+            time.sleep(ParallelQuery.POLL_INTERVAL)
+
+        self.assertEqual(self.api.running, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
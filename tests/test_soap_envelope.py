@@ -0,0 +1,68 @@
+import datetime
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from stubServer import StubServer, get_client
+from salesforce import utils
+from salesforce.httpClient import Requests
+from salesforce.soapEnvelope import SoapEnvelope
+
+URN = '{urn:partner.soap.sforce.com}'
+
+RECORD = {'Name': u'S\xe3o Paulo',
+          'BillingCity': 'Z\xc3\xbcrich',
+          'IsActive__c': True,
+          'IsDeleted__c': False,
+          'CloseDate__c': datetime.date(2016, 3, 1),
+          'Reviewed__c': datetime.datetime(2016, 3, 1, 10, 30),
+          'Description': None}
+
+
+class SoapBodyTest(unittest.TestCase):
+    def parse(self, method, body):
+        envelope = SoapEnvelope().build('00Dtoken', method, ''.join(body))
+
+        return ElementTree.fromstring(envelope).find('.//' + URN + 'sObjects')
+
+    def test_create_body_encodes_values(self):
+        sobject = self.parse('create', utils.iter_soap_create_body('Account', [RECORD]))
+        values = dict((element.tag, element.text) for element in sobject)
+
+        self.assertEqual(values, {'Name': u'S\xe3o Paulo',
+                                  'BillingCity': u'Z\xfcrich',
+                                  'IsActive__c': 'true',
+                                  'IsDeleted__c': 'false',
+                                  'CloseDate__c': '2016-03-01',
+                                  'Reviewed__c': '2016-03-01T10:30:00'})
+
+    def test_update_body_sends_none_as_fields_to_null(self):
+        sobject = self.parse('update', utils.iter_soap_update_body('Account', [['001000000000001AAA', RECORD]]))
+        tags = [element.tag for element in sobject]
+
+        self.assertEqual(tags[:2], [URN + 'fieldsToNull', URN + 'Id'])
+        self.assertEqual(sobject.find(URN + 'fieldsToNull').text, 'Description')
+        self.assertEqual(sobject.find(URN + 'IsActive__c').text, 'true')
+        self.assertEqual(sobject.find(URN + 'Name').text, u'S\xe3o Paulo')
+        self.assertIsNone(sobject.find(URN + 'Description'))
+
+    def test_query_body_accepts_unicode(self):
+        self.assertEqual(utils.get_soap_query_body(u"SELECT Id FROM Account WHERE Name = 'S\xe3o'"),
+                         u"<urn:queryString>SELECT Id FROM Account WHERE Name = 'S\xe3o'</urn:queryString>")
+
+
+class StreamedSoapSaveTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10)
+        self.client = get_client(self.server, soap=True, httplib=Requests(stream_soap_requests=True))
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_streamed_create_accepts_unicode(self):
+        results = self.client.Account.create([RECORD] * 3, soap=True)
+
+        self.assertEqual(len(results), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
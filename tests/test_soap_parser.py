@@ -0,0 +1,26 @@
+from StringIO import StringIO
+import decimal
+import unittest
+
+from stubServer import SOAP_ENVELOPE
+from salesforce.soapParser import parse_query_result
+
+RESULT = SOAP_ENVELOPE.format(
+    '<queryResponse><result xsi:type="QueryResult"><done>true</done>'
+    '<queryLocator xsi:nil="true"/><records xsi:type="sf:sObject"><sf:type>Opportunity</sf:type>'
+    '<sf:Id>006000000000001AAA</sf:Id><sf:Amount xsi:type="xsd:decimal">12345678901234.57</sf:Amount>'
+    '<sf:Probability xsi:type="xsd:double">0.1</sf:Probability>'
+    '<sf:IsWon xsi:type="xsd:boolean">false</sf:IsWon></records><size>1</size></result></queryResponse>')
+
+
+class SoapParserTest(unittest.TestCase):
+    def test_typed_values_are_converted(self):
+        record = parse_query_result(StringIO(RESULT))['records'][0]
+
+        self.assertEqual(record['Amount'], decimal.Decimal('12345678901234.57'))
+        self.assertEqual(record['Probability'], 0.1)
+        self.assertIs(record['IsWon'], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import threading
+import unittest
+
+from stubServer import StubServer, get_client, stub_logins, CLIENT_ID, USERNAME
+from salesforce import Salesforce
+
+THREADS = 12
+ROUNDS = 3
+
+
+def run_threads(target, count=THREADS):
+    start = threading.Event()
+    errors = []
+    results = [None] * count
+
+    def run(index):
+        start.wait()
+
+        try:
+            results[index] = target(index)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in xrange(count)]
+
+    for thread in threads:
+        thread.start()
+
+    start.set()
+
+    for thread in threads:
+        thread.join(30)
+
+    if errors:
+        raise errors[0]
+
+    return results
+
+
+class SharedClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=450, page_size=100, latency=0.002)
+        self.client = get_client(self.server)
+        self.ids = sorted('001000000{0:06d}AAA'.format(index) for index in xrange(450))
+
+    def tearDown(self):
+        self.server.close()
+
+    def query_ids(self, index=None):
+        return [record['Id'] for record in self.client.query_iter('SELECT Id FROM Account')]
+
+    def test_concurrent_queries_return_every_record_once(self):
+        results = run_threads(lambda index: [self.query_ids() for _ in xrange(ROUNDS)])
+
+        for rounds in results:
+            for ids in rounds:
+                self.assertEqual(sorted(ids), self.ids)
+
+    def test_concurrent_creates_return_a_result_per_record(self):
+        def create(index):
+            records = [{'LastName': 'Thread {0} Contact {1}'.format(index, i)} for i in xrange(250)]
+
+            return self.client.Contact.create(records)
+
+        for results in run_threads(create):
+            self.assertEqual(len(results), 250)
+
+        self.assertEqual(self.server.stats['requests'], THREADS * 2)
+
+    def test_each_thread_gets_its_own_session(self):
+        httplib = self.client.httplib
+
+        def sessions(index):
+            session = httplib.session
+            self.assertIs(httplib.session, session)
+
+            return session, session.get_adapter(self.server.url)
+
+        results = run_threads(sessions)
+
+        self.assertEqual(len(set(id(session) for session, _ in results)), THREADS)
+        self.assertEqual(len(set(id(adapter) for _, adapter in results)), 1)
+
+    def test_expired_session_is_renewed_once_per_expiry(self):
+        with stub_logins(self.server):
+            for expiry in xrange(1, ROUNDS + 1):
+                self.server.expire_session()
+
+                for ids in run_threads(self.query_ids):
+                    self.assertEqual(sorted(ids), self.ids)
+
+                self.assertEqual(self.server.stats['logins'], expiry)
+
+    def test_expired_soap_session_is_renewed_once(self):
+        client = get_client(self.server, soap=True)
+
+        with stub_logins(self.server):
+            self.server.expire_session()
+
+            results = run_threads(lambda index: client.query('SELECT Id FROM Account'))
+
+        for result in results:
+            self.assertEqual(len(result['records']), 100)
+
+        self.assertEqual(self.server.stats['logins'], 1)
+
+
+class ConcurrentLoginTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=100, page_size=100)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_concurrent_logins_share_one_login(self):
+        client = Salesforce(version=37.0)
+
+        def login(index):
+            client.authenticate(client_id=CLIENT_ID,
+                                client_secret='secret',
+                                username=USERNAME,
+                                password='password')
+
+            return [record['Id'] for record in client.query_iter('SELECT Id FROM Account')]
+
+        with stub_logins(self.server):
+            for ids in run_threads(login):
+                self.assertEqual(len(ids), 100)
+
+            logins = self.server.stats['logins']
+            self.server.expire_session()
+
+            run_threads(lambda index: client.query('SELECT Id FROM Account'))
+
+        self.assertEqual(self.server.stats['logins'], logins + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import pickle
+import unittest
+
+from stubServer import StubServer, get_client
+from salesforce import ApiBudgetExhausted
+from salesforce.throttle import ApiUsage, BudgetThrottle
+
+
+def get_usage(used, limit=15000):
+    usage = ApiUsage()
+    usage.update('api-usage={0}/{1}'.format(used, limit))
+
+    return usage
+
+
+class BudgetThrottleTest(unittest.TestCase):
+    def test_delay_grows_between_the_limits(self):
+        throttle = BudgetThrottle(soft_limit=0.5, hard_limit=0.9, max_delay=4.0)
+
+        self.assertEqual(throttle.get_delay(get_usage(1000)), 0)
+        self.assertAlmostEqual(throttle.get_delay(get_usage(10500)), 2.0)
+
+    def test_calls_past_the_hard_limit_are_refused(self):
+        throttle = BudgetThrottle(soft_limit=0.5, hard_limit=0.9)
+
+        with self.assertRaises(ApiBudgetExhausted) as context:
+            throttle.acquire(get_usage(14000))
+
+        self.assertEqual((context.exception.used, context.exception.limit), (14000, 15000))
+
+    def test_one_call_rechecks_a_stale_reading(self):
+        throttle = BudgetThrottle(soft_limit=0.5, hard_limit=0.9, pause=0)
+        usage = get_usage(14000)
+
+        self.assertEqual(throttle.get_delay(usage), 0)
+
+        throttle.pause = 60
+        self.assertRaises(ApiBudgetExhausted, throttle.get_delay, usage)
+
+    def test_critical_calls_are_not_refused(self):
+        throttle = BudgetThrottle(soft_limit=0.5, hard_limit=0.9)
+
+        with throttle.critical():
+            throttle.acquire(get_usage(14000))
+
+    def test_throttle_can_be_pickled(self):
+        throttle = pickle.loads(pickle.dumps(BudgetThrottle()))
+
+        self.assertRaises(ApiBudgetExhausted, throttle.get_delay, get_usage(15000))
+
+
+class ThrottledClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_client_stops_sending_past_the_hard_limit(self):
+        # The stub reports 10 of 15000 calls used
+        client = get_client(self.server, throttle=BudgetThrottle(soft_limit=0.0001, hard_limit=0.0005))
+        client.query('SELECT Id FROM Account')
+        self.server.reset_stats()
+
+        self.assertRaises(ApiBudgetExhausted, client.query, 'SELECT Id FROM Account')
+        self.assertEqual(self.server.stats['requests'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
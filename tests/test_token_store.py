@@ -0,0 +1,128 @@
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from stubServer import StubServer, get_client
+from salesforce.login import Authentication, Login
+from salesforce.tokenStore import FileTokenStore, MemoryTokenStore
+
+
+class CountingLogin(Login):
+    def __init__(self):
+        super(CountingLogin, self).__init__(None, None)
+
+        self.renewals = 0
+
+    def reauthenticate(self, auth):
+        self.renewals += 1
+        time.sleep(0.05)
+
+        return Authentication('00Dfresh{0}'.format(self.renewals), auth.instance_url)
+
+
+class TokenStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.auth = Authentication('00Dtoken', 'https://na1.salesforce.com', 'refresh')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check_store(self, store):
+        self.assertIsNone(store.get('key'))
+
+        store.set('key', self.auth)
+        auth = store.get('key')
+
+        self.assertIsNot(auth, self.auth)
+        self.assertEqual((auth.access_token, auth.instance_url, auth.refresh_token),
+                         ('00Dtoken', 'https://na1.salesforce.com', 'refresh'))
+
+        store.delete('key')
+        self.assertIsNone(store.get('key'))
+
+    def test_memory_store(self):
+        self.check_store(MemoryTokenStore())
+
+    def test_file_store(self):
+        self.check_store(FileTokenStore(os.path.join(self.directory, 'tokens.json')))
+
+    def test_file_store_is_shared_through_the_file(self):
+        path = os.path.join(self.directory, 'tokens.json')
+        FileTokenStore(path).set('key', self.auth)
+
+        self.assertEqual(FileTokenStore(path).get('key').access_token, '00Dtoken')
+        self.assertEqual(os.listdir(self.directory), ['tokens.json'])
+
+    def test_file_store_ignores_a_corrupt_file(self):
+        path = os.path.join(self.directory, 'tokens.json')
+
+        with open(path, 'w') as f:
+            f.write('{not json')
+
+        self.assertIsNone(FileTokenStore(path).get('key'))
+
+    def test_stores_can_be_pickled(self):
+        memory = MemoryTokenStore()
+        memory.set('key', self.auth)
+        path = os.path.join(self.directory, 'tokens.json')
+
+        memory = pickle.loads(pickle.dumps(memory))
+        files = pickle.loads(pickle.dumps(FileTokenStore(path)))
+
+        self.assertEqual(memory.get('key').access_token, '00Dtoken')
+        files.set('key', self.auth)
+        self.assertEqual(files.get('key').access_token, '00Dtoken')
+
+
+class PickledClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=10)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_client_with_token_store_can_be_pickled(self):
+        client = pickle.loads(pickle.dumps(get_client(self.server)))
+
+        self.assertEqual(len(client.query('SELECT Id FROM Account')['records']), 10)
+
+
+class AuthenticationRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.login = CountingLogin()
+        self.auth = Authentication('00Dstale', 'https://na1.salesforce.com', login=self.login)
+
+    def test_concurrent_refreshes_renew_once(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.auth.refresh('00Dstale')))
+                   for _ in xrange(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(results, [True] * 8)
+        self.assertEqual(self.login.renewals, 1)
+        self.assertEqual(self.auth.access_token, '00Dfresh1')
+
+    def test_each_expiry_renews_once(self):
+        self.auth.refresh('00Dstale')
+        self.auth.refresh('00Dstale')
+        self.auth.refresh('00Dfresh1')
+
+        self.assertEqual(self.login.renewals, 2)
+        self.assertEqual(self.auth.access_token, '00Dfresh2')
+
+    def test_refresh_without_login_fails(self):
+        self.assertFalse(Authentication('00Dstale', 'https://na1.salesforce.com').refresh('00Dstale'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from stubServer import VERSION, StubServer, get_client
+from salesforce import Salesforce
+from salesforce.httpClient import Requests
+from salesforce.version import Version
+
+
+class VersionTest(unittest.TestCase):
+    def setUp(self):
+        Version.clear_cache()
+
+        self.server = StubServer(records=10)
+        self.httplib = Requests()
+        self.directory = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.directory, 'version.json')
+        self.url = self.server.url + Version.DATA_PATH
+
+    def tearDown(self):
+        Version.clear_cache()
+        self.server.close()
+        shutil.rmtree(self.directory)
+
+    def get_latest_version(self, ttl=Version.CACHE_TTL):
+        return Version.get_latest_version(self.httplib, self.server.url, self.cache_file, ttl)
+
+    def write_cache(self, version, age):
+        with open(self.cache_file, 'w') as f:
+            json.dump({self.url: {'version': version, 'fetched_at': time.time() - age}}, f)
+
+    def read_cache(self):
+        with open(self.cache_file) as f:
+            return json.load(f)
+
+    def test_constructor_does_not_resolve_the_version(self):
+        Salesforce(httplib=self.httplib)
+
+        self.assertEqual(self.server.stats['requests'], 0)
+
+    def test_version_is_resolved_from_the_instance_url_once(self):
+        client = get_client(self.server)
+        client.version = None
+        self.server.reset_stats()
+
+        self.assertEqual(client.version, VERSION)
+        self.assertEqual(client.Account.version, VERSION)
+        self.assertEqual(get_client(self.server).query('SELECT Id FROM Account')['totalSize'], 10)
+        self.assertEqual(Version.get_latest_version(self.httplib, self.server.url), VERSION)
+
+        self.assertEqual(self.server.stats['requests'], 2)
+
+    def test_version_is_written_to_the_cache_file(self):
+        self.assertEqual(self.get_latest_version(), VERSION)
+        self.assertEqual(self.read_cache()[self.url]['version'], VERSION)
+        self.assertEqual(os.listdir(self.directory), ['version.json'])
+
+    def test_fresh_cache_file_is_used(self):
+        self.write_cache(40.0, 10)
+
+        self.assertEqual(self.get_latest_version(ttl=60), 40.0)
+        self.assertEqual(self.server.stats['requests'], 0)
+
+    def test_expired_cache_file_is_refreshed(self):
+        self.write_cache(40.0, 120)
+
+        self.assertEqual(self.get_latest_version(ttl=60), VERSION)
+        self.assertEqual(self.server.stats['requests'], 1)
+
+        entry = self.read_cache()[self.url]
+        self.assertEqual(entry['version'], VERSION)
+        self.assertLess(time.time() - entry['fetched_at'], 60)
+
+    def test_other_cache_entries_are_kept(self):
+        with open(self.cache_file, 'w') as f:
+            json.dump({'https://other/services/data/': {'version': 36.0, 'fetched_at': time.time()}}, f)
+
+        self.get_latest_version()
+
+        self.assertEqual(sorted(self.read_cache()), sorted(['https://other/services/data/', self.url]))
+
+    def test_corrupt_cache_file_is_replaced(self):
+        with open(self.cache_file, 'w') as f:
+            f.write('{not json')
+
+        self.assertEqual(self.get_latest_version(), VERSION)
+        self.assertEqual(self.read_cache()[self.url]['version'], VERSION)
+        self.assertEqual(os.listdir(self.directory), ['version.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
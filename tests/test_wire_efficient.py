@@ -0,0 +1,102 @@
+import json
+import zlib
+import unittest
+
+from stubServer import StubServer, get_client
+from salesforce.httpClient import Requests
+from salesforce.utils import GZIP_WBITS, compress_request_body, get_compact_headers
+
+QUERY = 'SELECT Id, Name, Description FROM Account'
+
+
+def gunzip(data):
+    return zlib.decompress(data, GZIP_WBITS)
+
+
+class CompressionTest(unittest.TestCase):
+    def test_small_bodies_are_sent_as_is(self):
+        kwargs = {'data': '{"Name":"Account"}'}
+        headers = compress_request_body({'Content-Type': 'application/json'}, kwargs, 1024)
+
+        self.assertEqual(headers, {'Content-Type': 'application/json'})
+        self.assertEqual(kwargs['data'], '{"Name":"Account"}')
+
+    def test_large_bodies_are_gzipped(self):
+        data = u'{"Name":"%s"}' % (u'\xe9' * 2000)
+        kwargs = {'data': data}
+        headers = compress_request_body({'Content-length': '4012'}, kwargs, 1024)
+
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Content-Length'], str(len(kwargs['data'])))
+        self.assertNotIn('Content-length', headers)
+        self.assertEqual(gunzip(kwargs['data']).decode('utf-8'), data)
+
+    def test_streamed_bodies_are_gzipped_in_chunks(self):
+        chunks = ['<record>{0}</record>'.format(index) for index in xrange(100)]
+        kwargs = {'data': (chunk for chunk in chunks)}
+        headers = compress_request_body({'Content-length': '10'}, kwargs, 1024)
+
+        self.assertEqual(headers, {'Content-Encoding': 'gzip'})
+        self.assertEqual(gunzip(''.join(kwargs['data'])), ''.join(chunks))
+
+    def test_compact_headers(self):
+        headers = {'Authorization': 'Bearer token', 'X-PrettyPrint': '1'}
+
+        self.assertEqual(get_compact_headers(headers),
+                         {'Authorization': 'Bearer token', 'Accept-Encoding': 'gzip'})
+        self.assertIn('X-PrettyPrint', headers)
+        self.assertIsNone(get_compact_headers(None))
+
+
+class WireEfficientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(records=200, page_size=200, description_size=256)
+
+    def tearDown(self):
+        self.server.close()
+
+    def get_client(self, wire_efficient, soap=False):
+        return get_client(self.server, soap,
+                          httplib=Requests(wire_efficient=wire_efficient, stream_soap_requests=soap))
+
+    def bytes_for(self, wire_efficient, call, soap=False):
+        client = self.get_client(wire_efficient, soap)
+        self.server.reset_stats()
+        result = call(client)
+
+        return result, self.server.stats
+
+    def test_responses_are_gzipped(self):
+        query = lambda client: client.query(QUERY)
+        plain, plain_stats = self.bytes_for(False, query)
+        compact, compact_stats = self.bytes_for(True, query)
+
+        self.assertEqual(compact, plain)
+        self.assertLess(compact_stats['bytes_out'], plain_stats['bytes_out'])
+        self.assertLess(compact_stats['bytes_out'] * 4, len(json.dumps(compact, separators=(',', ':'))))
+
+    def test_requests_are_gzipped(self):
+        records = [{'Name': 'Account {0}'.format(index), 'Description': 'x' * 256}
+                   for index in xrange(50)]
+        create = lambda client: client.Account.create(records)
+        plain, plain_stats = self.bytes_for(False, create)
+        compact, compact_stats = self.bytes_for(True, create)
+
+        self.assertEqual(len(compact), 50)
+        self.assertEqual(json.dumps(compact), json.dumps(plain))
+        self.assertLess(compact_stats['bytes_in'] * 4, plain_stats['bytes_in'])
+
+    def test_streamed_soap_requests_are_gzipped(self):
+        records = [{'Name': 'Account {0}'.format(index), 'Description': 'x' * 256}
+                   for index in xrange(200)]
+        create = lambda client: client.Account.create(records)
+        plain, plain_stats = self.bytes_for(False, create, soap=True)
+        compact, compact_stats = self.bytes_for(True, create, soap=True)
+
+        self.assertEqual(len(compact), 200)
+        self.assertEqual(compact, plain)
+        self.assertLess(compact_stats['bytes_in'] * 4, plain_stats['bytes_in'])
+
+
+if __name__ == '__main__':
+    unittest.main()